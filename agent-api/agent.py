@@ -5,17 +5,49 @@ Students build this in Week 3-7.
 The agent loop follows: observe -> decide -> act -> stop
 """
 
-from typing import Optional
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Union
 from models import LeadInput, ScoreResult, AgentResult
+from records import AgentRecord, LeadRecord, ScoreRecord
 from tools.memory import get_company_history
 from tools.score_lead import score_lead
 from tools.upsert_lead import upsert_lead_row
 from tools.create_task import create_followup_task
-from guardrails.approval import check_approval, ApprovalCheck
-import uuid
+from tools.speculative import PREPARED_TOOLS, prepare_action
+from tools.dedupe import get_dedupe_index, lead_features, minhash, score_inputs_key
+from tools.accounts import Account, get_account_resolver
+from db.redis import cache_get, cache_set
+from config import settings
+from guardrails.approval import check_approval, request_approval, ApprovalCheck
+from ids import new_id
+from scoring_config import ScoringConfig, current_scoring_config
 from datetime import datetime
 
 
+# Tools an agent can be given (AgentProfile.tools)
+ALL_TOOLS = frozenset({"company_history", "upsert_lead_row", "create_followup_task", "draft_email"})
+
+
+@dataclass(frozen=True)
+class AgentProfile:
+    """
+    What a LeadAgent runs with; one per agent pool (see dispatcher.py).
+
+    The default profile has every tool and the global model and prompt.
+    """
+    name: str = "default"
+    tools: frozenset = ALL_TOOLS
+    # Scoring prompt variant (None: the config snapshot's) and model per
+    # LLM provider (empty: LLM_MODEL / ANTHROPIC_MODEL)
+    prompt_variant: Optional[str] = None
+    models: dict = field(default_factory=dict)
+    # How long results stay cached for merged duplicates
+    cache_ttl_seconds: int = settings.DEDUP_WINDOW_DAYS * 86400
+
+    def uses(self, tool: str) -> bool:
+        return tool in self.tools
+
+
 class LeadAgent:
     """
     Lead Qualification Agent
@@ -23,18 +55,19 @@ class LeadAgent:
     Implements the core agent loop for qualifying incoming leads.
     """
 
-    def __init__(self):
+    def __init__(self, profile: Optional[AgentProfile] = None):
         # TODO: Initialize connections (Week 5)
         # - Redis client for memory
         # - Postgres client for traces
-        # - OpenAI client for scoring
-        pass
+        # - LLM router for scoring: get_llm_router(self.profile.models)
+        self.profile = profile or AgentProfile()
 
     def run(self, lead: LeadInput) -> AgentResult:
         """
         Main agent loop.
 
         Steps:
+        0. Dedupe - merge near-duplicates of a recent lead
         1. Observe - gather context (company history, existing data)
         2. Decide - score and classify the lead
         3. Check guardrails - determine if approval needed
@@ -47,61 +80,156 @@ class LeadAgent:
         Returns:
             AgentResult with score, actions taken, and trace ID
         """
-        trace_id = f"trace_{uuid.uuid4().hex[:12]}"
+        # The lead was validated at the API boundary; the pipeline works
+        # on slotted records and converts back to pydantic only on return
+        return self.run_record(LeadRecord.from_input(lead)).to_result()
+
+    def run_record(self, lead: LeadRecord, rules: Optional[ScoringConfig] = None) -> AgentRecord:
+        """
+        Agent loop on records (see records.py).
+
+        Batch and bulk re-scoring call this directly so no pydantic
+        objects are built per lead.
+
+        Args:
+            lead: The incoming lead
+            rules: Config snapshot to run under (default: current)
+        """
+        trace_id = new_id("trace")
         actions_taken = []
+        lead_key = self._generate_lead_key(lead.email)
+        # One config snapshot for the whole lead, even if it is swapped mid-run
+        rules = rules or current_scoring_config()
+
+        # --- Step 0: Dedupe ---
+        # Near-identical submissions reuse the existing lead_key; if that
+        # lead's result is still cached for the same scoring inputs the
+        # pipeline is skipped, but never the guardrails
+        signature = None
+        inputs = None
+        if settings.DEDUP_ENABLED:
+            signature = minhash(lead_features(lead))
+            inputs = score_inputs_key(lead)
+            match = get_dedupe_index().find(signature)
+            if match is not None:
+                lead_key = match.lead_key
+                cached = cache_get(self._result_cache_key(lead_key, inputs, rules))
+                if cached is not None:
+                    score_result = ScoreRecord(**cached)
+                    # The lead it duplicates already holds any approval
+                    # request; the merged submission is gated all the same
+                    approval_check = self._check_guardrails(score_result, rules)
+                    return AgentRecord(
+                        lead_key=lead_key,
+                        score=score_result,
+                        actions_taken=["merge_duplicate"],
+                        approval_required=approval_check.required,
+                        approval_reason=approval_check.reason,
+                        trace_id=trace_id,
+                        config_version=rules.version
+                    )
 
         # --- Step 1: Observe ---
-        # TODO: Implement in Week 5
-        # history = get_company_history(self._extract_domain(lead.email))
         history = None
+        if self.profile.uses("company_history"):
+            # TODO: Implement in Week 5
+            # Company memory is keyed by canonical account, so subdomains,
+            # sibling domains and free-mail leads group with their company
+            # account = self._resolve_account(lead)
+            # history = get_company_history(account.account_id)
+            pass
 
         # --- Step 2: Decide ---
-        # TODO: Implement in Week 3
-        # score_result = score_lead(lead)
+        # TODO: Implement in Week 3 (LLM scoring with this agent's prompt
+        # variant and models - self.profile.prompt_variant/models)
+        # score_result = score_lead_record(lead, rules)
         score_result = self._placeholder_score(lead)
 
         # --- Step 3: Check Guardrails ---
         # TODO: Implement in Week 7
-        approval_check = self._check_guardrails(score_result)
+        approval_check = self._check_guardrails(score_result, rules)
+        self._remember(lead_key, signature, inputs, score_result, rules)
 
         if approval_check.required:
-            return AgentResult(
-                lead_key=self._generate_lead_key(lead.email),
-                score_result=score_result,
+            # Do the act phase's side-effect-free work now and store it
+            # with the request, so approving is a single commit
+            tools = tuple(t for t in PREPARED_TOOLS if self.profile.uses(t))
+            prepared = prepare_action(lead_key, lead, score_result, rules, tools)
+            approval_id = request_approval(
+                approval_check.action_type,
+                lead_key,
+                approval_check.reason,
+                context={
+                    "lead": lead.present_fields(),
+                    "score": asdict(score_result),
+                    "tools": list(tools),
+                    "config_version": rules.version,
+                },
+                prepared=prepared
+            )
+            return AgentRecord(
+                lead_key=lead_key,
+                score=score_result,
                 actions_taken=actions_taken,
                 approval_required=True,
                 approval_reason=approval_check.reason,
-                trace_id=trace_id
+                approval_id=approval_id,
+                trace_id=trace_id,
+                config_version=rules.version
             )
 
         # --- Step 4: Act ---
         # TODO: Implement in Week 4
-        # upsert_lead_row(lead_key, lead, score_result)
-        # actions_taken.append("upsert_lead_row")
+        # if self.profile.uses("upsert_lead_row"):
+        #     upsert_lead_row(lead_key, lead, score_result, rules)
+        #     actions_taken.append("upsert_lead_row")
 
         # TODO: Implement in Week 4
-        # create_followup_task(lead, score_result)
-        # actions_taken.append("create_followup_task")
+        # if self.profile.uses("create_followup_task"):
+        #     create_followup_task(lead, score_result)
+        #     actions_taken.append("create_followup_task")
 
         # --- Step 5: Stop ---
-        return AgentResult(
-            lead_key=self._generate_lead_key(lead.email),
-            score_result=score_result,
+        return AgentRecord(
+            lead_key=lead_key,
+            score=score_result,
             actions_taken=actions_taken,
             approval_required=False,
-            trace_id=trace_id
+            trace_id=trace_id,
+            config_version=rules.version
         )
 
-    def _extract_domain(self, email: str) -> str:
-        """Extract domain from email address."""
-        return email.split("@")[-1].lower()
+    def _remember(
+        self,
+        lead_key: str,
+        signature: Optional[tuple],
+        inputs: Optional[str],
+        score_result: ScoreRecord,
+        rules: ScoringConfig
+    ) -> None:
+        """Index the lead for dedupe and cache its result for merged duplicates."""
+        if signature is None:
+            return
+        get_dedupe_index().add(lead_key, signature)
+        cache_set(self._result_cache_key(lead_key, inputs, rules), score_result, self.profile.cache_ttl_seconds)
+
+    def _result_cache_key(self, lead_key: str, inputs: str, rules: ScoringConfig) -> str:
+        # Versioned, so results scored under other rules are never reused;
+        # per profile, so pools with different models/prompts don't share;
+        # per scoring inputs, so a duplicate with a new company_size,
+        # budget, timeline etc. is scored again
+        return f"lead_result:{self.profile.name}:{rules.version}:{lead_key}:{inputs}"
+
+    def _resolve_account(self, lead: LeadRecord) -> Account:
+        """Map the lead to its canonical account (see tools/accounts.py)."""
+        return get_account_resolver().resolve(lead.email, lead.company)
 
     def _generate_lead_key(self, email: str) -> str:
         """Generate unique lead key from email and week."""
         week = datetime.utcnow().strftime("%Y%W")
         return f"{email.lower()}_{week}"
 
-    def _placeholder_score(self, lead: LeadInput) -> ScoreResult:
+    def _placeholder_score(self, lead: LeadRecord) -> ScoreRecord:
         """Placeholder scoring logic - replace with LLM call in Week 3."""
         missing = []
         if not lead.need:
@@ -110,7 +238,7 @@ class LeadAgent:
             missing.append("timeline")
 
         if missing:
-            return ScoreResult(
+            return ScoreRecord(
                 score=0,
                 tier="needs_info",
                 segment="smb",
@@ -132,7 +260,7 @@ class LeadAgent:
         tier = "nurture" if score < 70 else "qualified"
         segment = "enterprise" if lead.company_size and lead.company_size > 200 else "smb"
 
-        return ScoreResult(
+        return ScoreRecord(
             score=score,
             tier=tier,
             segment=segment,
@@ -142,17 +270,23 @@ class LeadAgent:
             reasoning="Placeholder scoring - implement LLM scoring in Week 3"
         )
 
-    def _check_guardrails(self, score_result: ScoreResult) -> ApprovalCheck:
+    def _check_guardrails(
+        self, score_result: Union[ScoreRecord, ScoreResult], rules: Optional[ScoringConfig] = None
+    ) -> ApprovalCheck:
         """Check if the action requires approval."""
         # TODO: Implement full guardrails in Week 7
-        if score_result.tier == "reject":
+        rules = rules or current_scoring_config()
+        if score_result.tier == "reject" and rules.requires_approval("reject_decision"):
             return ApprovalCheck(
                 required=True,
-                reason="Reject decisions require human approval"
+                reason="Reject decisions require human approval",
+                action_type="reject_decision"
             )
-        if score_result.segment == "enterprise" and score_result.tier == "qualified":
+        if (score_result.segment == "enterprise" and score_result.tier == "qualified"
+                and rules.requires_approval("enterprise_scheduling")):
             return ApprovalCheck(
                 required=True,
-                reason="Enterprise scheduling requires approval"
+                reason="Enterprise scheduling requires approval",
+                action_type="enterprise_scheduling"
             )
         return ApprovalCheck(required=False)
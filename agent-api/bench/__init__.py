@@ -0,0 +1,12 @@
+"""
+Benchmarks
+
+Run from the agent-api directory, e.g.:
+    python -m bench.llm_tail_latency
+    python -m bench.import_time
+    python -m bench.serialization
+    python -m bench.records
+    python -m bench.sheets_sync
+    python -m bench.lead_scheduler
+    python -m bench.approval_latency
+"""
@@ -0,0 +1,84 @@
+"""
+Approval Latency Benchmark
+
+Runs enterprise leads through the specialist agent until they stop at
+the approval gate, then approves them and reports approval-to-action
+latency three ways:
+
+    per-tool  rebuild the work at approval time and write it the way
+              separate act-phase tools do: approval, lead, task and
+              draft each in their own round trip
+    rerun     rebuild the work at approval time, one commit
+    prepared  commit the work prepared at request time
+
+Postgres runs in placeholder mode here, so each round trip is a sleep
+of --db-ms.
+
+Usage:
+    python -m bench.approval_latency
+    python -m bench.approval_latency --leads 500 --db-ms 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+
+import metrics
+import tools.speculative
+from agent import LeadAgent
+from dispatcher import default_pools
+from guardrails.approval import _pending_approvals, process_approval, save_approval_request
+from records import LeadRecord
+
+
+async def main_async(args):
+    async def commit(action_id, notes=None, lead_row=None, task=None, draft=None) -> bool:
+        writes = 1
+        if per_tool:
+            writes += (lead_row is not None) + (task is not None) + (draft is not None)
+        for _ in range(writes):
+            await asyncio.sleep(args.db_ms / 1000)
+        return True
+
+    tools.speculative.commit_approved_action = commit
+    profile = next(pool.profile for pool in default_pools() if pool.name == "enterprise")
+    agent = LeadAgent(profile)
+
+    print(f"{'mode':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for mode in ("per-tool", "rerun", "prepared"):
+        per_tool = mode == "per-tool"
+        path = "prepared" if mode == "prepared" else "rerun"
+        metrics.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ids = []
+            for i in range(args.leads):
+                record = agent.run_record(LeadRecord(
+                    email=f"buyer{i}@{mode}-corp{i}.com", company=f"Corp {i}", title="VP Engineering",
+                    need="Replace our lead routing", timeline="this quarter", budget="$250k",
+                    company_size=2000 + i, industry="software"
+                ))
+                await save_approval_request(record.approval_id)
+                ids.append(record.approval_id)
+                if path == "rerun":
+                    _pending_approvals[record.approval_id].prepared = None
+            for action_id in ids:
+                await process_approval(action_id, approved=True)
+        summary = metrics.get_summary("approval.action_ms", path=path)
+        print(f"{mode:<10}{summary['count']:>8}{summary['p50']:>10.2f}{summary['p95']:>10.2f}{summary['max']:>10.2f}")
+
+    prepare = metrics.get_summary("approval.prepare_ms")  # the prepared run's requests
+    print(f"\nprepared at request time: p50 {prepare['p50']:.2f} ms, p95 {prepare['p95']:.2f} ms "
+          "(off the approver's path)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Approval latency benchmark")
+    parser.add_argument("--leads", type=int, default=200)
+    parser.add_argument("--db-ms", type=float, default=2.0, help="Simulated commit round trip")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import Time Benchmark
+
+Measures cold import time of the API and agent entry points with
+`python -X importtime` and checks it against a budget, so a stray
+top-level SDK import shows up before it slows down scale-up.
+
+Each target is imported in a fresh interpreter; the best of --runs is
+reported (the first run also pays for a cold disk cache). A target
+fails if it exceeds its budget or imports a module on the deny list.
+
+Usage:
+    python -m bench.import_time
+    python -m bench.import_time --runs 5 --top 15
+    python -m bench.import_time --target tools.score_lead=300
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+# Module -> budget in ms (cumulative import time of the module)
+DEFAULT_BUDGETS_MS = {
+    "main": 1500,
+    "agent": 400,
+    "tools.score_lead": 400,
+}
+
+# Heavy SDKs (and tokenizers) that must only be imported on first use
+DENY_LIST = ("google.generativeai", "google.ai", "grpc", "anthropic", "tiktoken")
+
+
+def measure(module: str) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Import module in a fresh interpreter.
+
+    Returns:
+        (cumulative ms for module, [(self ms, name) for every import])
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    total_ms = 0.0
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((int(self_us) / 1000, name.strip()))
+        if name.strip() == module:
+            total_ms = int(cumulative_us) / 1000
+    return total_ms, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time budget check")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per target")
+    parser.add_argument(
+        "--target", action="append", default=[],
+        help="module=budget_ms (replaces the default targets)"
+    )
+    args = parser.parse_args()
+
+    budgets = DEFAULT_BUDGETS_MS
+    if args.target:
+        budgets = {m: float(b) for m, b in (t.split("=", 1) for t in args.target)}
+
+    failed = False
+    for module, budget in budgets.items():
+        best_ms, best_imports = None, []
+        for _ in range(args.runs):
+            total_ms, imports = measure(module)
+            if best_ms is None or total_ms < best_ms:
+                best_ms, best_imports = total_ms, imports
+
+        denied = sorted({name for _, name in best_imports
+                         if any(name == d or name.startswith(d + ".") for d in DENY_LIST)})
+        ok = best_ms <= budget and not denied
+        failed |= not ok
+
+        print(f"{'OK  ' if ok else 'FAIL'} {module:<20} {best_ms:8.1f} ms  (budget {budget:.0f} ms)")
+        if denied:
+            print(f"     imports deferred-only modules: {', '.join(denied[:5])}")
+        for self_ms, name in sorted(best_imports, reverse=True)[:args.top]:
+            print(f"     {self_ms:8.1f} ms  {name}")
+        print()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
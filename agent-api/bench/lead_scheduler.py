@@ -0,0 +1,81 @@
+"""
+Lead Scheduler Benchmark
+
+Floods the scheduler with bulk import work while inbound hot and
+standard leads keep arriving, and reports queue wait per lane - first
+through a single FIFO lane (no priorities), then through LEAD_LANES.
+Work is simulated with sleeps standing in for LLM scoring.
+
+Usage:
+    python -m bench.lead_scheduler
+    python -m bench.lead_scheduler --bulk 20000 --concurrency 8 --work-ms 20
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from config import LEAD_LANES
+from scheduler import LeadScheduler
+
+
+async def run_case(lanes: dict, lane_of: dict, args) -> dict:
+    scheduler = LeadScheduler(args.concurrency, lanes)
+    rng = random.Random(1)
+    waits = {lane: [] for lane in lane_of}
+
+    async def job(lane: str):
+        started = time.monotonic()
+        async with scheduler.slot(lane_of[lane]):
+            waits[lane].append((time.monotonic() - started) * 1000)
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * args.work_ms / 1000)
+
+    async def arrivals(lane: str, per_second: float, count: int):
+        jobs = []
+        for _ in range(count):
+            jobs.append(asyncio.create_task(job(lane)))
+            await asyncio.sleep(rng.expovariate(per_second))
+        await asyncio.gather(*jobs)
+
+    # The import lands all at once; inbound leads trickle in behind it
+    bulk = [asyncio.create_task(job("bulk")) for _ in range(args.bulk)]
+    await asyncio.gather(
+        arrivals("hot", args.hot_per_second, args.inbound),
+        arrivals("standard", args.standard_per_second, args.inbound),
+    )
+    await asyncio.gather(*bulk)
+
+    for values in waits.values():
+        values.sort()
+    return waits
+
+
+async def main_async(args):
+    print(f"{'mode':<10}{'lane':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    cases = (
+        ("fifo", {"fifo": (1, 0)}, {lane: "fifo" for lane in LEAD_LANES}),
+        ("weighted", LEAD_LANES, {lane: lane for lane in LEAD_LANES}),
+    )
+    for mode, lanes, lane_of in cases:
+        waits = await run_case(lanes, lane_of, args)
+        for lane, values in waits.items():
+            p50 = values[len(values) // 2]
+            p95 = values[int(len(values) * 0.95) - 1]
+            print(f"{mode:<10}{lane:<10}{len(values):>8}{p50:>10.1f}{p95:>10.1f}{values[-1]:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lead scheduler benchmark")
+    parser.add_argument("--bulk", type=int, default=5000, help="Import rows queued at once")
+    parser.add_argument("--inbound", type=int, default=200, help="Hot and standard leads each")
+    parser.add_argument("--hot-per-second", type=float, default=40)
+    parser.add_argument("--standard-per-second", type=float, default=80)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--work-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+LLM Tail Latency Benchmark
+
+Measures p50/p99 latency and fallback rate of LLM scoring against the
+fault-injecting mock, with and without hedged requests.
+
+Usage:
+    python -m bench.llm_tail_latency
+    python -m bench.llm_tail_latency --requests 500 --tail-rate 0.02 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+# Measure the client, not the shared governor's quotas
+os.environ.setdefault("LLM_MAX_CONCURRENCY", "1000")
+os.environ.setdefault("LLM_MAX_REQUESTS_PER_MINUTE", "1000000")
+
+import metrics
+from llm.mock import mock_llm_client
+from llm.router import LLMRouter
+from models import LeadInput
+from tools.score_lead import score_lead_with_llm
+
+
+LEAD = LeadInput(
+    email="buyer@smallbiz.com",
+    company="SmallBiz Inc",
+    need="Need CRM integration",
+    timeline="Q1 2026",
+    company_size=50,
+    title="Operations Manager",
+)
+
+
+async def run_case(hedge: bool, args) -> dict:
+    metrics.reset()
+    client = mock_llm_client(
+        hedge=hedge,
+        timeout=args.timeout,
+        base_latency_ms=args.base_ms,
+        tail_rate=args.tail_rate,
+        tail_latency_ms=args.tail_ms,
+        error_rate=args.error_rate,
+        seed=1,
+    )
+    router = LLMRouter([client])
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await score_lead_with_llm(LEAD, router=router)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one() for _ in range(args.requests)))
+    await client.close()
+
+    latencies.sort()
+    counters = metrics.snapshot()["counters"]
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "http_requests": client._http._transport.requests,
+        "fallbacks": sum(v for k, v in counters.items() if k.startswith("score_lead.fallback")),
+    }
+
+
+async def main_async(args):
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}{'http reqs':>12}{'fallbacks':>12}")
+    for hedge in (False, True):
+        r = await run_case(hedge, args)
+        mode = "hedged" if hedge else "plain"
+        print(f"{mode:<10}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['http_requests']:>12}{r['fallbacks']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM tail latency benchmark")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--base-ms", type=float, default=40)
+    parser.add_argument("--tail-rate", type=float, default=0.02)
+    parser.add_argument("--tail-ms", type=float, default=1500)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--timeout", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
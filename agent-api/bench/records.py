@@ -0,0 +1,133 @@
+"""
+Pipeline Records Benchmark
+
+Runs the per-lead pipeline objects - missing-field check, rule-based
+score, lead row, agent result, trace - once with the pydantic models
+and once with the slotted records (records.py), and reports
+throughput and retained memory per lead.
+
+Input leads are built once up front with model_construct, since both
+paths start from a lead FastAPI has already validated.
+
+Usage:
+    python -m bench.records
+    python -m bench.records --leads 200000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from config import REQUIRED_FIELDS
+from models import AgentResult, LeadInput, LeadRow, ScoreResult, TraceRecord
+from records import AgentRecord, LeadRecord, LeadRowRecord, TraceEntry
+from tools.score_lead import _rule_based_score, score_lead_record
+
+
+def make_leads(n: int) -> list[LeadInput]:
+    titles = ["CEO", "VP Sales", "Operations Manager", "Engineer"]
+    return [
+        LeadInput.model_construct(
+            email=f"user{i}@company{i % 5000}.com",
+            company=f"Company {i % 5000}",
+            need="Need a CRM that integrates with our billing stack",
+            timeline="Q1" if i % 3 else None,
+            budget="$50k" if i % 2 else None,
+            title=titles[i % len(titles)],
+            company_size=(i % 40) * 25 + 10,
+            industry="saas",
+        )
+        for i in range(n)
+    ]
+
+
+def pydantic_pipeline(lead: LeadInput, now: datetime) -> tuple:
+    """The model-per-step pipeline as it was before records.py."""
+    lead_dict = lead.model_dump()
+    missing = [f for f in REQUIRED_FIELDS if not lead_dict.get(f)]
+    if missing:
+        score = ScoreResult(
+            score=0, tier="needs_info", segment="smb", criteria_scores={},
+            missing_fields=missing, confidence="high", reasoning="Missing required fields"
+        )
+    else:
+        rule = _rule_based_score(lead)
+        score = ScoreResult(
+            score=rule.score, tier=rule.tier, segment=rule.segment,
+            criteria_scores=rule.criteria_scores, missing_fields=[],
+            confidence=rule.confidence, reasoning=rule.reasoning
+        )
+    row = LeadRow(
+        lead_key=lead.email, email=lead.email, company=lead.company,
+        score=score.score, tier=score.tier, segment=score.segment,
+        need=lead.need, timeline=lead.timeline, budget=lead.budget, title=lead.title,
+        company_size=lead.company_size, industry=lead.industry,
+        created_at=now, updated_at=now, notes=score.reasoning
+    )
+    result = AgentResult(
+        lead_key=lead.email, score_result=score, actions_taken=["upsert_lead_row"],
+        approval_required=False, trace_id="trace"
+    )
+    trace = TraceRecord(
+        trace_id="trace", lead_key=lead.email, started_at=now,
+        input_data=lead.model_dump(exclude_none=True), score_result=score.model_dump(),
+        actions_taken=result.actions_taken
+    )
+    return row, result, trace
+
+
+def records_pipeline(lead: LeadInput, now: datetime) -> tuple:
+    record = LeadRecord.from_input(lead)
+    score = score_lead_record(record)
+    row = LeadRowRecord.build(record.email, record, score, now)
+    result = AgentRecord(
+        lead_key=record.email, score=score, actions_taken=["upsert_lead_row"],
+        approval_required=False, trace_id="trace"
+    )
+    trace = TraceEntry(
+        trace_id="trace", lead_key=record.email, started_at=now,
+        input_data=record, score_result=score, actions_taken=result.actions_taken
+    )
+    return row, result, trace
+
+
+def run(pipeline, leads: list[LeadInput]) -> tuple[float, float]:
+    """Returns (leads per second, retained bytes per lead)."""
+    now = datetime.utcnow()
+    gc.collect()
+    started = time.perf_counter()
+    for lead in leads:
+        pipeline(lead, now)
+    rate = len(leads) / (time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [pipeline(lead, now) for lead in leads]
+    retained = (tracemalloc.get_traced_memory()[0] - before) / len(leads)
+    tracemalloc.stop()
+    del kept
+    return rate, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline records memory/throughput benchmark")
+    parser.add_argument("--leads", type=int, default=50000)
+    args = parser.parse_args()
+
+    leads = make_leads(args.leads)
+    results = {name: run(fn, leads) for name, fn in
+               [("pydantic", pydantic_pipeline), ("records", records_pipeline)]}
+
+    print(f"{args.leads} leads")
+    print(f"{'pipeline':<10} {'leads/s':>10} {'bytes/lead':>11}")
+    for name, (rate, retained) in results.items():
+        print(f"{name:<10} {rate:10.0f} {retained:11.0f}")
+    (p_rate, p_mem), (r_rate, r_mem) = results["pydantic"], results["records"]
+    print(f"records: {r_rate / p_rate:.1f}x throughput, {p_mem / r_mem:.1f}x less memory per lead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Serialization Benchmark
+
+Compares the stdlib path (model_dump + json.dumps / json.loads) with
+serialization.dumps (orjson / pydantic-core) and the MessagePack cache
+encoding for the payloads written per lead: the AgentResult response
+body, the trace JSONB and the cached ScoreResult.
+
+Usage:
+    python -m bench.serialization
+    python -m bench.serialization --iterations 50000
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+
+from models import AgentResult, ScoreResult, TraceRecord
+from serialization import decode_cache, dumps, encode_cache, loads
+
+
+SCORE = ScoreResult(
+    score=82,
+    tier="qualified",
+    segment="enterprise",
+    criteria_scores={
+        "industry_fit": 90, "budget": 75, "authority": 85,
+        "need": 80, "timeline": 70, "company_size": 95,
+    },
+    missing_fields=[],
+    confidence="high",
+    reasoning="VP Engineering at a 1,200 person SaaS company with budget approved "
+              "and a Q1 rollout; strong fit on industry, authority and size.",
+)
+
+RESULT = AgentResult(
+    lead_key="jane.doe@bigcorp.com_202642",
+    score_result=SCORE,
+    actions_taken=["upsert_lead_row", "create_followup_task"],
+    approval_required=True,
+    approval_reason="Enterprise scheduling requires approval",
+    trace_id="01JAB3Q5Z8X2K4M6N8P0R2T4V6",
+)
+
+TRACE = TraceRecord(
+    trace_id=RESULT.trace_id,
+    lead_key=RESULT.lead_key,
+    started_at=datetime(2026, 10, 19, 12, 0, 0),
+    completed_at=datetime(2026, 10, 19, 12, 0, 1),
+    input_data={
+        "email": "jane.doe@bigcorp.com", "company": "BigCorp", "need": "CRM integration",
+        "timeline": "Q1", "budget": "$100k", "title": "VP Engineering", "company_size": 1200,
+    },
+    score_result=SCORE.model_dump(),
+    actions_taken=RESULT.actions_taken,
+    approval_required=True,
+    approval_reason=RESULT.approval_reason,
+    token_usage={"input_tokens": 512, "output_tokens": 180, "cached_tokens": 0},
+)
+
+
+def _stdlib_encode(model) -> bytes:
+    return json.dumps(model.model_dump(mode="json")).encode()
+
+
+def time_us(fn, iterations: int) -> float:
+    """Best-of-3 mean time per call in microseconds."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - started) / iterations * 1e6)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization microbenchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    payloads = [("AgentResult", RESULT), ("TraceRecord", TRACE), ("ScoreResult", SCORE)]
+    encoders = [
+        ("stdlib json", _stdlib_encode, json.loads),
+        ("dumps (orjson)", dumps, loads),
+        ("cache msgpack", lambda m: encode_cache(m, "msgpack"), decode_cache),
+    ]
+
+    print(f"{'payload':<12} {'encoder':<16} {'encode us':>10} {'decode us':>10} {'bytes':>7}")
+    per_lead = {name: 0.0 for name, _, _ in encoders}
+    for payload_name, model in payloads:
+        for name, encode, decode in encoders:
+            data = encode(model)
+            enc = time_us(lambda: encode(model), n)
+            dec = time_us(lambda: decode(data), n)
+            per_lead[name] += enc
+            print(f"{payload_name:<12} {name:<16} {enc:10.2f} {dec:10.2f} {len(data):7d}")
+        print()
+
+    # One response, one trace and one cache write per lead
+    baseline = per_lead["stdlib json"]
+    print("Encode CPU per lead (response + trace + cache):")
+    for name, total in per_lead.items():
+        print(f"  {name:<16} {total:7.2f} us  ({baseline / total:.1f}x vs stdlib)")
+
+
+if __name__ == "__main__":
+    main()
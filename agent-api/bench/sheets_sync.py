@@ -0,0 +1,124 @@
+"""
+Sheets Sync Benchmark
+
+Drives a stream of lead updates through SheetsSync against the fake
+Sheets API and reports write requests (vs one call per update), cells
+written, sync lag and throttling. Finishes by checking the sheet holds
+exactly one row per lead, with its latest values.
+
+Usage:
+    python -m bench.sheets_sync
+    python -m bench.sheets_sync --updates-per-minute 12000 --seconds 30 --lost-reply-rate 0.1
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+import metrics
+from integrations.fake_sheets import fake_sheets_client
+from integrations.sheets import COLUMNS, SheetsSync
+
+
+STATUSES = ("new", "contacted", "qualified", "nurture", "closed")
+
+
+def lead(i: int, version: int, rng: random.Random) -> dict:
+    score = rng.randint(0, 100)
+    return {
+        "lead_key": f"lead-{i:06d}",
+        "email": f"buyer{i}@company{i % 97}.com",
+        "company": f"Company {i % 97}",
+        "score": score,
+        "tier": "qualified" if score >= 70 else "nurture" if score >= 40 else "reject",
+        "segment": "enterprise" if i % 5 == 0 else "smb",
+        "status": STATUSES[version % len(STATUSES)],
+        "industry": "software",
+        "company_size": 500 if i % 5 == 0 else 50,
+        "updated_at": f"2026-01-01T00:00:{version % 60:02d}",
+    }
+
+
+async def main_async(args):
+    metrics.reset()
+    client, fake = fake_sheets_client(
+        writes_per_minute=args.quota,
+        lost_reply_rate=args.lost_reply_rate,
+        error_rate=args.error_rate,
+        seed=1,
+    )
+    sync = SheetsSync(client, per_minute=args.rpm, flush_seconds=args.flush_seconds)
+
+    rng = random.Random(1)
+    latest: dict[str, dict] = {}
+    updates = 0
+    total = int(args.updates_per_minute * args.seconds / 60)
+    interval = 60 / args.updates_per_minute
+    done = asyncio.Event()
+
+    async def produce():
+        nonlocal updates
+        started = time.monotonic()
+        for n in range(total):
+            row = lead(rng.randrange(args.leads), n, rng)
+            latest[row["lead_key"]] = row
+            sync.submit(row)
+            updates += 1
+            # Sleep in small batches to hold the target rate without a timer per update
+            if n % 50 == 49:
+                await asyncio.sleep(max(0.0, started + (n + 1) * interval - time.monotonic()))
+        done.set()
+
+    async def flush_loop():
+        while not done.is_set():
+            await asyncio.sleep(args.flush_seconds)
+            await sync._flush_with_retry()
+        await sync.drain()
+
+    started = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(produce(), flush_loop())
+    elapsed = time.monotonic() - started
+    await client.close()
+
+    lag = metrics.get_summary("sheets.lag_ms") or {}
+    print(f"updates submitted     {updates} at {args.updates_per_minute:.0f}/min, all synced after {elapsed:.1f}s")
+    print(f"distinct leads        {len(latest)}")
+    print(f"write requests        {fake.write_requests} "
+          f"(naive per-update: {updates}); throttled {fake.throttled}, failed {fake.failed}")
+    print(f"cells written         {fake.cells_written} "
+          f"(full rows per update: {updates * len(COLUMNS)})")
+    print(f"lag ms                p50 {lag.get('p50', 0):.0f}  p95 {lag.get('p95', 0):.0f}  max {lag.get('max', 0):.0f}")
+
+    rows = fake.read(f"A2:{chr(ord('A') + len(COLUMNS) - 1)}")
+    keys = [r[0] for r in rows if r]
+    mismatched = [
+        r[0] for r in rows
+        if r and (r + [""] * len(COLUMNS))[:len(COLUMNS)] != [latest[r[0]][c] for c in COLUMNS]
+    ]
+    ok = len(keys) == len(set(keys)) == len(latest) and not mismatched
+    print(f"sheet consistent      {'yes' if ok else 'NO'} "
+          f"({len(keys)} rows, {len(keys) - len(set(keys))} duplicates, {len(mismatched)} stale)")
+    if not ok:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sheets sync benchmark")
+    parser.add_argument("--leads", type=int, default=2000)
+    parser.add_argument("--updates-per-minute", type=float, default=6000)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--flush-seconds", type=float, default=2)
+    parser.add_argument("--rpm", type=int, default=50, help="Sync's write budget per minute")
+    parser.add_argument("--quota", type=int, default=60, help="Fake API's write quota per minute")
+    parser.add_argument("--lost-reply-rate", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Command Line Tools
+
+Usage:
+    python cli.py import leads.csv
+    python cli.py import leads.ndjson --checkpoint /var/lib/imports/leads.ckpt
+    python cli.py import leads.csv --restart      # ignore a previous checkpoint
+    python cli.py requalify --dry-run             # count leads a config change affects
+    python cli.py requalify
+    python cli.py config show                     # current rules and version
+    python cli.py config publish rules.json       # make rules live on every worker
+    python cli.py sheets-sync                     # mirror leads into the tracking sheet
+
+Imports stream the file through the lead import pipeline (see
+tools/lead_import.py) and resume from the last committed row if a
+previous run of the same file was interrupted.
+
+requalify re-tiers stored leads after SCORING_WEIGHTS or the
+thresholds in config.py change, recomputing only leads whose tier or
+segment can change (see tools/requalify.py).
+
+config publish records a rules file (same format as RUNTIME_CONFIG_PATH;
+keys left out keep their config.py defaults) in Postgres and notifies
+running workers, which swap to it without a restart (see
+scoring_config.py).
+
+sheets-sync follows the lead change feed and keeps the Google Sheets
+tracking sheet (SHEETS_SPREADSHEET_ID) in sync. Run exactly one: it
+decides which sheet row each new lead gets. It needs Redis to see the
+API workers' changes (see integrations/sheets.py).
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from tools.lead_import import FORMATS, ImportCheckpoint, ImportFormatError, ImportStats, import_file
+
+
+def run_import(args) -> int:
+    started = time.monotonic()
+    last_report = 0.0
+
+    def progress(stats: ImportStats) -> None:
+        nonlocal last_report
+        now = time.monotonic()
+        if now - last_report >= args.progress_seconds:
+            last_report = now
+            rate = stats.rows / max(now - started, 1e-9)
+            print(f"  {stats.rows} rows  {stats.imported} imported  {stats.invalid} invalid  "
+                  f"{stats.duplicates} duplicates  byte {stats.offset}  ({rate:.0f} rows/s)",
+                  flush=True)
+
+    checkpoint = ImportCheckpoint(args.checkpoint) if args.checkpoint else None
+    try:
+        stats = asyncio.run(import_file(args.path, args.format, checkpoint, args.restart, progress))
+    except (ImportFormatError, OSError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Import complete: {stats.rows} rows, {stats.imported} imported, "
+          f"{stats.invalid} invalid, {stats.duplicates} duplicates")
+    for error in stats.errors:
+        print(f"  {error}")
+    return 0
+
+
+def run_requalify(args) -> int:
+    from tools.requalify import requalify
+
+    plans = asyncio.run(requalify(dry_run=args.dry_run))
+    if not plans:
+        print("All scored leads are on the current scoring config")
+        return 0
+    verb = "candidates" if args.dry_run else "recomputed"
+    for plan in plans:
+        print(f"{plan.from_version} -> {plan.to_version}: {plan.leads} leads, {plan.recomputed} {verb}")
+        print(f"  score ranges {plan.score_ranges}  company_size ranges {plan.size_ranges}")
+    return 0
+
+
+def run_config(args) -> int:
+    from scoring_config import ScoringConfig, current_scoring_config, publish_config
+    from serialization import dumps, loads
+
+    if args.action == "show":
+        rules = current_scoring_config()
+        print(f"version {rules.version}")
+        print(dumps(rules.to_dict()).decode())
+        return 0
+
+    try:
+        with open(args.path, "rb") as f:
+            rules = ScoringConfig.from_dict(loads(f.read()))
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        print(f"Invalid config {args.path}: {e}", file=sys.stderr)
+        return 1
+    asyncio.run(publish_config(rules))
+    print(f"Published scoring config {rules.version}")
+    return 0
+
+
+def run_sheets_sync(args) -> int:
+    from config import settings
+    from integrations.sheets import get_sheets_sync
+
+    if not settings.SHEETS_SPREADSHEET_ID:
+        print("SHEETS_SPREADSHEET_ID is not set", file=sys.stderr)
+        return 1
+    print(f"Syncing leads to spreadsheet {settings.SHEETS_SPREADSHEET_ID} (Ctrl-C to stop)")
+    try:
+        asyncio.run(get_sheets_sync().run())
+    except KeyboardInterrupt:
+        # Unsaved changes are re-read from the feed cursor on the next start
+        pass
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lead Qualification Agent tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser("import", help="Stream a CSV/NDJSON lead file into the leads table")
+    imports.add_argument("path")
+    imports.add_argument("--format", choices=FORMATS, help="Default: from the file extension")
+    imports.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint)")
+    imports.add_argument("--restart", action="store_true", help="Discard the checkpoint and start over")
+    imports.add_argument("--progress-seconds", type=float, default=5.0)
+    imports.set_defaults(func=run_import)
+
+    requalify = commands.add_parser("requalify", help="Re-tier stored leads after a scoring config change")
+    requalify.add_argument("--dry-run", action="store_true", help="Only count affected leads")
+    requalify.set_defaults(func=run_requalify)
+
+    config = commands.add_parser("config", help="Show or publish the runtime scoring config")
+    config_actions = config.add_subparsers(dest="action", required=True)
+    config_actions.add_parser("show", help="Print the current rules and their version")
+    publish = config_actions.add_parser("publish", help="Record a rules file and notify workers")
+    publish.add_argument("path")
+    config.set_defaults(func=run_config)
+
+    sheets = commands.add_parser("sheets-sync", help="Mirror lead changes into the Google Sheets tracking sheet")
+    sheets.set_defaults(func=run_sheets_sync)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Students extend this as they add features.
 """
 
 import os
+import tempfile
 from typing import Optional
 
 
@@ -25,16 +26,147 @@ class Settings:
     # Redis
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+    # Encoding of cached values: "json" or "msgpack" (smaller in Redis);
+    # values in either encoding stay readable after a switch
+    CACHE_ENCODING: str = os.getenv("CACHE_ENCODING", "json")
+
     # Memory TTL (seconds)
     MEMORY_TTL_SECONDS: int = int(os.getenv("MEMORY_TTL_SECONDS", 90 * 24 * 60 * 60))  # 90 days
 
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 
+    # Production server (serve.py) - WEB_CONCURRENCY 0 means one worker per CPU
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", 8000))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 0))
+    SERVER_WORKER_TIMEOUT_SECONDS: int = int(os.getenv("SERVER_WORKER_TIMEOUT_SECONDS", 60))
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", 10000))
+
     # LLM Settings
     LLM_MODEL: str = os.getenv("LLM_MODEL", "gemini-2.0-flash")
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", 0.0))
     LLM_MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", 1000))
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://generativelanguage.googleapis.com")
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 20))
+
+    ANTHROPIC_MODEL: str = os.getenv("ANTHROPIC_MODEL", "claude-3-5-haiku-latest")
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com")
+
+    # LLM provider routing - USD per 1K tokens and per-provider concurrency
+    GEMINI_COST_PER_1K_INPUT: float = float(os.getenv("GEMINI_COST_PER_1K_INPUT", 0.0001))
+    GEMINI_COST_PER_1K_OUTPUT: float = float(os.getenv("GEMINI_COST_PER_1K_OUTPUT", 0.0004))
+    GEMINI_MAX_CONCURRENCY: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", 16))
+    ANTHROPIC_COST_PER_1K_INPUT: float = float(os.getenv("ANTHROPIC_COST_PER_1K_INPUT", 0.0008))
+    ANTHROPIC_COST_PER_1K_OUTPUT: float = float(os.getenv("ANTHROPIC_COST_PER_1K_OUTPUT", 0.004))
+    ANTHROPIC_MAX_CONCURRENCY: int = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", 8))
+
+    # LLM client resilience
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 2))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.25))
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+    LLM_HEDGE_MIN_DELAY_MS: float = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", 250))
+    LLM_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", 5))
+    LLM_BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30))
+
+    # Scoring prompt variant ("full" or "compact") and provider-side
+    # caching of the static system prompt prefix
+    SCORING_PROMPT_VARIANT: str = os.getenv("SCORING_PROMPT_VARIANT", "full")
+    LLM_PROMPT_CACHE_ENABLED: bool = os.getenv("LLM_PROMPT_CACHE_ENABLED", "true").lower() == "true"
+    LLM_PROMPT_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_PROMPT_CACHE_TTL_SECONDS", 3600))
+
+    # Seconds startup waits for LLM connection pools to warm up
+    LLM_WARMUP_TIMEOUT_SECONDS: float = float(os.getenv("LLM_WARMUP_TIMEOUT_SECONDS", 3))
+
+    # LLM governor - shared across all replicas via Redis
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+    LLM_MAX_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_MAX_REQUESTS_PER_MINUTE", 600))
+    LLM_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", 10))
+
+    # Inbound rate limits for POST /lead
+    RATE_LIMIT_LEADS_PER_KEY_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_LEADS_PER_KEY_PER_MINUTE", 120))
+    RATE_LIMIT_LEADS_PER_DOMAIN_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_LEADS_PER_DOMAIN_PER_MINUTE", 20))
+
+    # Email personalization (batch drafting)
+    EMAIL_PERSONALIZE_CONCURRENCY: int = int(os.getenv("EMAIL_PERSONALIZE_CONCURRENCY", 8))
+
+    # Near-duplicate lead detection (MinHash/LSH)
+    DEDUP_ENABLED: bool = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+    DEDUP_WINDOW_DAYS: int = int(os.getenv("DEDUP_WINDOW_DAYS", 90))
+    DEDUP_MAX_CANDIDATES: int = int(os.getenv("DEDUP_MAX_CANDIDATES", 32))
+
+    # Account resolution - full Public Suffix List file (optional; a
+    # built-in subset is used otherwise) and fuzzy company-name match
+    PUBLIC_SUFFIX_LIST_PATH: str = os.getenv("PUBLIC_SUFFIX_LIST_PATH", "")
+    ACCOUNT_NAME_MATCH_THRESHOLD: float = float(os.getenv("ACCOUNT_NAME_MATCH_THRESHOLD", 0.75))
+
+    # Task escalation sweeper
+    TASK_SWEEP_HORIZON_SECONDS: int = int(os.getenv("TASK_SWEEP_HORIZON_SECONDS", 300))
+    TASK_SWEEP_BATCH_SIZE: int = int(os.getenv("TASK_SWEEP_BATCH_SIZE", 1000))
+
+    # Streaming lead import (cli.py import, POST /leads/import) - rows per
+    # batch, batches buffered between stages, and resume checkpoints
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", 500))
+    IMPORT_QUEUE_BATCHES: int = int(os.getenv("IMPORT_QUEUE_BATCHES", 4))
+    IMPORT_CHECKPOINT_DIR: str = os.getenv(
+        "IMPORT_CHECKPOINT_DIR",
+        os.path.join(tempfile.gettempdir(), "lead-imports")
+    )
+
+    # GET /lead/{lead_key} read-through cache (tools/upsert_lead.py);
+    # writes invalidate, the TTL bounds staleness from racing readers.
+    # Unknown keys are cached briefly so polling for a new lead is cheap.
+    LEAD_CACHE_TTL_SECONDS: int = int(os.getenv("LEAD_CACHE_TTL_SECONDS", 300))
+    LEAD_CACHE_MISS_TTL_SECONDS: int = int(os.getenv("LEAD_CACHE_MISS_TTL_SECONDS", 5))
+
+    # Lead change feed (events.py, GET /events) - Redis Stream key and
+    # approximate retention; the in-process fallback (no Redis) keeps
+    # fewer events
+    EVENT_STREAM_KEY: str = os.getenv("EVENT_STREAM_KEY", "lead_events")
+    EVENT_STREAM_MAXLEN: int = int(os.getenv("EVENT_STREAM_MAXLEN", 1_000_000))
+    EVENT_LOCAL_BUFFER: int = int(os.getenv("EVENT_LOCAL_BUFFER", 50_000))
+
+    # Google Sheets tracking sheet sync (integrations/sheets.py, run by
+    # cli.py sheets-sync). Writes are coalesced and sent at most every
+    # SHEETS_FLUSH_SECONDS, within the per-minute quota (Sheets allows
+    # 60 write requests/minute per user by default).
+    GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID", "")
+    GOOGLE_CLIENT_SECRET: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
+    GOOGLE_REFRESH_TOKEN: str = os.getenv("GOOGLE_REFRESH_TOKEN", "")
+    SHEETS_SPREADSHEET_ID: str = os.getenv("SHEETS_SPREADSHEET_ID", "")
+    SHEETS_SHEET_NAME: str = os.getenv("SHEETS_SHEET_NAME", "Leads")
+    SHEETS_API_URL: str = os.getenv("SHEETS_API_URL", "https://sheets.googleapis.com")
+    SHEETS_TOKEN_URL: str = os.getenv("SHEETS_TOKEN_URL", "https://oauth2.googleapis.com/token")
+    SHEETS_WRITE_REQUESTS_PER_MINUTE: int = int(os.getenv("SHEETS_WRITE_REQUESTS_PER_MINUTE", 50))
+    SHEETS_FLUSH_SECONDS: float = float(os.getenv("SHEETS_FLUSH_SECONDS", 2))
+    SHEETS_MAX_ROWS_PER_REQUEST: int = int(os.getenv("SHEETS_MAX_ROWS_PER_REQUEST", 2000))
+
+    # Lead scheduler (scheduler.py) - leads run through the agent at once
+    # per process, and how long /lead waits for a slot before a 503.
+    # Lanes and their shares are in LEAD_LANES below.
+    LEAD_SCHEDULER_CONCURRENCY: int = int(os.getenv("LEAD_SCHEDULER_CONCURRENCY", 16))
+    LEAD_SCHEDULER_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("LEAD_SCHEDULER_QUEUE_TIMEOUT_SECONDS", 10))
+
+    # Agent pools (dispatcher.py) - enterprise-segment leads go to the
+    # specialist agent, everything else to the lean SMB agent. Per pool:
+    # leads run at once per process, model per LLM provider, scoring
+    # prompt variant and result cache TTL. The SMB pool uses LLM_MODEL /
+    # ANTHROPIC_MODEL and keeps results for the dedupe window.
+    ENTERPRISE_POOL_CONCURRENCY: int = int(os.getenv("ENTERPRISE_POOL_CONCURRENCY", 4))
+    ENTERPRISE_LLM_MODEL: str = os.getenv("ENTERPRISE_LLM_MODEL", "gemini-2.5-pro")
+    ENTERPRISE_ANTHROPIC_MODEL: str = os.getenv("ENTERPRISE_ANTHROPIC_MODEL", "claude-3-5-sonnet-latest")
+    ENTERPRISE_PROMPT_VARIANT: str = os.getenv("ENTERPRISE_PROMPT_VARIANT", "full")
+    ENTERPRISE_RESULT_CACHE_TTL_SECONDS: int = int(os.getenv("ENTERPRISE_RESULT_CACHE_TTL_SECONDS", 24 * 60 * 60))
+    SMB_POOL_CONCURRENCY: int = int(os.getenv("SMB_POOL_CONCURRENCY", 12))
+    SMB_PROMPT_VARIANT: str = os.getenv("SMB_PROMPT_VARIANT", "compact")
+
+    # Runtime scoring config (scoring_config.py) - optional JSON file
+    # overriding the weights/thresholds/approval rules/prompts below,
+    # re-read when it changes. Without it, workers follow the config
+    # published to Postgres.
+    RUNTIME_CONFIG_PATH: str = os.getenv("RUNTIME_CONFIG_PATH", "")
+    RUNTIME_CONFIG_POLL_SECONDS: float = float(os.getenv("RUNTIME_CONFIG_POLL_SECONDS", 5))
 
 
 # Scoring thresholds
@@ -58,6 +190,16 @@ APPROVAL_REQUIRED_ACTIONS = {
     "mark_spam": True,
 }
 
+# Lead scheduler lanes: (weight, reserved slots). Busy lanes share
+# LEAD_SCHEDULER_CONCURRENCY in proportion to weight; reserved slots are
+# never taken by other lanes, so a lane always starts work immediately
+# while under its reservation.
+LEAD_LANES = {
+    "hot": (6, 2),       # inbound enterprise / executive / urgent leads
+    "standard": (3, 1),  # other inbound leads
+    "bulk": (1, 0),      # imports
+}
+
 # Required lead fields
 REQUIRED_FIELDS = ["email", "company", "need", "timeline"]
 
@@ -7,8 +7,8 @@ Students implement this in Week 4.
 
 from typing import Optional, List
 from datetime import datetime
-import json
 from config import settings
+from serialization import dumps_str, loads
 
 
 # Database connection placeholder
@@ -56,7 +56,9 @@ async def log_trace(
     approval_required: bool = False,
     approval_reason: Optional[str] = None,
     error: Optional[str] = None,
-    token_usage: Optional[dict] = None
+    token_usage: Optional[dict] = None,
+    config_version: Optional[str] = None,
+    route: Optional[dict] = None
 ) -> bool:
     """
     Log an agent execution trace.
@@ -77,10 +79,19 @@ async def log_trace(
         approval_reason: Why approval was needed
         error: Any error that occurred
         token_usage: LLM token usage for cost tracking
+            (input_tokens, output_tokens, cost_usd - rolled up for GET /stats)
+        config_version: Scoring config the lead was processed under
+            (default: the current one)
+        route: Agent pool routing decision and per-pool timings
+            (pool, reason, wait_ms, run_ms - see dispatcher.py)
 
     Returns:
         True if logged successfully
     """
+    if config_version is None:
+        from scoring_config import current_scoring_config
+        config_version = current_scoring_config().version
+
     trace = {
         "trace_id": trace_id,
         "lead_key": lead_key,
@@ -92,14 +103,16 @@ async def log_trace(
         "approval_reason": approval_reason,
         "error": error,
         "token_usage": token_usage,
+        "config_version": config_version,
+        "route": route,
     }
 
     # TODO: Implement in Week 4
     # conn = await get_db_connection()
     # await conn.execute("""
-    #     INSERT INTO traces (trace_id, lead_key, data, created_at)
-    #     VALUES ($1, $2, $3, NOW())
-    # """, trace_id, lead_key, json.dumps(trace))
+    #     INSERT INTO traces (trace_id, lead_key, config_version, route, data, created_at)
+    #     VALUES ($1, $2, $3, $4, $5, NOW())
+    # """, trace_id, lead_key, config_version, dumps_str(route), dumps_str(trace))
 
     print(f"[PLACEHOLDER] Would log trace: {trace_id}")
     return True
@@ -155,3 +168,705 @@ async def get_trace_by_id(trace_id: str) -> Optional[dict]:
     # TODO: Implement in Week 4
     print(f"[PLACEHOLDER] Would retrieve trace: {trace_id}")
     return None
+
+
+# --- Leads ---
+
+# Columns written by upsert_leads, in statement order
+LEAD_UPSERT_COLUMNS = (
+    "lead_key", "email", "company", "title", "need", "timeline", "budget",
+    "company_size", "industry", "score", "tier", "segment", "notes", "config_version",
+)
+
+async def fetch_lead_row(lead_key: str) -> Optional[dict]:
+    """
+    Get a lead by key (primary key lookup).
+
+    Args:
+        lead_key: The unique lead identifier
+
+    Returns:
+        Lead columns as a dict, or None if not found
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would lookup lead: {lead_key}")
+        return None
+
+    row = await conn.fetchrow("SELECT * FROM leads WHERE lead_key = $1", lead_key)
+    return dict(row) if row is not None else None
+
+
+# Per-criterion score columns (leads.crit_<name>)
+CRITERIA_COLUMNS = ("industry_fit", "budget", "authority", "need", "timeline", "company_size")
+
+# Existing leads keep their status and created_at; scoring fields are overwritten
+_LEAD_UPSERT_CONFLICT = """ON CONFLICT (lead_key) DO UPDATE SET
+            company = EXCLUDED.company, title = EXCLUDED.title, need = EXCLUDED.need,
+            timeline = EXCLUDED.timeline, budget = EXCLUDED.budget,
+            company_size = EXCLUDED.company_size, industry = EXCLUDED.industry,
+            score = EXCLUDED.score, tier = EXCLUDED.tier, segment = EXCLUDED.segment,
+            notes = EXCLUDED.notes, config_version = EXCLUDED.config_version,
+            crit_industry_fit = EXCLUDED.crit_industry_fit, crit_budget = EXCLUDED.crit_budget,
+            crit_authority = EXCLUDED.crit_authority, crit_need = EXCLUDED.crit_need,
+            crit_timeline = EXCLUDED.crit_timeline, crit_company_size = EXCLUDED.crit_company_size"""
+
+# Column types of LEAD_UPSERT_COLUMNS, then the crit_* columns
+_LEAD_COLUMN_TYPES = (
+    "varchar", "varchar", "varchar", "varchar", "text", "varchar", "varchar",
+    "int", "varchar", "int", "varchar", "varchar", "text", "varchar",
+) + ("smallint",) * len(CRITERIA_COLUMNS)
+
+
+async def upsert_leads(rows: list) -> int:
+    """
+    Insert or update a batch of lead rows in one statement.
+
+    Each column is sent as one array and expanded with unnest(), so a
+    batch is a single round trip and a single plan regardless of size.
+    Existing leads keep their status and created_at; scoring fields
+    are overwritten. A batch must not contain the same lead_key twice.
+
+    Args:
+        rows: Objects with LEAD_UPSERT_COLUMNS attributes and a
+              criteria_scores dict (e.g. records.LeadRowRecord)
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would upsert {len(rows)} leads")
+        return len(rows)
+
+    columns = [[getattr(row, name) for row in rows] for name in LEAD_UPSERT_COLUMNS]
+    columns += [
+        [(row.criteria_scores or {}).get(name) for row in rows]
+        for name in CRITERIA_COLUMNS
+    ]
+    await conn.execute(f"""
+        INSERT INTO leads (lead_key, email, company, title, need, timeline, budget,
+                           company_size, industry, score, tier, segment, notes, config_version,
+                           crit_industry_fit, crit_budget, crit_authority, crit_need,
+                           crit_timeline, crit_company_size)
+        SELECT * FROM unnest(
+            $1::varchar[], $2::varchar[], $3::varchar[], $4::varchar[], $5::text[],
+            $6::varchar[], $7::varchar[], $8::int[], $9::varchar[], $10::int[],
+            $11::varchar[], $12::varchar[], $13::text[], $14::varchar[],
+            $15::smallint[], $16::smallint[], $17::smallint[], $18::smallint[],
+            $19::smallint[], $20::smallint[]
+        )
+        {_LEAD_UPSERT_CONFLICT}
+    """, *columns)
+    return len(rows)
+
+
+# --- Scoring config snapshots / re-qualification ---
+
+async def record_config_snapshot(version: str, rules: dict) -> bool:
+    """
+    Store a scoring rules snapshot (no-op if the version exists).
+
+    Args:
+        version: ScoringConfig.version
+        rules: ScoringConfig.to_dict()
+
+    Returns:
+        True if stored (or already present)
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would record scoring config {version}")
+        return True
+
+    await conn.execute("""
+        INSERT INTO config_snapshots (version, rules) VALUES ($1, $2)
+        ON CONFLICT (version) DO NOTHING
+    """, version, dumps_str(rules))
+    return True
+
+
+async def fetch_config_snapshot(version: str) -> Optional[dict]:
+    """Rules of a recorded scoring config version, or None."""
+    conn = await get_db_connection()
+    if conn is None:
+        return None
+
+    rules = await conn.fetchval("SELECT rules FROM config_snapshots WHERE version = $1", version)
+    return loads(rules) if rules is not None else None
+
+
+async def activate_config_snapshot(version: str) -> bool:
+    """
+    Make a recorded snapshot the active config and NOTIFY workers on
+    the scoring_config channel (payload: the version).
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would activate scoring config {version}")
+        return True
+
+    async with conn.transaction():
+        await conn.execute(
+            "UPDATE config_snapshots SET activated_at = NOW() WHERE version = $1", version
+        )
+        # Delivered on commit, so listeners always find the row
+        await conn.execute("SELECT pg_notify('scoring_config', $1)", version)
+    return True
+
+
+async def fetch_active_config_version() -> Optional[str]:
+    """Version most recently activated with activate_config_snapshot, or None."""
+    conn = await get_db_connection()
+    if conn is None:
+        return None
+
+    return await conn.fetchval("""
+        SELECT version FROM config_snapshots
+        WHERE activated_at IS NOT NULL
+        ORDER BY activated_at DESC LIMIT 1
+    """)
+
+
+async def listen_config_changes(callback) -> bool:
+    """
+    Call callback(version) for every scoring_config NOTIFY.
+
+    Uses its own connection, since a LISTEN holds the connection.
+
+    Returns:
+        False if Postgres is not available
+    """
+    if await get_db_connection() is None:
+        return False
+
+    import asyncpg
+    listener = await asyncpg.connect(settings.DATABASE_URL)
+    await listener.add_listener(
+        "scoring_config", lambda _conn, _pid, _channel, payload: callback(payload)
+    )
+    return True
+
+
+async def count_leads_by_config_version() -> dict:
+    """Number of scored leads per config_version (index-only via idx_leads_config_version)."""
+    conn = await get_db_connection()
+    if conn is None:
+        print("[PLACEHOLDER] Would count leads by config version")
+        return {}
+
+    rows = await conn.fetch("""
+        SELECT config_version, COUNT(*) AS leads FROM leads
+        WHERE config_version IS NOT NULL
+        GROUP BY config_version
+    """)
+    return {row["config_version"]: row["leads"] for row in rows}
+
+
+async def requalify_leads(
+    from_version: str,
+    to_version: str,
+    score_ranges: List[tuple],
+    size_ranges: List[tuple],
+    weights: dict,
+    tier_bounds: List[tuple],
+    segment_bounds: List[tuple],
+    dry_run: bool = False
+) -> tuple[int, List[str]]:
+    """
+    Recompute score, tier and segment for leads that may change.
+
+    Only rows of from_version whose stored score falls in score_ranges
+    (an idx_leads_score range scan) or whose company_size falls in
+    size_ranges are touched; the new score is recomputed from the
+    crit_* columns, so no LLM call is involved. Recomputed rows move to
+    to_version. Rows without criteria columns (or needs_info) are left
+    alone, since they can't be recomputed.
+
+    Args:
+        from_version: Config version the rows were scored under
+        to_version: New config version
+        score_ranges: Inclusive (low, high) stored-score ranges to recheck
+        size_ranges: Inclusive (low, high) company_size ranges (high None = unbounded)
+        weights: Criterion -> weight under the new config
+        tier_bounds: (lowest score, tier) pairs, ascending
+        segment_bounds: (lowest company_size, segment) pairs, ascending
+        dry_run: Count the candidate rows without updating
+
+    Returns:
+        (rows recomputed - or candidates, for a dry run -, lead_keys
+        whose score, tier or segment actually changed)
+    """
+    if not score_ranges and not size_ranges:
+        return 0, []
+
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would requalify leads {from_version} -> {to_version} "
+              f"(score ranges {score_ranges}, size ranges {size_ranges})")
+        return 0, []
+
+    args = [from_version]
+
+    def param(value) -> str:
+        args.append(value)
+        return f"${len(args)}"
+
+    ranges = [f"score BETWEEN {param(low)} AND {param(high)}" for low, high in score_ranges]
+    ranges += [
+        f"company_size >= {param(low)}" + ("" if high is None else f" AND company_size <= {param(high)}")
+        for low, high in size_ranges
+    ]
+    where = f"""
+        config_version = $1 AND tier <> 'needs_info'
+        AND {' AND '.join(f'crit_{name} IS NOT NULL' for name in weights)}
+        AND ({' OR '.join(f'({r})' for r in ranges)})
+    """
+    if dry_run:
+        return await conn.fetchval(f"SELECT COUNT(*) FROM leads WHERE {where}", *args), []
+
+    new_score = "FLOOR((" + " + ".join(
+        f"crit_{name} * {param(weight)}::int" for name, weight in weights.items()
+    ) + ") / 100.0)::int"
+    tier = "CASE " + " ".join(
+        f"WHEN r.new_score >= {param(low)}::int THEN {param(name)}::varchar"
+        for low, name in reversed(tier_bounds[1:])
+    ) + f" ELSE {param(tier_bounds[0][1])}::varchar END"
+    segment = "CASE " + " ".join(
+        f"WHEN COALESCE(r.company_size, 0) >= {param(low)}::int THEN {param(name)}::varchar"
+        for low, name in reversed(segment_bounds[1:])
+    ) + f" ELSE {param(segment_bounds[0][1])}::varchar END"
+
+    row = await conn.fetchrow(f"""
+        WITH updated AS (
+            UPDATE leads SET score = r.new_score, tier = {tier}, segment = {segment},
+                             config_version = {param(to_version)}
+            FROM (
+                SELECT id, company_size, score AS old_score, tier AS old_tier,
+                       segment AS old_segment, {new_score} AS new_score
+                FROM leads WHERE {where}
+            ) r
+            WHERE leads.id = r.id
+            RETURNING leads.lead_key,
+                      (leads.score, leads.tier, leads.segment)
+                      IS DISTINCT FROM (r.old_score, r.old_tier, r.old_segment) AS changed
+        )
+        SELECT COUNT(*) AS recomputed,
+               COALESCE(array_agg(lead_key) FILTER (WHERE changed), '{{}}') AS changed
+        FROM updated
+    """, *args)
+    return row["recomputed"], list(row["changed"])
+
+
+# --- Pipeline analytics ---
+
+async def fetch_pipeline_stats(since: datetime) -> dict:
+    """
+    Funnel, outcome and cost totals since an hour boundary.
+
+    Reads only the hourly rollup tables (see db/init.sql), which the
+    leads/traces/approvals write statements keep current, so the cost
+    depends on the window length, not on the size of the base tables.
+
+    Args:
+        since: Start of the window (rounded down to the hour by the caller)
+
+    Returns:
+        Dict with leads, traces and approvals totals broken down by
+        dimension, plus an hourly series
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print("[PLACEHOLDER] Would read pipeline rollups")
+        return _shape_stats(since, [], [], [], [], [])
+
+    # GROUPING SETS: one row per dimension value plus the grand total. Rollup
+    # dimensions are NOT NULL, so a NULL marks a column aggregated away.
+    lead_rows = await conn.fetch("""
+        SELECT tier, segment, industry, status, SUM(leads) AS leads, SUM(score_sum) AS score_sum
+        FROM lead_rollup_hourly WHERE bucket >= $1
+        GROUP BY GROUPING SETS ((tier), (segment), (industry), (status), ())
+    """, since)
+    trace_rows = await conn.fetch("""
+        SELECT tier, approval, SUM(traces) AS traces, SUM(errors) AS errors,
+               SUM(score_sum) AS score_sum, SUM(input_tokens) AS input_tokens,
+               SUM(output_tokens) AS output_tokens, SUM(cost_usd) AS cost_usd
+        FROM trace_rollup_hourly WHERE bucket >= $1
+        GROUP BY GROUPING SETS ((tier), (approval), ())
+    """, since)
+    approval_rows = await conn.fetch("""
+        SELECT action_type, status, SUM(approvals) AS approvals
+        FROM approval_rollup_hourly WHERE bucket >= $1
+        GROUP BY GROUPING SETS ((action_type), (status))
+    """, since)
+    lead_hours = await conn.fetch("""
+        SELECT bucket, tier, SUM(leads) AS leads
+        FROM lead_rollup_hourly WHERE bucket >= $1
+        GROUP BY bucket, tier
+    """, since)
+    trace_hours = await conn.fetch("""
+        SELECT bucket, SUM(traces) AS traces, SUM(cost_usd) AS cost_usd
+        FROM trace_rollup_hourly WHERE bucket >= $1
+        GROUP BY bucket
+    """, since)
+    return _shape_stats(since, lead_rows, trace_rows, approval_rows, lead_hours, trace_hours)
+
+
+def _shape_stats(since, lead_rows, trace_rows, approval_rows, lead_hours, trace_hours) -> dict:
+    def by(rows, column, measure):
+        counts = {row[column]: int(row[measure]) for row in rows if row[column] is not None}
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def total(rows, columns):
+        return next((row for row in rows if all(row[c] is None for c in columns)), None)
+
+    def avg(score_sum, count):
+        return round(score_sum / count, 1) if count else None
+
+    leads = total(lead_rows, ("tier", "segment", "industry", "status"))
+    lead_count = int(leads["leads"]) if leads else 0
+    traces = total(trace_rows, ("tier", "approval"))
+    trace_count = int(traces["traces"]) if traces else 0
+
+    hourly: dict = {}
+    for row in lead_hours:
+        hour = hourly.setdefault(row["bucket"], {"leads": 0, "by_tier": {}, "traces": 0, "cost_usd": 0.0})
+        hour["leads"] += int(row["leads"])
+        hour["by_tier"][row["tier"]] = int(row["leads"])
+    for row in trace_hours:
+        hour = hourly.setdefault(row["bucket"], {"leads": 0, "by_tier": {}, "traces": 0, "cost_usd": 0.0})
+        hour["traces"] = int(row["traces"])
+        hour["cost_usd"] = float(row["cost_usd"])
+
+    return {
+        "since": since.isoformat(),
+        "leads": {
+            "total": lead_count,
+            "avg_score": avg(int(leads["score_sum"]), lead_count) if leads else None,
+            "by_tier": by(lead_rows, "tier", "leads"),
+            "by_segment": by(lead_rows, "segment", "leads"),
+            "by_industry": by(lead_rows, "industry", "leads"),
+            "by_status": by(lead_rows, "status", "leads"),
+        },
+        "traces": {
+            "total": trace_count,
+            "errors": int(traces["errors"]) if traces else 0,
+            "avg_score": avg(int(traces["score_sum"]), trace_count) if traces else None,
+            "input_tokens": int(traces["input_tokens"]) if traces else 0,
+            "output_tokens": int(traces["output_tokens"]) if traces else 0,
+            "cost_usd": float(traces["cost_usd"]) if traces else 0.0,
+            "by_tier": by(trace_rows, "tier", "traces"),
+            "by_approval": by(trace_rows, "approval", "traces"),
+        },
+        "approvals": {
+            "by_status": by(approval_rows, "status", "approvals"),
+            "by_action_type": by(approval_rows, "action_type", "approvals"),
+        },
+        "hourly": [{"bucket": bucket.isoformat(), **hourly[bucket]} for bucket in sorted(hourly)],
+    }
+
+
+# --- Approvals ---
+
+async def insert_approval_request(request: dict) -> bool:
+    """
+    Store a pending approval request, so any worker can decide it.
+
+    Idempotent on action_id.
+
+    Args:
+        request: Request fields (action_id, action_type, lead_key,
+                 reason, context, prepared, requested_at)
+
+    Returns:
+        True if stored (False without a database - the caller keeps it)
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would insert approval request: {request['action_id']}")
+        return False
+
+    await conn.execute("""
+        INSERT INTO approvals (action_id, action_type, lead_key, reason, context, prepared, requested_at)
+        VALUES ($1, $2, $3, $4, $5::jsonb, $6::jsonb, $7)
+        ON CONFLICT (action_id) DO NOTHING
+    """, request["action_id"], request["action_type"], request["lead_key"], request["reason"],
+        dumps_str(request.get("context")), dumps_str(request.get("prepared")), request["requested_at"])
+    return True
+
+
+async def fetch_approval_request(action_id: str) -> Optional[dict]:
+    """
+    Get an approval request by ID, with context and prepared work decoded.
+
+    Returns:
+        Request columns as a dict, or None if not found
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        return None
+
+    row = await conn.fetchrow("""
+        SELECT action_id, action_type, lead_key, reason, context, prepared, status, requested_at
+        FROM approvals WHERE action_id = $1
+    """, action_id)
+    if row is None:
+        return None
+    request = dict(row)
+    for column in ("context", "prepared"):
+        if request[column] is not None:
+            request[column] = loads(request[column])
+    return request
+
+
+async def reject_approval_request(action_id: str, notes: Optional[str] = None) -> bool:
+    """
+    Mark a pending approval request rejected and drop its prepared work.
+
+    Returns:
+        True if this call rejected it (False if it was already decided)
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would reject approval request: {action_id}")
+        return True
+
+    decided = await conn.fetchval("""
+        UPDATE approvals
+        SET status = 'rejected', decided_at = NOW(), decision_notes = $2, prepared = NULL
+        WHERE action_id = $1 AND status = 'pending'
+        RETURNING action_id
+    """, action_id, notes)
+    return decided is not None
+
+
+async def commit_approved_action(
+    action_id: str,
+    notes: Optional[str] = None,
+    lead_row=None,
+    task: Optional[dict] = None,
+    draft: Optional[dict] = None
+) -> bool:
+    """
+    Approve a pending request and apply its prepared writes in one statement.
+
+    The decision, the lead upsert, the task insert and the draft insert
+    are chained data-modifying CTEs, so approving is one round trip and
+    one transaction. The request's prepared work is cleared as it is
+    committed. The writes only happen if this call moved the request
+    from pending to approved; a repeated or concurrent approval of the
+    same action_id (from any worker) writes nothing.
+
+    Args:
+        action_id: The approval request ID (see insert_approval_request)
+        notes: Optional notes from the approver
+        lead_row: Lead row to upsert (e.g. records.LeadRowRecord), if any
+        task: Task fields as for insert_task, if any
+        draft: Email draft to store for review, if any (lead_key plus
+               tools.draft_email.draft_to_dict fields)
+
+    Returns:
+        True if this call approved the action
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would commit approved action: {action_id}"
+              f" (lead: {lead_row is not None}, task: {task is not None}, draft: {draft is not None})")
+        return True
+
+    args = []
+
+    def param(value, cast: str = "") -> str:
+        args.append(value)
+        return f"${len(args)}" + (f"::{cast}" if cast else "")
+
+    ctes = [f"""decision AS (
+            UPDATE approvals
+            SET status = 'approved', decided_at = NOW(), decision_notes = {param(notes)}, prepared = NULL
+            WHERE action_id = {param(action_id)} AND status = 'pending'
+            RETURNING action_id
+        )"""]
+    if lead_row is not None:
+        values = [getattr(lead_row, name) for name in LEAD_UPSERT_COLUMNS]
+        values += [(lead_row.criteria_scores or {}).get(name) for name in CRITERIA_COLUMNS]
+        ctes.append(f"""lead AS (
+            INSERT INTO leads ({", ".join(LEAD_UPSERT_COLUMNS + tuple(f"crit_{name}" for name in CRITERIA_COLUMNS))})
+            SELECT {", ".join(param(value, cast) for value, cast in zip(values, _LEAD_COLUMN_TYPES))}
+            FROM decision
+            {_LEAD_UPSERT_CONFLICT}
+        )""")
+    if task is not None:
+        ctes.append(f"""task AS (
+            INSERT INTO tasks (task_id, lead_key, task_type, title, priority, assigned_to, due_date)
+            SELECT {param(task["task_id"], "varchar")}, {param(task["lead_key"], "varchar")},
+                   {param(task["task_type"], "varchar")}, {param(task["title"], "varchar")},
+                   {param(task["priority"], "varchar")}, {param(task.get("assigned_to"), "varchar")},
+                   {param(task["due_date"], "timestamptz")}
+            FROM decision
+            ON CONFLICT (task_id) DO NOTHING
+        )""")
+    if draft is not None:
+        ctes.append(f"""draft AS (
+            INSERT INTO email_drafts (draft_id, lead_key, to_email, subject, body,
+                                      template_type, template_version, personalized)
+            SELECT {param(draft["draft_id"], "varchar")}, {param(draft["lead_key"], "varchar")},
+                   {param(draft["to"], "varchar")}, {param(draft["subject"], "text")},
+                   {param(draft["body"], "text")}, {param(draft["template_type"], "varchar")},
+                   {param(draft.get("template_version"), "int")}, {param(draft.get("personalized", False), "boolean")}
+            FROM decision
+            ON CONFLICT (draft_id) DO NOTHING
+        )""")
+    approved = await conn.fetchval(
+        f"WITH {', '.join(ctes)} SELECT COUNT(*) FROM decision", *args
+    )
+    return approved > 0
+
+
+# --- Tasks ---
+
+async def insert_task(task: dict) -> bool:
+    """
+    Insert a follow-up task.
+
+    Idempotent on task_id.
+
+    Args:
+        task: Task fields (task_id, lead_key, task_type, title,
+              priority, assigned_to, due_date)
+
+    Returns:
+        True if stored successfully
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would insert task: {task['task_id']}")
+        return True
+
+    await conn.execute("""
+        INSERT INTO tasks (task_id, lead_key, task_type, title, priority, assigned_to, due_date)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+        ON CONFLICT (task_id) DO NOTHING
+    """, task["task_id"], task["lead_key"], task["task_type"], task["title"],
+        task["priority"], task.get("assigned_to"), task["due_date"])
+    return True
+
+
+async def fetch_pending_tasks(
+    lead_key: Optional[str] = None,
+    due_before: Optional[datetime] = None,
+    limit: int = 100
+) -> List[dict]:
+    """
+    Fetch pending tasks ordered by due date.
+
+    Both query shapes are index range scans:
+    - by lead: idx_tasks_lead_key
+    - by due date: idx_tasks_status_due_date
+
+    Args:
+        lead_key: Optional filter by lead
+        due_before: Optional upper bound on due date
+        limit: Maximum number of tasks
+
+    Returns:
+        List of task dictionaries
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would fetch pending tasks (limit={limit})")
+        return []
+
+    if lead_key:
+        rows = await conn.fetch("""
+            SELECT * FROM tasks
+            WHERE lead_key = $1 AND status = 'pending'
+            ORDER BY due_date
+            LIMIT $2
+        """, lead_key, limit)
+    else:
+        rows = await conn.fetch("""
+            SELECT * FROM tasks
+            WHERE status = 'pending' AND due_date <= $1
+            ORDER BY due_date
+            LIMIT $2
+        """, due_before or datetime.max, limit)
+    return [dict(row) for row in rows]
+
+
+async def fetch_escalation_candidates(until: datetime, limit: int) -> List[dict]:
+    """
+    Fetch open, not-yet-escalated tasks due before a cutoff.
+
+    Served by the partial index idx_tasks_escalation_due, so already
+    escalated tasks are never rescanned.
+
+    Args:
+        until: Due date cutoff
+        limit: Maximum number of tasks
+
+    Returns:
+        List of dictionaries with task_id, lead_key and due_date
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        return []
+
+    rows = await conn.fetch("""
+        SELECT task_id, lead_key, due_date, priority FROM tasks
+        WHERE status = 'pending' AND escalated_at IS NULL AND due_date <= $1
+        ORDER BY due_date
+        LIMIT $2
+    """, until, limit)
+    return [dict(row) for row in rows]
+
+
+async def mark_tasks_escalated(task_ids: List[str]) -> List[str]:
+    """
+    Mark tasks as escalated.
+
+    Tasks already escalated (e.g. by another worker) are skipped, so
+    concurrent sweepers never escalate the same task twice.
+
+    Args:
+        task_ids: Tasks to mark
+
+    Returns:
+        IDs of the tasks this call marked
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would mark {len(task_ids)} tasks escalated")
+        return list(task_ids)
+
+    rows = await conn.fetch("""
+        UPDATE tasks SET escalated_at = NOW()
+        WHERE task_id = ANY($1::varchar[]) AND escalated_at IS NULL
+        RETURNING task_id
+    """, task_ids)
+    return [row["task_id"] for row in rows]
+
+
+async def mark_task_completed(task_id: str, notes: Optional[str] = None) -> bool:
+    """
+    Mark a task as completed.
+
+    Args:
+        task_id: The task identifier
+        notes: Optional completion notes
+
+    Returns:
+        True if a pending task was updated
+    """
+    conn = await get_db_connection()
+    if conn is None:
+        print(f"[PLACEHOLDER] Would complete task: {task_id}")
+        return True
+
+    result = await conn.execute("""
+        UPDATE tasks SET status = 'completed', completed_at = NOW(), notes = COALESCE($2, notes)
+        WHERE task_id = $1 AND status = 'pending'
+    """, task_id, notes)
+    return result.endswith(" 1")
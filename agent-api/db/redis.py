@@ -6,8 +6,8 @@ Students implement this in Week 5.
 """
 
 from typing import Optional, Any
-import json
 from config import settings
+from serialization import encode_cache, decode_cache
 
 
 # Redis connection placeholder
@@ -46,7 +46,7 @@ def cache_get(key: str) -> Optional[Any]:
     # r = get_redis_connection()
     # value = r.get(key)
     # if value:
-    #     return json.loads(value)
+    #     return decode_cache(value)
     # return None
 
     print(f"[PLACEHOLDER] Would get cache key: {key}")
@@ -63,7 +63,8 @@ def cache_set(
 
     Args:
         key: Cache key
-        value: Value to cache (will be JSON serialized)
+        value: Value to cache (JSON-compatible or a pydantic model;
+            encoded per settings.CACHE_ENCODING)
         ttl_seconds: Time-to-live in seconds (default from settings)
 
     Returns:
@@ -74,7 +75,7 @@ def cache_set(
 
     # TODO: Implement in Week 5
     # r = get_redis_connection()
-    # r.setex(key, ttl_seconds, json.dumps(value))
+    # r.setex(key, ttl_seconds, encode_cache(value))
 
     print(f"[PLACEHOLDER] Would set cache key: {key} (TTL: {ttl_seconds}s)")
     return True
@@ -134,27 +135,203 @@ def cache_keys(pattern: str) -> list[str]:
     return []
 
 
-def cache_increment(key: str, amount: int = 1) -> int:
+def cache_increment(key: str, amount: int = 1, ttl_seconds: Optional[int] = None) -> int:
     """
     Increment a counter in cache.
 
-    Useful for rate limiting (Week 10).
+    Useful for rate limiting (Week 10). When ttl_seconds is given the
+    expiry is set in the same round trip, so fixed-window counters
+    never leak keys.
 
     Args:
         key: Cache key
         amount: Amount to increment by
+        ttl_seconds: Optional expiry applied with the increment
 
     Returns:
         New counter value
     """
     # TODO: Implement in Week 5
     # r = get_redis_connection()
-    # return r.incr(key, amount)
+    # if ttl_seconds is None:
+    #     return r.incr(key, amount)
+    # return eval_script(INCR_WITH_TTL_SCRIPT, [key], [amount, ttl_seconds * 1000])
 
     print(f"[PLACEHOLDER] Would increment: {key} by {amount}")
     return amount
 
 
+# --- Lua scripts ---
+#
+# Scripts run atomically on the Redis server, so every API replica sees
+# the same limiter state. Time comes from the Redis server clock rather
+# than the caller's, which keeps replicas with skewed clocks consistent.
+
+INCR_WITH_TTL_SCRIPT = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if value == tonumber(ARGV[1]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return value
+"""
+
+# Token bucket. ARGV: refill rate (tokens/sec), capacity, tokens requested
+# (negative to refund).
+# Returns {allowed (0/1), wait_ms until enough tokens, tokens remaining}.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) / 1000 * rate)
+
+local allowed = 0
+local wait_ms = 0
+if tokens >= requested then
+    tokens = math.min(capacity, tokens - requested)
+    allowed = 1
+else
+    wait_ms = math.ceil((requested - tokens) / rate * 1000)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, wait_ms, math.floor(tokens)}
+"""
+
+# Counting semaphore with leases. ARGV: limit, holder id, lease ms.
+# Expired leases (crashed holders) are reclaimed on every call.
+# Returns {acquired (0/1), holders after the call}.
+SEMAPHORE_ACQUIRE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local holders = redis.call('ZCARD', KEYS[1])
+if holders < limit then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[2])
+    redis.call('PEXPIRE', KEYS[1], ARGV[3])
+    return {1, holders + 1}
+end
+return {0, holders}
+"""
+
+SEMAPHORE_RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+return redis.call('ZCARD', KEYS[1])
+"""
+
+_scripts: dict[str, Any] = {}
+
+
+def eval_script(script: str, keys: list[str], args: list[Any]) -> Optional[Any]:
+    """
+    Run a Lua script atomically.
+
+    Scripts are registered once and then invoked by SHA (EVALSHA),
+    so the script body is only sent on first use or after a Redis
+    restart.
+
+    Args:
+        script: Lua source (one of the *_SCRIPT constants)
+        keys: KEYS passed to the script
+        args: ARGV passed to the script
+
+    Returns:
+        Script result, or None if Redis is unavailable
+    """
+    r = get_redis_connection()
+    if r is None:
+        return None
+
+    registered = _scripts.get(script)
+    if registered is None:
+        registered = _scripts[script] = r.register_script(script)
+    return registered(keys=keys, args=args)
+
+
+def pipeline_execute(commands: list[tuple]) -> Optional[list[Any]]:
+    """
+    Send several commands in one round trip.
+
+    The pipeline is not transactional (no MULTI/EXEC); use eval_script
+    when the commands must be atomic.
+
+    Args:
+        commands: Command tuples, e.g. [("SADD", key, member), ("EXPIRE", key, 60)]
+
+    Returns:
+        One reply per command, or None if Redis is unavailable
+    """
+    r = get_redis_connection()
+    if r is None:
+        return None
+
+    pipe = r.pipeline(transaction=False)
+    for command in commands:
+        pipe.execute_command(*command)
+    return pipe.execute()
+
+
+def stream_append(key: str, entries: list[dict], maxlen: int) -> Optional[list[str]]:
+    """
+    Append entries to a stream in one round trip (XADD per entry).
+
+    The stream is trimmed to about maxlen entries (MAXLEN ~, so Redis
+    trims whole nodes cheaply).
+
+    Args:
+        key: Stream key
+        entries: Field -> value dicts
+        maxlen: Approximate number of entries to retain
+
+    Returns:
+        Assigned entry IDs in order, or None if Redis is unavailable
+    """
+    ids = pipeline_execute([
+        ("XADD", key, "MAXLEN", "~", maxlen, "*", *[part for item in entry.items() for part in item])
+        for entry in entries
+    ])
+    if ids is None:
+        return None
+    return [i.decode() if isinstance(i, bytes) else i for i in ids]
+
+
+def stream_read(key: str, after: str, count: int, block_ms: Optional[int] = None) -> Optional[list]:
+    """
+    Read entries after an ID, optionally blocking until one arrives.
+
+    Blocks the calling thread; run it in a worker thread from async code.
+
+    Args:
+        key: Stream key
+        after: Exclusive start ID ("0-0" for the oldest retained entry)
+        count: Maximum entries to return
+        block_ms: Wait up to this long when there are none
+
+    Returns:
+        [(entry ID, {field: value})] (possibly empty), or None if Redis
+        is unavailable
+    """
+    r = get_redis_connection()
+    if r is None:
+        return None
+
+    reply = r.xread({key: after}, count=count, block=block_ms)
+    if not reply:
+        return []
+    return [
+        (entry_id.decode(), {k.decode(): v for k, v in fields.items()})
+        for entry_id, fields in reply[0][1]
+    ]
+
+
 def cache_flush_pattern(pattern: str) -> int:
     """
     Delete all keys matching a pattern.
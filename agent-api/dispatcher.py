@@ -0,0 +1,164 @@
+"""
+Agent Dispatcher
+
+Multi-agent routing in front of LeadAgent (Week 9). Each lead is sent
+to one agent pool by segment, decided from company_size before any
+scoring:
+
+    enterprise  specialist agent: full scoring prompt, stronger models,
+                company history, follow-up tasks and email drafts
+    smb         lean agent: compact prompt, default fast models, lead
+                upsert only
+
+Leads in segments without a pool of their own (e.g. a segment added by
+a runtime config change) go to the SMB pool.
+
+Each pool has its own concurrency limit, models, prompt variant and
+result cache (keys are namespaced by pool, see LeadAgent), so SMB
+traffic never pays for the specialist path and a burst of SMB leads
+can't take the specialist's slots. Agents run in worker threads, since
+their Redis calls are blocking.
+
+Every dispatch records its route (pool and reason) and per-pool timings
+(wait for a pool slot, agent run time) on the lead's trace and as
+dispatch.* metrics. Approval requests the agent made are saved as
+pending rows once it returns, so any worker can decide them.
+"""
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import metrics
+from agent import ALL_TOOLS, AgentProfile, LeadAgent
+from config import settings
+from db.postgres import log_trace
+from guardrails.approval import save_approval_request
+from records import AgentRecord, LeadRecord
+from scoring_config import ScoringConfig, current_scoring_config
+
+
+DEFAULT_POOL = "smb"
+
+
+@dataclass(slots=True)
+class Route:
+    """Which pool a lead was sent to, and why."""
+    pool: str
+    reason: str
+
+
+class AgentPool:
+    """One agent profile with its own concurrency limit."""
+
+    def __init__(self, profile: AgentProfile, max_concurrency: int):
+        self.profile = profile
+        self.agent = LeadAgent(profile)
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def name(self) -> str:
+        return self.profile.name
+
+    async def run(self, lead: LeadRecord, rules: ScoringConfig) -> tuple[AgentRecord, float, float]:
+        """
+        Run the pool's agent on a lead.
+
+        Returns:
+            (result, ms waited for a slot, ms the agent ran)
+        """
+        started = time.perf_counter()
+        async with self._slots:
+            admitted = time.perf_counter()
+            record = await asyncio.to_thread(self.agent.run_record, lead, rules)
+        finished = time.perf_counter()
+        return record, (admitted - started) * 1000, (finished - admitted) * 1000
+
+
+class AgentDispatcher:
+    """Routes leads to agent pools and traces the decision."""
+
+    def __init__(self, pools: list[AgentPool]):
+        self.pools = {pool.name: pool for pool in pools}
+        if DEFAULT_POOL not in self.pools:
+            raise ValueError(f"AgentDispatcher needs a {DEFAULT_POOL!r} pool")
+
+    def route(self, lead: LeadRecord, rules: Optional[ScoringConfig] = None) -> Route:
+        """Pick the pool for a lead from its pre-scoring segment."""
+        if lead.company_size is None:
+            return Route(DEFAULT_POOL, "company_size_unknown")
+        segment = (rules or current_scoring_config()).segment_for(lead.company_size)
+        if segment in self.pools:
+            return Route(segment, f"segment:{segment}")
+        return Route(DEFAULT_POOL, f"no_pool_for_segment:{segment}")
+
+    async def dispatch(self, lead: LeadRecord) -> AgentRecord:
+        """
+        Route a lead, run it on its pool's agent and log the trace.
+
+        Args:
+            lead: The incoming lead
+
+        Returns:
+            The agent's result
+        """
+        # Routing and the agent see the same config snapshot
+        rules = current_scoring_config()
+        route = self.route(lead, rules)
+        record, wait_ms, run_ms = await self.pools[route.pool].run(lead, rules)
+
+        if record.approval_id is not None:
+            await save_approval_request(record.approval_id)
+        metrics.increment("dispatch.routed", pool=route.pool, reason=route.reason)
+        metrics.observe("dispatch.wait_ms", wait_ms, pool=route.pool)
+        metrics.observe("dispatch.run_ms", run_ms, pool=route.pool)
+        await log_trace(
+            trace_id=record.trace_id,
+            lead_key=record.lead_key,
+            input_data=lead.present_fields(),
+            score_result=asdict(record.score),
+            actions_taken=record.actions_taken,
+            approval_required=record.approval_required,
+            approval_reason=record.approval_reason,
+            config_version=record.config_version,
+            route={
+                "pool": route.pool,
+                "reason": route.reason,
+                "wait_ms": round(wait_ms, 2),
+                "run_ms": round(run_ms, 2),
+            }
+        )
+        return record
+
+
+def default_pools() -> list[AgentPool]:
+    """The enterprise specialist and lean SMB pools, from settings."""
+    enterprise = AgentProfile(
+        name="enterprise",
+        tools=ALL_TOOLS,
+        prompt_variant=settings.ENTERPRISE_PROMPT_VARIANT,
+        models={"gemini": settings.ENTERPRISE_LLM_MODEL, "anthropic": settings.ENTERPRISE_ANTHROPIC_MODEL},
+        cache_ttl_seconds=settings.ENTERPRISE_RESULT_CACHE_TTL_SECONDS,
+    )
+    smb = AgentProfile(
+        name="smb",
+        tools=frozenset({"upsert_lead_row"}),
+        prompt_variant=settings.SMB_PROMPT_VARIANT,
+    )
+    return [
+        AgentPool(enterprise, settings.ENTERPRISE_POOL_CONCURRENCY),
+        AgentPool(smb, settings.SMB_POOL_CONCURRENCY),
+    ]
+
+
+_dispatcher: Optional[AgentDispatcher] = None
+
+
+def get_dispatcher() -> AgentDispatcher:
+    """Get the shared dispatcher over the default pools."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = AgentDispatcher(default_pools())
+    return _dispatcher
@@ -0,0 +1,245 @@
+"""
+Lead Change Feed
+
+An ordered stream of lead state transitions for downstream consumers
+(CRM sync, Sheets sync, BI), so they don't have to poll leads with
+updated_at range scans.
+
+Event types:
+    lead.upserted        lead scored and written (agent or bulk import)
+    lead.status_changed  update_lead_status
+    lead.requalified     score/tier/segment changed by a config change
+    approval.decided     process_approval
+    task.completed       complete_task
+
+Events go to a Redis Stream (EVENT_STREAM_KEY), shared by every worker
+and trimmed to about EVENT_STREAM_MAXLEN entries. Without Redis an
+in-process buffer with the same cursor format stands in; it only sees
+this process's events.
+
+A cursor is a stream entry ID ("<ms>-<seq>"). Reads return events
+strictly after it, oldest first, so a consumer stores the ID of the
+last event it processed and resumes from there. Long-poll readers
+register a waiter; one tail task per process blocks on Redis for all of
+them, so waiting consumers don't each hold a thread.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import metrics
+from config import settings
+from db.redis import stream_append, stream_read
+from serialization import dumps, loads
+
+
+START = "0-0"
+
+
+@dataclass(slots=True)
+class Event:
+    """One state transition."""
+    id: str
+    type: str
+    key: str  # lead_key, action_id or task_id
+    at: str
+    data: dict
+
+
+def parse_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Parse a stream ID ("<ms>-<seq>" or "<ms>").
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    ms, _, seq = cursor.partition("-")
+    try:
+        parsed = (int(ms), int(seq or 0))
+    except ValueError:
+        raise ValueError(f"Invalid event cursor {cursor!r}") from None
+    if parsed[0] < 0 or parsed[1] < 0:
+        raise ValueError(f"Invalid event cursor {cursor!r}")
+    return parsed
+
+
+class EventFeed:
+    """Publishes to and reads from the change feed."""
+
+    MAX_RETRY_SECONDS = 5.0
+
+    def __init__(self, stream_key: str, maxlen: int, local_buffer: int):
+        self.stream_key = stream_key
+        self.maxlen = maxlen
+        self.local_buffer = local_buffer
+        self._remote: Optional[bool] = None  # unknown until the first Redis call
+
+        # In-process fallback, kept as parallel sorted lists for bisect
+        self._lock = threading.Lock()
+        self._ids: list[tuple[int, int]] = []
+        self._events: list[Event] = []
+        self._last_id = (0, 0)
+
+        # (loop, event, cursor) of each waiting reader
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event, tuple[int, int]]] = set()
+        self._tail_task: Optional[asyncio.Task] = None
+
+    def publish(self, type: str, key: str, data: Optional[dict] = None) -> str:
+        """Append one event; returns its cursor."""
+        return self.publish_many([(type, key, data or {})])[0]
+
+    def publish_many(self, items: list[tuple[str, str, dict]]) -> list[str]:
+        """
+        Append events in order, in one Redis round trip.
+
+        Safe to call from worker threads.
+
+        Args:
+            items: (type, key, data) tuples
+
+        Returns:
+            Cursors of the appended events
+        """
+        if not items:
+            return []
+        at = datetime.utcnow().isoformat()
+        ids = None
+        if self._remote is not False:
+            ids = stream_append(self.stream_key, [
+                {"e": dumps({"type": type, "key": key, "at": at, "data": data})}
+                for type, key, data in items
+            ], self.maxlen)
+            self._remote = ids is not None
+        if ids is None:
+            ids = self._append_local(items, at)
+        metrics.increment("events.published", len(items))
+        self._wake(parse_cursor(ids[-1]))
+        return ids
+
+    async def read(self, after: str = START, limit: int = 1000, timeout: float = 0.0) -> list[Event]:
+        """
+        Events after a cursor, oldest first.
+
+        Args:
+            after: Exclusive cursor
+            limit: Maximum events to return
+            timeout: Seconds to wait for an event if there are none yet
+
+        Returns:
+            Up to limit events (empty if none arrived in time)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        cursor = parse_cursor(after)
+        events = await self._read_now(after, cursor, limit)
+        if events or timeout <= 0:
+            return events
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not events and (remaining := deadline - loop.time()) > 0:
+            waiter = (loop, asyncio.Event(), cursor)
+            with self._lock:
+                self._waiters.add(waiter)
+            try:
+                if self._remote:
+                    self._ensure_tail()
+                # Re-check after registering, so a publish in between isn't missed
+                events = await self._read_now(after, cursor, limit)
+                if not events:
+                    try:
+                        await asyncio.wait_for(waiter[1].wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    events = await self._read_now(after, cursor, limit)
+            finally:
+                with self._lock:
+                    self._waiters.discard(waiter)
+        return events
+
+    async def _read_now(self, after: str, cursor: tuple[int, int], limit: int) -> list[Event]:
+        if self._remote is not False:
+            entries = await asyncio.to_thread(stream_read, self.stream_key, after, limit)
+            self._remote = entries is not None
+            if entries is not None:
+                return [Event(id=entry_id, **loads(fields["e"])) for entry_id, fields in entries]
+        with self._lock:
+            start = bisect_right(self._ids, cursor)
+            return self._events[start:start + limit]
+
+    def _append_local(self, items: list[tuple[str, str, dict]], at: str) -> list[str]:
+        ids = []
+        with self._lock:
+            for type, key, data in items:
+                # Same ID scheme as Redis: milliseconds, then a sequence within the millisecond
+                ms = int(time.time() * 1000)
+                last_ms, last_seq = self._last_id
+                self._last_id = (ms, 0) if ms > last_ms else (last_ms, last_seq + 1)
+                event_id = f"{self._last_id[0]}-{self._last_id[1]}"
+                self._ids.append(self._last_id)
+                self._events.append(Event(id=event_id, type=type, key=key, at=at, data=data))
+                ids.append(event_id)
+            # Trim in bulk once the buffer doubles, so appends stay O(1) amortized
+            if len(self._events) > 2 * self.local_buffer:
+                del self._ids[:-self.local_buffer]
+                del self._events[:-self.local_buffer]
+        return ids
+
+    def _wake(self, newest: tuple[int, int]) -> None:
+        with self._lock:
+            ready = [w for w in self._waiters if w[2] < newest]
+        for loop, event, _ in ready:
+            loop.call_soon_threadsafe(event.set)
+
+    def _ensure_tail(self) -> None:
+        if self._tail_task is None or self._tail_task.done():
+            self._tail_task = asyncio.create_task(self._tail())
+
+    async def _tail(self) -> None:
+        """Block on Redis for events published by other workers and wake local readers."""
+        seen = (0, 0)
+        failures = 0
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    return
+                oldest = min(w[2] for w in self._waiters)
+            # Waiters behind `seen` were already woken; readers that register
+            # later re-check the stream themselves, so nothing is missed
+            after = max(oldest, seen)
+            entries = await asyncio.to_thread(
+                stream_read, self.stream_key, f"{after[0]}-{after[1]}", 1, 1000
+            )
+            if entries is None:
+                # Redis is unavailable: back off instead of spinning; waiters
+                # still time out and re-check on their own
+                failures += 1
+                await asyncio.sleep(random.uniform(0, min(self.MAX_RETRY_SECONDS, 0.5 * 2 ** failures)))
+                continue
+            failures = 0
+            if entries:
+                seen = parse_cursor(entries[-1][0])
+                self._wake(seen)
+
+
+_feed: Optional[EventFeed] = None
+
+
+def get_event_feed() -> EventFeed:
+    """Get the shared change feed."""
+    global _feed
+    if _feed is None:
+        _feed = EventFeed(settings.EVENT_STREAM_KEY, settings.EVENT_STREAM_MAXLEN, settings.EVENT_LOCAL_BUFFER)
+    return _feed
+
+
+def publish_event(type: str, key: str, data: Optional[dict] = None) -> str:
+    """Append one event to the shared change feed."""
+    return get_event_feed().publish(type, key, data)
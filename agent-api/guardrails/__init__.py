@@ -13,6 +13,7 @@ Guardrails include:
 
 from .approval import check_approval, ApprovalCheck, request_approval
 from .validators import validate_lead_input, sanitize_input
+from .rate_limit import RateLimitExceeded, check_lead_rate_limit, llm_governor
 
 __all__ = [
     "check_approval",
@@ -20,4 +21,7 @@ __all__ = [
     "request_approval",
     "validate_lead_input",
     "sanitize_input",
+    "RateLimitExceeded",
+    "check_lead_rate_limit",
+    "llm_governor",
 ]
@@ -5,10 +5,13 @@ Human-in-the-loop approval for high-risk agent actions.
 Students implement this in Week 7.
 """
 
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
 from dataclasses import dataclass
-from config import APPROVAL_REQUIRED_ACTIONS
+from db.postgres import fetch_approval_request, insert_approval_request, reject_approval_request
+from events import publish_event
+from ids import new_id
+from scoring_config import ScoringConfig, current_scoring_config
 
 
 @dataclass
@@ -30,18 +33,21 @@ class ApprovalRequest:
     context: dict
     requested_at: datetime
     status: str = "pending"  # pending, approved, rejected
+    # Act-phase work done ahead of the decision (tools/speculative.py)
+    prepared: Optional[Any] = None
 
 
-# In-memory store for demo purposes
-# TODO: Replace with database in Week 7
+# Requests made in this process and not yet saved to Postgres (see
+# save_approval_request); without a database, the only store
 _pending_approvals: dict[str, ApprovalRequest] = {}
 
 
-def check_approval(action: str, context: dict) -> ApprovalCheck:
+def check_approval(action: str, context: dict, rules: Optional[ScoringConfig] = None) -> ApprovalCheck:
     """
     Check if an action requires human approval.
 
-    Actions requiring approval (configurable in config.py):
+    Actions requiring approval (APPROVAL_REQUIRED_ACTIONS in config.py,
+    overridable at runtime - see scoring_config.py):
     - reject_decision: Rejecting a lead
     - enterprise_scheduling: Scheduling with enterprise leads
     - send_email: Actually sending (not drafting) emails
@@ -50,11 +56,13 @@ def check_approval(action: str, context: dict) -> ApprovalCheck:
     Args:
         action: The action being attempted
         context: Additional context (lead data, score, etc.)
+        rules: Config snapshot the lead is processed under (default: current)
 
     Returns:
         ApprovalCheck indicating if approval is needed and why
     """
-    if action in APPROVAL_REQUIRED_ACTIONS and APPROVAL_REQUIRED_ACTIONS[action]:
+    rules = rules or current_scoring_config()
+    if rules.requires_approval(action):
         return ApprovalCheck(
             required=True,
             reason=f"{action} requires human approval",
@@ -79,7 +87,8 @@ def request_approval(
     action_type: str,
     lead_key: str,
     reason: str,
-    context: dict
+    context: dict,
+    prepared: Optional[Any] = None
 ) -> str:
     """
     Create an approval request for human review.
@@ -89,11 +98,13 @@ def request_approval(
         lead_key: The lead this action relates to
         reason: Why approval is needed
         context: Additional context for the approver
+        prepared: PreparedAction to commit on approval (see
+                  tools/speculative.py)
 
     Returns:
         action_id for tracking the approval request
     """
-    action_id = f"approval_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{lead_key[:8]}"
+    action_id = new_id("approval")
 
     request = ApprovalRequest(
         action_id=action_id,
@@ -101,10 +112,11 @@ def request_approval(
         lead_key=lead_key,
         reason=reason,
         context=context,
-        requested_at=datetime.utcnow()
+        requested_at=datetime.utcnow(),
+        prepared=prepared
     )
 
-    # TODO: Store in database in Week 7
+    # Saved as a pending row by save_approval_request
     _pending_approvals[action_id] = request
 
     print(f"[APPROVAL REQUIRED] {action_type}")
@@ -115,10 +127,46 @@ def request_approval(
     return action_id
 
 
-def process_approval(action_id: str, approved: bool, notes: Optional[str] = None) -> bool:
+async def save_approval_request(action_id: str) -> bool:
+    """
+    Store a request made with request_approval as a pending row.
+
+    The agent loop is synchronous, so requests are saved by the caller
+    once it returns (see dispatcher.py). After that any worker can
+    decide the request, and it survives worker restarts; without a
+    database it stays in this process.
+
+    Args:
+        action_id: ID returned by request_approval
+
+    Returns:
+        True if stored in the database
+    """
+    request = _pending_approvals.get(action_id)
+    if request is None:
+        return False
+    stored = await insert_approval_request({
+        "action_id": request.action_id,
+        "action_type": request.action_type,
+        "lead_key": request.lead_key,
+        "reason": request.reason,
+        "context": request.context,
+        "prepared": request.prepared.to_dict() if request.prepared is not None else None,
+        "requested_at": request.requested_at,
+    })
+    if stored:
+        del _pending_approvals[action_id]
+    return stored
+
+
+async def process_approval(action_id: str, approved: bool, notes: Optional[str] = None) -> bool:
     """
     Process an approval decision.
 
+    An approved action is carried out before this returns; with its
+    work prepared at request time that is a single DB write. The
+    request may have been made on any worker.
+
     Args:
         action_id: The approval request ID
         approved: Whether the action was approved
@@ -127,20 +175,45 @@ def process_approval(action_id: str, approved: bool, notes: Optional[str] = None
     Returns:
         True if processed successfully
     """
-    if action_id not in _pending_approvals:
+    request = _pending_approvals.get(action_id)
+    if request is None:
+        row = await fetch_approval_request(action_id)
+        request = ApprovalRequest(**row) if row is not None else None
+    if request is None:
         print(f"[ERROR] Approval request not found: {action_id}")
         return False
+    if request.status != "pending":
+        print(f"[ERROR] Approval request already {request.status}: {action_id}")
+        return False
 
-    request = _pending_approvals[action_id]
-    request.status = "approved" if approved else "rejected"
+    if approved:
+        # Deferred import: tools pull in templates and the sweeper
+        from tools.speculative import execute_approved_action
+        request.status = "approved"  # claimed, so a second click here can't run it again
+        try:
+            decided = await execute_approved_action(request, notes)
+        except Exception:
+            request.status = "pending"
+            raise
+    else:
+        request.status = "rejected"
+        decided = await reject_approval_request(action_id, notes)
+    # The prepared work is either committed or discarded now
+    request.prepared = None
+    if not decided:
+        # Another worker decided it between our read and our write
+        print(f"[ERROR] Approval request already decided: {action_id}")
+        return False
 
     print(f"[APPROVAL {'GRANTED' if approved else 'DENIED'}] {action_id}")
     if notes:
         print(f"  Notes: {notes}")
-
-    # TODO: Trigger the approved action in Week 7
-    # if approved:
-    #     execute_approved_action(request)
+    publish_event("approval.decided", action_id, {
+        "lead_key": request.lead_key,
+        "action_type": request.action_type,
+        "status": request.status,
+        "notes": notes,
+    })
 
     return True
 
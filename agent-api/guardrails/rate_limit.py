@@ -0,0 +1,280 @@
+"""
+Rate Limiting and LLM Concurrency Governor
+
+Distributed limits shared by every API replica (Week 10).
+
+- TokenBucket: requests per minute with a burst allowance, used to
+  throttle POST /lead per API key and per source domain, and to cap
+  LLM calls per minute.
+- ConcurrencyLimit: a leased counting semaphore capping in-flight LLM
+  calls across replicas.
+- LLMGovernor: both of the above behind one `async with` slot.
+
+State lives in Redis and is updated by Lua scripts (see db/redis.py).
+The Redis client is synchronous, so every script call runs in a worker
+thread rather than blocking the event loop. When Redis is not available
+the same limits are enforced per process (on the event loop thread) so
+local development still behaves sensibly.
+
+Callers either check without waiting (inbound API requests) or queue
+with a timeout (LLM calls); a RateLimitExceeded is raised when the
+timeout would be exceeded.
+"""
+
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import metrics
+from config import settings
+from db.redis import eval_script, TOKEN_BUCKET_SCRIPT, SEMAPHORE_ACQUIRE_SCRIPT, SEMAPHORE_RELEASE_SCRIPT
+from ids import new_id
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a limit cannot be acquired within the timeout."""
+
+    def __init__(self, limiter: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded: {limiter} (retry after {retry_after:.2f}s)")
+        self.limiter = limiter
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled at a fixed per-minute rate."""
+
+    # Most keys the per-process fallback tracks; least recently used
+    # buckets beyond this are dropped (i.e. treated as full)
+    LOCAL_MAX_KEYS = 10_000
+
+    def __init__(self, name: str, per_minute: int, burst: Optional[int] = None):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.capacity = burst or per_minute
+        # Per-process fallback: key -> (tokens, last refill time), least
+        # recently used first
+        self._local: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def try_acquire(self, key: str, tokens: int = 1) -> tuple[bool, float]:
+        """
+        Take tokens without waiting.
+
+        Args:
+            key: Bucket key (API key, domain, ...)
+            tokens: Tokens to take
+
+        Returns:
+            Tuple of (allowed, seconds until enough tokens are available)
+        """
+        result = await asyncio.to_thread(
+            eval_script,
+            TOKEN_BUCKET_SCRIPT,
+            [f"ratelimit:{self.name}:{key}"],
+            [self.rate, self.capacity, tokens]
+        )
+        if result is None:
+            allowed, wait, remaining = self._local_acquire(key, tokens)
+        else:
+            allowed, wait, remaining = bool(result[0]), result[1] / 1000, result[2]
+
+        metrics.set_gauge("ratelimit.tokens", remaining, limiter=self.name)
+        metrics.increment(
+            "ratelimit.allowed" if allowed else "ratelimit.throttled",
+            limiter=self.name
+        )
+        return allowed, wait
+
+    async def acquire(self, key: str, timeout: float, tokens: int = 1) -> None:
+        """
+        Take tokens, waiting up to timeout seconds.
+
+        Raises:
+            RateLimitExceeded: If tokens will not be available in time
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            allowed, wait = await self.try_acquire(key, tokens)
+            if allowed:
+                metrics.observe("ratelimit.wait_ms", (time.monotonic() - started) * 1000, limiter=self.name)
+                return
+            if time.monotonic() + wait > deadline:
+                metrics.increment("ratelimit.timeouts", limiter=self.name)
+                raise RateLimitExceeded(self.name, wait)
+            # Jitter so queued callers on many replicas don't retry in lockstep
+            await asyncio.sleep(wait + random.uniform(0, 0.05))
+
+    async def refund(self, key: str, tokens: int = 1) -> None:
+        """Give back tokens taken by try_acquire or acquire (never beyond capacity)."""
+        result = await asyncio.to_thread(
+            eval_script,
+            TOKEN_BUCKET_SCRIPT,
+            [f"ratelimit:{self.name}:{key}"],
+            [self.rate, self.capacity, -tokens]
+        )
+        if result is None:
+            self._local_acquire(key, -tokens)
+        metrics.increment("ratelimit.refunded", limiter=self.name)
+
+    def _local_acquire(self, key: str, tokens: int) -> tuple[bool, float, float]:
+        now = time.monotonic()
+        available, last = self._local.pop(key, (self.capacity, now))
+        available = min(self.capacity, available + (now - last) * self.rate)
+        if available >= tokens:
+            available = min(self.capacity, available - tokens)
+            allowed, wait = True, 0.0
+        else:
+            allowed, wait = False, (tokens - available) / self.rate
+        self._local[key] = (available, now)
+        self._local_evict(now)
+        return allowed, wait, available
+
+    def _local_evict(self, now: float) -> None:
+        # Buckets that have refilled carry no state; dropping them is
+        # exact. The key cap bounds memory even under a flood of keys.
+        while self._local:
+            key, (available, last) = next(iter(self._local.items()))
+            full = available + (now - last) * self.rate >= self.capacity
+            if not full and len(self._local) <= self.LOCAL_MAX_KEYS:
+                return
+            del self._local[key]
+
+
+class ConcurrencyLimit:
+    """Counting semaphore shared across replicas via leased Redis entries."""
+
+    # Poll interval bounds while queued; a distributed semaphore has no wakeup signal
+    MIN_POLL_SECONDS = 0.02
+    MAX_POLL_SECONDS = 0.25
+
+    def __init__(self, name: str, limit: int, lease_seconds: float = 120.0):
+        self.name = name
+        self.limit = limit
+        self.lease_ms = int(lease_seconds * 1000)
+        self._local_holders: set[str] = set()
+
+    async def try_acquire(self, holder: str) -> bool:
+        """Take a slot without waiting."""
+        result = await asyncio.to_thread(
+            eval_script,
+            SEMAPHORE_ACQUIRE_SCRIPT,
+            [f"semaphore:{self.name}"],
+            [self.limit, holder, self.lease_ms]
+        )
+        if result is None:
+            acquired = len(self._local_holders) < self.limit
+            if acquired:
+                self._local_holders.add(holder)
+            in_flight = len(self._local_holders)
+        else:
+            acquired, in_flight = bool(result[0]), result[1]
+
+        metrics.set_gauge("ratelimit.in_flight", in_flight, limiter=self.name)
+        return acquired
+
+    async def acquire(self, timeout: float) -> str:
+        """
+        Take a slot, waiting up to timeout seconds.
+
+        Returns:
+            Holder id to pass to release()
+
+        Raises:
+            RateLimitExceeded: If no slot frees up in time
+        """
+        holder = new_id("slot")
+        started = time.monotonic()
+        deadline = started + timeout
+        poll = self.MIN_POLL_SECONDS
+        while not await self.try_acquire(holder):
+            if time.monotonic() + poll > deadline:
+                metrics.increment("ratelimit.timeouts", limiter=self.name)
+                raise RateLimitExceeded(self.name, poll)
+            await asyncio.sleep(poll + random.uniform(0, poll / 2))
+            poll = min(poll * 2, self.MAX_POLL_SECONDS)
+
+        metrics.observe("ratelimit.wait_ms", (time.monotonic() - started) * 1000, limiter=self.name)
+        return holder
+
+    async def release(self, holder: str) -> None:
+        """Give a slot back."""
+        # Local first: if the caller is cancelled while Redis answers, the
+        # worker thread still completes the release there
+        self._local_holders.discard(holder)
+        result = await asyncio.to_thread(eval_script, SEMAPHORE_RELEASE_SCRIPT, [f"semaphore:{self.name}"], [holder])
+        if result is None:
+            result = len(self._local_holders)
+        metrics.set_gauge("ratelimit.in_flight", result, limiter=self.name)
+
+
+class LLMGovernor:
+    """Caps concurrent and per-minute LLM calls across all replicas."""
+
+    def __init__(self, max_concurrency: int, per_minute: int, queue_timeout: float):
+        self.concurrency = ConcurrencyLimit("llm_concurrency", max_concurrency)
+        self.rpm = TokenBucket("llm_rpm", per_minute)
+        self.queue_timeout = queue_timeout
+
+    @asynccontextmanager
+    async def slot(self, timeout: Optional[float] = None, provider: str = "gemini"):
+        """
+        Hold one LLM call slot for the duration of the block.
+
+        Waits for both a per-minute token and a concurrency slot, in
+        that order, within a single timeout budget.
+
+        Raises:
+            RateLimitExceeded: If the slot is not available in time
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        await self.rpm.acquire(provider, timeout)
+        try:
+            holder = await self.concurrency.acquire(max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            # The call never ran; give its per-minute token back
+            await self.rpm.refund(provider)
+            raise
+        try:
+            yield
+        finally:
+            await self.concurrency.release(holder)
+
+
+# --- Shared limiters ---
+
+lead_limiter_by_api_key = TokenBucket("lead_api_key", settings.RATE_LIMIT_LEADS_PER_KEY_PER_MINUTE)
+lead_limiter_by_domain = TokenBucket("lead_domain", settings.RATE_LIMIT_LEADS_PER_DOMAIN_PER_MINUTE)
+
+llm_governor = LLMGovernor(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    per_minute=settings.LLM_MAX_REQUESTS_PER_MINUTE,
+    queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS
+)
+
+
+async def check_lead_rate_limit(api_key: str, domain: str) -> Optional[RateLimitExceeded]:
+    """
+    Check inbound lead limits without waiting.
+
+    Args:
+        api_key: Caller's API key (or "anonymous")
+        domain: Email domain of the submitted lead
+
+    Returns:
+        RateLimitExceeded describing the first limit hit, or None. A
+        rejected request consumes no tokens from either limit.
+    """
+    taken = []
+    for limiter, key in ((lead_limiter_by_api_key, api_key), (lead_limiter_by_domain, domain)):
+        allowed, wait = await limiter.try_acquire(key)
+        if not allowed:
+            for held, held_key in taken:
+                await held.refund(held_key)
+            return RateLimitExceeded(limiter.name, wait)
+        taken.append((limiter, key))
+    return None
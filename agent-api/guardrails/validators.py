@@ -108,33 +108,51 @@ def sanitize_input(text: str) -> str:
         return ""
 
     # Remove HTML tags
-    sanitized = re.sub(r'<[^>]+>', '', text)
+    sanitized = _HTML_TAG_PATTERN.sub('', text)
 
     # Remove null bytes
     sanitized = sanitized.replace('\x00', '')
 
     # Limit consecutive whitespace
-    sanitized = re.sub(r'\s{3,}', '  ', sanitized)
+    sanitized = _WHITESPACE_RUN_PATTERN.sub('  ', sanitized)
 
     # Remove control characters (except newlines and tabs)
-    sanitized = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', sanitized)
+    sanitized = _CONTROL_CHAR_PATTERN.sub('', sanitized)
 
     return sanitized.strip()
 
 
+# Patterns are compiled once into a single alternation at import, so
+# each check is one regex scan (and pre-fork workers share the result)
+_SUSPICIOUS_PATTERN = re.compile("|".join([
+    r'<script',
+    r'javascript:',
+    r'onclick=',
+    r'onerror=',
+    r'\x00',  # null byte
+    r'&#x',   # HTML entity encoding
+]))
+
+_INJECTION_PATTERN = re.compile("|".join([
+    r'ignore (?:previous|above|all) instructions',
+    r'disregard (?:previous|above|all)',
+    r'forget (?:everything|your instructions)',
+    r'you are now',
+    r'new instructions:',
+    r'system prompt:',
+    r'</?(?:system|user|assistant)>',
+    r'\[inst\]',
+    r'<<sys>>',
+]))
+
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WHITESPACE_RUN_PATTERN = re.compile(r'\s{3,}')
+_CONTROL_CHAR_PATTERN = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
+
 def _contains_suspicious_patterns(text: str) -> bool:
     """Check for obviously suspicious input patterns."""
-    suspicious_patterns = [
-        r'<script',
-        r'javascript:',
-        r'onclick=',
-        r'onerror=',
-        r'\x00',  # null byte
-        r'&#x',   # HTML entity encoding
-    ]
-
-    text_lower = text.lower()
-    return any(re.search(pattern, text_lower) for pattern in suspicious_patterns)
+    return _SUSPICIOUS_PATTERN.search(text.lower()) is not None
 
 
 def _contains_prompt_injection(text: str) -> bool:
@@ -144,20 +162,7 @@ def _contains_prompt_injection(text: str) -> bool:
     This is a basic check - more sophisticated detection
     should be implemented in Week 11.
     """
-    injection_patterns = [
-        r'ignore (?:previous|above|all) instructions',
-        r'disregard (?:previous|above|all)',
-        r'forget (?:everything|your instructions)',
-        r'you are now',
-        r'new instructions:',
-        r'system prompt:',
-        r'</?(system|user|assistant)>',
-        r'\[INST\]',
-        r'<<SYS>>',
-    ]
-
-    text_lower = text.lower()
-    return any(re.search(pattern, text_lower) for pattern in injection_patterns)
+    return _INJECTION_PATTERN.search(text.lower()) is not None
 
 
 def validate_output(output: dict) -> Tuple[bool, Optional[str]]:
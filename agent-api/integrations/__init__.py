@@ -0,0 +1,9 @@
+"""
+Integrations Module
+
+Sync of lead state to external systems, driven by the lead change feed.
+
+Components:
+- sheets.py: Batched, quota-aware Google Sheets tracking sheet sync
+- fake_sheets.py: Local fake Sheets API for tests and benchmarks
+"""
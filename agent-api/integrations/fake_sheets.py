@@ -0,0 +1,174 @@
+"""
+Fake Google Sheets API
+
+A local stand-in for the Sheets v4 values endpoints and the OAuth token
+endpoint, used by benchmarks and tests. It plugs into SheetsClient as an
+httpx transport, so the real coalescing, diffing, quota and retry code
+paths are exercised without network access or credentials.
+
+Supported:
+- POST <token_url>                          refresh-token grant
+- GET  /v4/spreadsheets/{id}/values/{range}  read a range
+- POST /v4/spreadsheets/{id}/values:batchUpdate
+
+Faults:
+- quota: write requests per rolling minute; excess requests get 429
+  with Retry-After, like the real per-user quota
+- errors: HTTP 500 before the write is applied
+- lost replies: the write is applied, then HTTP 500 is returned (tests
+  that retries are idempotent)
+- latency: per request
+
+Usage:
+    from integrations.fake_sheets import fake_sheets_client
+    client, fake = fake_sheets_client(writes_per_minute=60, lost_reply_rate=0.05)
+    sync = SheetsSync(client)
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import unquote
+
+import httpx
+
+from integrations.sheets import SheetsClient
+
+
+_A1 = re.compile(r"^(?:[^!]*!)?([A-Z]+)(\d*)(?::([A-Z]+)(\d*))?$")
+
+
+@dataclass
+class FakeSheetsConfig:
+    """Quota and fault settings for the fake."""
+    writes_per_minute: int = 60
+    latency_ms: float = 20.0
+    error_rate: float = 0.0       # fraction of writes failing before they apply
+    lost_reply_rate: float = 0.0  # fraction of writes applied but answered with 500
+    seed: Optional[int] = None
+
+
+class FakeSheetsTransport(httpx.AsyncBaseTransport):
+    """httpx transport that simulates one spreadsheet with one sheet."""
+
+    def __init__(self, config: FakeSheetsConfig):
+        self.config = config
+        self.grid: dict[int, list] = {}  # 1-based row -> cell values
+        self.reads = 0
+        self.write_requests = 0  # including throttled and failed ones
+        self.writes = 0
+        self.throttled = 0
+        self.failed = 0
+        self.cells_written = 0
+        self._write_times: deque[float] = deque()
+        self._random = random.Random(config.seed)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.config.latency_ms / 1000)
+        path = unquote(request.url.path)
+
+        if "/v4/spreadsheets/" not in path:
+            return httpx.Response(200, json={"access_token": "fake-token", "expires_in": 3600})
+        if request.headers.get("Authorization") != "Bearer fake-token":
+            return httpx.Response(401, json={"error": {"message": "unauthenticated"}})
+
+        if request.method == "GET":
+            self.reads += 1
+            return httpx.Response(200, json={"values": self.read(path.rsplit("/values/", 1)[1])})
+        if path.endswith("/values:batchUpdate"):
+            return self._batch_update(json.loads(request.content))
+        return httpx.Response(404, json={"error": {"message": f"unsupported: {path}"}})
+
+    def read(self, range_: str) -> list[list]:
+        """Rows of a range, trailing empty rows and cells trimmed (as the API does)."""
+        col0, row0, col1, row1 = _parse_range(range_)
+        last = max(self.grid, default=0) if row1 is None else row1
+        rows = []
+        for r in range(row0, last + 1):
+            values = self.grid.get(r, [])[col0:col1 + 1]
+            while values and values[-1] == "":
+                values = values[:-1]
+            rows.append(values)
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def _batch_update(self, body: dict) -> httpx.Response:
+        self.write_requests += 1
+        now = time.monotonic()
+        while self._write_times and now - self._write_times[0] >= 60:
+            self._write_times.popleft()
+        if len(self._write_times) >= self.config.writes_per_minute:
+            self.throttled += 1
+            retry_after = max(1, int(60 - (now - self._write_times[0])) + 1)
+            return httpx.Response(
+                429,
+                headers={"Retry-After": str(retry_after)},
+                json={"error": {"message": "Quota exceeded for quota metric 'Write requests'"}}
+            )
+        self._write_times.append(now)
+
+        roll = self._random.random()
+        if roll < self.config.error_rate:
+            self.failed += 1
+            return httpx.Response(500, json={"error": {"message": "injected failure"}})
+
+        cells = 0
+        for item in body["data"]:
+            col0, row, _, _ = _parse_range(item["range"])
+            for offset, values in enumerate(item["values"]):
+                line = self.grid.setdefault(row + offset, [])
+                if len(line) < col0 + len(values):
+                    line.extend([""] * (col0 + len(values) - len(line)))
+                line[col0:col0 + len(values)] = values
+                cells += len(values)
+        self.writes += 1
+        self.cells_written += cells
+
+        if roll < self.config.error_rate + self.config.lost_reply_rate:
+            self.failed += 1
+            return httpx.Response(500, json={"error": {"message": "injected lost reply"}})
+        return httpx.Response(200, json={"totalUpdatedCells": cells, "responses": []})
+
+
+def _parse_range(range_: str) -> tuple[int, int, int, Optional[int]]:
+    """A1 range -> (first column, first row, last column, last row or None), 0-based columns."""
+    match = _A1.match(range_)
+    if not match:
+        raise ValueError(f"Unsupported range {range_!r}")
+    col0, row0, col1, row1 = match.groups()
+    first = _column_index(col0)
+    last = _column_index(col1) if col1 else first
+    return first, int(row0 or 1), last, (int(row1) if row1 else (int(row0) if row0 and not col1 else None))
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - ord("A") + 1
+    return index - 1
+
+
+def fake_sheets_client(**config) -> tuple[SheetsClient, FakeSheetsTransport]:
+    """
+    Build a SheetsClient wired to a fake spreadsheet.
+
+    Args:
+        **config: FakeSheetsConfig fields
+
+    Returns:
+        The client and the fake (for inspecting the grid and counters)
+    """
+    transport = FakeSheetsTransport(FakeSheetsConfig(**config))
+    client = SheetsClient(
+        "fake-spreadsheet",
+        base_url="http://sheets.fake.local",
+        token_url="http://oauth.fake.local/token",
+        transport=transport
+    )
+    return client, transport
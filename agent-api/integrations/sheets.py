@@ -0,0 +1,378 @@
+"""
+Google Sheets Tracking Sheet Sync
+
+Mirrors leads into a tracking sheet (one row per lead_key) without
+spending a Sheets API call per lead change.
+
+- Coalescing: changes are buffered per lead_key, so a lead updated ten
+  times between flushes is written once, with its latest values.
+- Minimal diffs: the worker keeps a snapshot of what the sheet holds
+  and writes only the cells that differ, merged into contiguous ranges.
+  All of a flush goes out as one values:batchUpdate request.
+- Quota: every write request takes a token from a TokenBucket shared by
+  all replicas (SHEETS_WRITE_REQUESTS_PER_MINUTE). 429s honor
+  Retry-After; other transient failures back off exponentially.
+- Idempotent retries: a lead's sheet row is fixed when it is first
+  planned, and writes carry absolute values for absolute ranges. Re-sending
+  a failed (or lost-reply) batch rewrites the same cells with the same
+  values, and newer changes submitted meanwhile win. Rows are found by
+  lead_key when the snapshot is reloaded, so a restart never duplicates
+  a lead.
+
+run() follows the lead change feed (events.py) and resolves changed
+leads through the lead cache. The feed cursor is saved once everything
+read so far has reached the sheet, so a restart replays at most the
+unsaved changes. Run a single instance (cli.py sheets-sync): rows for
+new leads are assigned from this process's snapshot.
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+import httpx
+
+import metrics
+from config import settings
+from db.redis import cache_get, cache_set
+from events import START, get_event_feed
+from guardrails.rate_limit import RateLimitExceeded, TokenBucket
+
+
+# Sheet columns, in order (A, B, ...); row 1 is the header
+COLUMNS = (
+    "lead_key", "email", "company", "score", "tier", "segment",
+    "status", "industry", "company_size", "updated_at",
+)
+
+LEAD_EVENTS = ("lead.upserted", "lead.status_changed", "lead.requalified")
+
+CURSOR_KEY = "sheets_sync:cursor"
+
+# Snapshot cell whose sheet value is unknown; never equal to a real value
+_UNKNOWN = object()
+
+
+class SheetsError(Exception):
+    """A Sheets API call failed."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class SheetsClient:
+    """Minimal Sheets v4 values client with OAuth refresh-token auth."""
+
+    def __init__(
+        self,
+        spreadsheet_id: str,
+        base_url: str = settings.SHEETS_API_URL,
+        token_url: str = settings.SHEETS_TOKEN_URL,
+        timeout: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.spreadsheet_id = spreadsheet_id
+        self.token_url = token_url
+        self._http = httpx.AsyncClient(base_url=base_url, timeout=timeout, transport=transport)
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+
+    async def get_values(self, range_: str) -> list[list]:
+        """Cell values of a range (rows with trailing empty cells trimmed)."""
+        resp = await self._request(
+            "GET",
+            f"/v4/spreadsheets/{self.spreadsheet_id}/values/{range_}",
+            params={"valueRenderOption": "UNFORMATTED_VALUE"}
+        )
+        return resp.json().get("values", [])
+
+    async def batch_update(self, data: list[dict]) -> int:
+        """
+        Write several ranges in one request.
+
+        Args:
+            data: [{"range": "Leads!B5:D5", "values": [[...]]}]
+
+        Returns:
+            Number of cells updated
+        """
+        resp = await self._request(
+            "POST",
+            f"/v4/spreadsheets/{self.spreadsheet_id}/values:batchUpdate",
+            json={"valueInputOption": "RAW", "data": data}
+        )
+        return resp.json().get("totalUpdatedCells", 0)
+
+    async def close(self) -> None:
+        await self._http.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {await self._access_token()}"}
+        try:
+            resp = await self._http.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            raise SheetsError(f"Transport error: {e}", retryable=True) from e
+
+        if resp.status_code == 401:
+            self._token = None  # expired early; refresh on the retry
+            raise SheetsError("HTTP 401", retryable=True)
+        if resp.status_code == 429 or resp.status_code >= 500:
+            retry_after = resp.headers.get("Retry-After")
+            raise SheetsError(
+                f"HTTP {resp.status_code}",
+                retryable=True,
+                retry_after=float(retry_after) if retry_after else None
+            )
+        if resp.status_code >= 400:
+            raise SheetsError(f"HTTP {resp.status_code}: {resp.text[:200]}")
+        return resp
+
+    async def _access_token(self) -> str:
+        if self._token and time.monotonic() < self._token_expires:
+            return self._token
+        try:
+            resp = await self._http.post(self.token_url, data={
+                "grant_type": "refresh_token",
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "refresh_token": settings.GOOGLE_REFRESH_TOKEN,
+            })
+        except httpx.HTTPError as e:
+            raise SheetsError(f"Token refresh failed: {e}", retryable=True) from e
+        if resp.status_code != 200:
+            raise SheetsError(f"Token refresh failed: HTTP {resp.status_code}", retryable=resp.status_code >= 500)
+        body = resp.json()
+        self._token = body["access_token"]
+        # Refresh a minute early so in-flight requests don't race expiry
+        self._token_expires = time.monotonic() + body.get("expires_in", 3600) - 60
+        return self._token
+
+
+class SheetsSync:
+    """Coalescing, diffing, quota-aware lead -> sheet writer."""
+
+    def __init__(
+        self,
+        client: SheetsClient,
+        sheet: str = settings.SHEETS_SHEET_NAME,
+        per_minute: int = settings.SHEETS_WRITE_REQUESTS_PER_MINUTE,
+        flush_seconds: float = settings.SHEETS_FLUSH_SECONDS,
+        max_rows_per_request: int = settings.SHEETS_MAX_ROWS_PER_REQUEST
+    ):
+        self.client = client
+        self.sheet = sheet
+        self.flush_seconds = flush_seconds
+        self.max_rows_per_request = max_rows_per_request
+        self.bucket = TokenBucket("sheets_writes", per_minute, burst=max(1, per_minute // 6))
+
+        # lead_key -> latest unsent cell values, and when it first became dirty
+        self._pending: dict[str, list] = {}
+        self._dirty_since: dict[str, float] = {}
+        # What the sheet holds: lead_key -> cell values, and its 1-based row
+        self._snapshot: dict[str, list] = {}
+        self._row_of: dict[str, int] = {}
+        self._next_row = 2
+        self._loaded = False
+
+        self._failures = 0
+        self._retry_at = 0.0
+        self._running = False
+        self._wakeup = asyncio.Event()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, row: dict) -> None:
+        """Queue a lead's current values (replacing any unsent ones)."""
+        lead_key = row["lead_key"]
+        self._pending[lead_key] = [_cell(row.get(column)) for column in COLUMNS]
+        self._dirty_since.setdefault(lead_key, time.monotonic())
+        if len(self._pending) >= self.max_rows_per_request:
+            self._wakeup.set()
+
+    async def load(self) -> None:
+        """Read the sheet into the snapshot, writing the header row if missing."""
+        rows = await self.client.get_values(f"{self.sheet}!A1:{_column(len(COLUMNS) - 1)}")
+        self._snapshot.clear()
+        self._row_of.clear()
+        if not rows or rows[0][:len(COLUMNS)] != list(COLUMNS):
+            await self._write([{"range": f"{self.sheet}!A1:{_column(len(COLUMNS) - 1)}1", "values": [list(COLUMNS)]}])
+        for index, values in enumerate(rows[1:], start=2):
+            values = (list(values) + [""] * len(COLUMNS))[:len(COLUMNS)]
+            if values[0]:
+                self._snapshot[values[0]] = values
+                self._row_of[values[0]] = index
+        self._next_row = max(len(rows), 1) + 1
+        self._loaded = True
+
+    async def flush(self) -> int:
+        """
+        Write pending changes in one batchUpdate.
+
+        Returns:
+            Number of leads whose changes reached the sheet
+
+        Raises:
+            SheetsError: If the write failed (changes stay pending)
+            RateLimitExceeded: If no quota token came within the flush interval
+        """
+        if not self._loaded:
+            await self.load()
+        keys = list(self._pending)[:self.max_rows_per_request]
+        if not keys:
+            return 0
+        batch = {key: self._pending.pop(key) for key in keys}
+        data = self._plan(batch)
+        try:
+            if data:
+                await self._write(data)
+        except BaseException:
+            for key, values in batch.items():
+                # Newer submissions made during the write win over the retried values
+                self._pending.setdefault(key, values)
+                # The write may have landed anyway, so the cells it touched
+                # are unknown until rewritten
+                old = self._snapshot.get(key)
+                if old is not None:
+                    self._snapshot[key] = [a if a == b else _UNKNOWN for a, b in zip(old, values)]
+            raise
+
+        now = time.monotonic()
+        for key, values in batch.items():
+            self._snapshot[key] = values
+            if key not in self._pending:
+                metrics.observe("sheets.lag_ms", (now - self._dirty_since.pop(key, now)) * 1000)
+        metrics.increment("sheets.rows_synced", len(batch))
+        return len(batch)
+
+    async def run(self) -> None:
+        """Follow the change feed and keep the sheet in sync until stop() is called."""
+        feed = get_event_feed()
+        cursor = cache_get(CURSOR_KEY) or START
+        self._running = True
+        last_flush = time.monotonic()
+        while self._running:
+            wait = max(0.0, last_flush + self.flush_seconds - time.monotonic())
+            events = await feed.read(cursor, limit=5000, timeout=wait)
+            if events:
+                cursor = events[-1].id
+                await self._resolve(sorted({e.key for e in events if e.type in LEAD_EVENTS}))
+
+            if time.monotonic() - last_flush < self.flush_seconds and not self._wakeup.is_set():
+                continue
+            self._wakeup.clear()
+            last_flush = time.monotonic()
+            if await self._flush_with_retry() and not self._pending:
+                # Everything read so far is in the sheet
+                cache_set(CURSOR_KEY, cursor, settings.MEMORY_TTL_SECONDS)
+
+    async def drain(self) -> None:
+        """Flush until nothing is pending (retrying transient failures)."""
+        while self._pending:
+            if not await self._flush_with_retry():
+                await asyncio.sleep(max(0.05, self._retry_at - time.monotonic()))
+
+    def stop(self) -> None:
+        self._running = False
+        self._wakeup.set()
+
+    async def _flush_with_retry(self) -> bool:
+        """One flush attempt, scheduling a backoff on failure; True if it succeeded."""
+        if time.monotonic() < self._retry_at:
+            return False
+        try:
+            await self.flush()
+        except RateLimitExceeded as e:
+            self._retry_at = time.monotonic() + e.retry_after
+            return False
+        except SheetsError as e:
+            if not e.retryable:
+                # The snapshot may not match the sheet any more; re-read it, drop nothing
+                print(f"[SHEETS] Write rejected ({e}); reloading sheet snapshot")
+                metrics.increment("sheets.rejected")
+                self._loaded = False
+            self._failures += 1
+            # Full jitter, capped at a minute; Retry-After wins when given
+            delay = e.retry_after or random.uniform(0, min(60.0, 0.5 * 2 ** self._failures))
+            self._retry_at = time.monotonic() + delay
+            metrics.increment("sheets.retries")
+            return False
+        self._failures = 0
+        return True
+
+    async def _resolve(self, lead_keys: list[str]) -> None:
+        from tools.upsert_lead import get_lead_by_key
+
+        rows = await asyncio.gather(*(get_lead_by_key(key) for key in lead_keys))
+        for row in rows:
+            if row is not None:
+                self.submit(row.model_dump())
+
+    def _plan(self, batch: dict[str, list]) -> list[dict]:
+        """Ranges to write: whole rows for new leads, changed runs of cells otherwise."""
+        data = []
+        for key, values in batch.items():
+            row = self._row_of.get(key)
+            if row is None:
+                # Fixed now, so a retry of this batch writes the same row
+                row = self._row_of[key] = self._next_row
+                self._next_row += 1
+            old = self._snapshot.get(key)
+            if old is None:
+                data.append(self._range(row, 0, values))
+                continue
+            changed = [i for i, (a, b) in enumerate(zip(old, values)) if a != b]
+            for start, end in _runs(changed):
+                data.append(self._range(row, start, values[start:end + 1]))
+        return data
+
+    def _range(self, row: int, start: int, values: list) -> dict:
+        end = start + len(values) - 1
+        return {"range": f"{self.sheet}!{_column(start)}{row}:{_column(end)}{row}", "values": [values]}
+
+    async def _write(self, data: list[dict]) -> None:
+        await self.bucket.acquire("writes", timeout=max(self.flush_seconds, 1.0))
+        cells = await self.client.batch_update(data)
+        metrics.increment("sheets.requests")
+        metrics.increment("sheets.cells_written", cells)
+
+
+def _cell(value: Any) -> Any:
+    # As the API returns them with UNFORMATTED_VALUE, so diffs compare like with like
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def _column(index: int) -> str:
+    return chr(ord("A") + index)
+
+
+def _runs(indexes: list[int]) -> list[tuple[int, int]]:
+    runs = []
+    for i in indexes:
+        if runs and runs[-1][1] + 1 == i:
+            runs[-1] = (runs[-1][0], i)
+        else:
+            runs.append((i, i))
+    return runs
+
+
+_sync: Optional[SheetsSync] = None
+
+
+def get_sheets_sync() -> SheetsSync:
+    """Get the shared sync worker for SHEETS_SPREADSHEET_ID."""
+    global _sync
+    if _sync is None:
+        _sync = SheetsSync(SheetsClient(settings.SHEETS_SPREADSHEET_ID))
+    return _sync
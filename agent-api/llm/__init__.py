@@ -0,0 +1,55 @@
+"""
+LLM Module
+
+Shared LLM access for the agent tools.
+
+Components:
+- providers.py: Request/response mapping per backend (Gemini, Anthropic)
+- client.py: Resilient async client (retries, hedging, circuit breaker)
+- errors.py: LLMError / CircuitOpenError
+- router.py: Latency/error/cost-aware provider selection with failover
+- structured.py: Schema-constrained scoring output and repair
+- tokens.py: Token counting for prompt-size reports and cache minimums
+- mock.py: Fault-injecting local provider for tests and benchmarks
+
+Exports are imported lazily (PEP 562), so `import llm.tokens` does not
+load httpx and the client stack.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import LLMClient, LLMResponse
+    from .errors import LLMError, CircuitOpenError
+    from .providers import Provider, GeminiProvider, AnthropicProvider
+    from .router import LLMRouter, get_llm_router, close_llm_router
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "LLMClient": "client",
+    "LLMResponse": "client",
+    "LLMError": "errors",
+    "CircuitOpenError": "errors",
+    "Provider": "providers",
+    "GeminiProvider": "providers",
+    "AnthropicProvider": "providers",
+    "LLMRouter": "router",
+    "get_llm_router": "router",
+    "close_llm_router": "router",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
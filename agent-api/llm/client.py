@@ -0,0 +1,381 @@
+"""
+Resilient LLM Client
+
+Async client for one LLM provider (see providers.py).
+
+- One persistent httpx.AsyncClient (connection pool + keep-alive)
+- Retries on 429/5xx/timeouts with full-jitter exponential backoff
+- Hedged requests: if the first attempt has not answered after the
+  recent p95 latency, a duplicate is sent and the first reply wins
+- Streaming (server-sent events) for callers that show text as it is
+  generated; retried only until the first chunk arrives, not hedged
+- Circuit breaker: after repeated failures calls fail fast with
+  CircuitOpenError so callers can fall back to rule-based scoring
+- Every HTTP attempt takes a slot from the shared LLM governor
+- Static system prompts are cached provider-side when the provider
+  supports it (see Provider.cache_prefix)
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import httpx
+
+import metrics
+from config import settings
+from guardrails.rate_limit import llm_governor
+from llm.errors import LLMError, CircuitOpenError
+from llm.providers import Provider
+from serialization import loads
+
+
+@dataclass
+class LLMResponse:
+    """Text and usage returned by one LLM call."""
+    text: str
+    model: str
+    provider: str = ""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0          # input tokens served from the prompt cache
+    latency_ms: float = 0.0
+    cost_usd: float = 0.0
+    hedged: bool = False
+    structured: Optional[dict] = None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    - calls flow normally
+    open      - calls fail fast until reset_seconds have passed
+    half_open - one probe call is let through; success closes the
+                circuit, failure re-opens it
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted now."""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._set_state("half_open")
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state != "closed":
+            self._set_state("closed")
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state("open")
+
+    def release(self) -> None:
+        """
+        End a call that neither succeeded nor failed at the provider
+        (cancelled, or refused by the local governor).
+
+        A half-open probe slot is handed back, so the next call probes.
+        """
+        self._probe_in_flight = False
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        metrics.set_gauge("llm.breaker_open", 1 if state == "open" else 0, breaker=self.name)
+        metrics.increment("llm.breaker_transitions", breaker=self.name, state=state)
+
+
+class LLMClient:
+    """Provider REST client with retries, hedging and a circuit breaker."""
+
+    # Latencies kept for the hedge-delay p95 estimate
+    LATENCY_WINDOW = 200
+
+    def __init__(
+        self,
+        provider: Provider,
+        timeout: float = settings.LLM_TIMEOUT_SECONDS,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        hedge: bool = settings.LLM_HEDGE_ENABLED,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.provider = provider
+        self.model = provider.model
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self.breaker = CircuitBreaker(
+            provider.name,
+            settings.LLM_BREAKER_FAILURE_THRESHOLD,
+            settings.LLM_BREAKER_RESET_SECONDS
+        )
+        self._http = httpx.AsyncClient(
+            base_url=provider.base_url,
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers=provider.headers()
+        )
+        self._latencies: deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[dict] = None
+    ) -> LLMResponse:
+        """
+        Generate a completion.
+
+        Args:
+            prompt: User prompt
+            system: Optional system instruction
+            options: Provider-specific request fields
+
+        Returns:
+            LLMResponse
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            LLMError: If all retries failed
+        """
+        if not self.breaker.allow():
+            metrics.increment("llm.short_circuited", model=self.model)
+            raise CircuitOpenError(f"Circuit open for {self.model}")
+
+        try:
+            cached = await self.provider.cache_prefix(self._http, system) if system else None
+            request = self.provider.build_request(prompt, system, options, cached)
+            response = await self._with_retries(request)
+        except LLMError:
+            self.breaker.record_failure()
+            metrics.increment("llm.failures", model=self.model)
+            raise
+        except BaseException:
+            # Cancellation, governor refusal (RateLimitExceeded) etc. say
+            # nothing about the provider, but must not leave a half-open
+            # probe marked in flight forever
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success()
+        return response
+
+    async def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a completion as a stream of text chunks.
+
+        Failed attempts are retried like generate() until the first chunk
+        has been yielded; after that a failure is raised, since the caller
+        has already seen part of the text.
+
+        Args:
+            prompt: User prompt
+            system: Optional system instruction
+            options: Provider-specific request fields
+
+        Yields:
+            Text chunks
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            LLMError: If all retries failed, or the stream broke off
+        """
+        if not self.breaker.allow():
+            metrics.increment("llm.short_circuited", model=self.model)
+            raise CircuitOpenError(f"Circuit open for {self.model}")
+
+        try:
+            cached = await self.provider.cache_prefix(self._http, system) if system else None
+            request = self.provider.build_stream_request(prompt, system, options, cached)
+            for attempt in range(self.max_retries + 1):
+                started = False
+                try:
+                    async for text in self._send_stream(request):
+                        started = True
+                        yield text
+                    break
+                except LLMError as e:
+                    if started or not e.retryable or attempt == self.max_retries:
+                        raise
+                    metrics.increment("llm.retries", model=self.model)
+                    await asyncio.sleep(random.uniform(0, settings.LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+        except LLMError:
+            self.breaker.record_failure()
+            metrics.increment("llm.failures", model=self.model)
+            raise
+        except BaseException:
+            # Consumer went away (GeneratorExit), cancellation, governor refusal
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success()
+
+    async def warm(self) -> bool:
+        """
+        Open a pooled connection (DNS, TCP, TLS) before the first call.
+
+        Returns:
+            True if the provider answered (any status)
+        """
+        try:
+            await self._http.get(self.provider.warmup_path())
+        except httpx.HTTPError:
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Close the underlying connection pool."""
+        await self._http.aclose()
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before sending a hedge: recent p95, with a floor."""
+        floor = settings.LLM_HEDGE_MIN_DELAY_MS / 1000
+        if len(self._latencies) < 20:
+            return max(floor, settings.LLM_TIMEOUT_SECONDS / 4)
+        ordered = sorted(self._latencies)
+        return max(floor, ordered[int(0.95 * (len(ordered) - 1))])
+
+    async def _with_retries(self, request: tuple[str, dict]) -> LLMResponse:
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.hedge:
+                    return await self._hedged(request)
+                return await self._send(request)
+            except LLMError as e:
+                if not e.retryable or attempt == self.max_retries:
+                    raise
+                metrics.increment("llm.retries", model=self.model)
+                # Full jitter: spread retries so replicas don't stampede the provider
+                await asyncio.sleep(random.uniform(0, settings.LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+        raise LLMError("unreachable")
+
+    async def _hedged(self, request: tuple[str, dict]) -> LLMResponse:
+        """Send the request; send a duplicate if it is slower than p95."""
+        primary = asyncio.create_task(self._send(request))
+        pending = {primary}
+        error: Optional[BaseException] = None
+        # Whatever ends this call (an answer, an error, the caller being
+        # cancelled), attempts still in flight are cancelled so none keeps
+        # its governor slot
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay())
+            if done:
+                return primary.result()
+
+            metrics.increment("llm.hedges", model=self.model)
+            backup = asyncio.create_task(self._send(request))
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        response = task.result()
+                        response.hedged = task is backup
+                        return response
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    async def _send(self, request: tuple[str, dict]) -> LLMResponse:
+        """One HTTP attempt, holding a governor slot."""
+        path, body = request
+        async with llm_governor.slot(provider=self.provider.name):
+            started = time.perf_counter()
+            try:
+                resp = await self._http.post(path, json=body)
+            except httpx.TimeoutException as e:
+                raise LLMError(f"Timeout: {e}", retryable=True) from e
+            except httpx.TransportError as e:
+                raise LLMError(f"Transport error: {e}", retryable=True) from e
+            latency = time.perf_counter() - started
+
+        if resp.status_code == 429 or resp.status_code >= 500:
+            raise LLMError(f"HTTP {resp.status_code}", retryable=True, status_code=resp.status_code)
+        if resp.status_code >= 400:
+            raise LLMError(f"HTTP {resp.status_code}: {resp.text[:200]}", status_code=resp.status_code)
+
+        self._latencies.append(latency)
+        metrics.observe("llm.latency_ms", latency * 1000, model=self.model)
+        try:
+            data = resp.json()
+        except ValueError as e:
+            raise LLMError(f"Malformed response: {e}", retryable=True, status_code=resp.status_code) from e
+        return self._parse_response(data, latency)
+
+    async def _send_stream(self, request: tuple[str, dict]) -> AsyncIterator[str]:
+        """One streamed HTTP attempt, holding a governor slot until it ends."""
+        path, body = request
+        async with llm_governor.slot(provider=self.provider.name):
+            started = time.perf_counter()
+            first = True
+            try:
+                async with self._http.stream("POST", path, json=body) as resp:
+                    if resp.status_code == 429 or resp.status_code >= 500:
+                        raise LLMError(f"HTTP {resp.status_code}", retryable=True, status_code=resp.status_code)
+                    if resp.status_code >= 400:
+                        await resp.aread()
+                        raise LLMError(f"HTTP {resp.status_code}: {resp.text[:200]}", status_code=resp.status_code)
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        try:
+                            text = self.provider.parse_stream_event(loads(line[5:].strip()))
+                        except (KeyError, IndexError, TypeError, ValueError) as e:
+                            raise LLMError(f"Malformed stream event: {e}", retryable=True) from e
+                        if not text:
+                            continue
+                        if first:
+                            first = False
+                            metrics.observe(
+                                "llm.first_chunk_ms", (time.perf_counter() - started) * 1000, model=self.model
+                            )
+                        yield text
+            except httpx.TimeoutException as e:
+                raise LLMError(f"Timeout: {e}", retryable=True) from e
+            except httpx.TransportError as e:
+                raise LLMError(f"Transport error: {e}", retryable=True) from e
+
+    def _parse_response(self, data: dict, latency: float) -> LLMResponse:
+        try:
+            fields = self.provider.parse_response(data)
+        except (KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Malformed response: {e}") from e
+        if fields.get("cached_tokens"):
+            metrics.increment("llm.cached_input_tokens", fields["cached_tokens"], model=self.model)
+        return LLMResponse(
+            model=self.model,
+            provider=self.provider.name,
+            latency_ms=latency * 1000,
+            cost_usd=self.provider.estimate_cost(
+                fields["input_tokens"], fields["output_tokens"], fields.get("cached_tokens", 0)
+            ),
+            **fields
+        )
@@ -0,0 +1,21 @@
+"""
+LLM Errors
+
+Kept apart from client.py so callers that only need to catch LLM
+failures (e.g. rule-based scoring fallbacks) don't import httpx.
+"""
+
+from typing import Optional
+
+
+class LLMError(Exception):
+    """An LLM call failed."""
+
+    def __init__(self, message: str, retryable: bool = False, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status_code = status_code
+
+
+class CircuitOpenError(LLMError):
+    """The circuit breaker is open; the provider is considered degraded."""
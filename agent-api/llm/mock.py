@@ -0,0 +1,214 @@
+"""
+Fault-Injecting Mock LLM
+
+A local stand-in for the Gemini generateContent and Anthropic Messages
+endpoints, used by benchmarks and tests. It plugs into LLMClient as an
+httpx transport, so the real retry, hedging, breaker and routing code
+paths are exercised without network access or API keys.
+
+Faults are drawn per request:
+- latency: base latency with a configurable slow tail
+- errors: HTTP 500 / 429 responses
+- hangs: requests that never answer (surface as client timeouts)
+
+Streaming (streamGenerateContent?alt=sse, Anthropic "stream": true)
+answers with the reply split into word chunks as server-sent events.
+
+Prompt caching is simulated too: cachedContents uploads are kept in
+memory and reported back as cachedContentTokenCount, and Anthropic
+cache_control system blocks report cache_read_input_tokens after the
+first call.
+
+Usage:
+    from llm.mock import mock_llm_client, mock_router
+    client = mock_llm_client(error_rate=0.1, tail_rate=0.05)
+    response = await client.generate("Score this lead")
+
+    router = mock_router(fast={"base_latency_ms": 30}, slow={"base_latency_ms": 400})
+"""
+
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import httpx
+
+from llm.client import LLMClient
+from llm.tokens import count_tokens
+from llm.providers import GeminiProvider, AnthropicProvider
+from llm.router import LLMRouter
+
+
+def _default_reply(prompt: str) -> str:
+    return json.dumps({
+        "score": 72,
+        "tier": "qualified",
+        "segment": "smb",
+        "criteria_scores": {
+            "industry_fit": 70, "budget": 70, "authority": 75,
+            "need": 70, "timeline": 70, "company_size": 70,
+        },
+        "missing_fields": [],
+        "confidence": "medium",
+        "reasoning": "Mock response",
+    })
+
+
+@dataclass
+class FaultConfig:
+    """Fault injection settings for the mock provider."""
+    base_latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    tail_rate: float = 0.0          # fraction of requests that are slow
+    tail_latency_ms: float = 2000.0
+    error_rate: float = 0.0         # fraction answered with HTTP 500
+    throttle_rate: float = 0.0      # fraction answered with HTTP 429
+    hang_rate: float = 0.0          # fraction that never answer
+    reply: Callable[[str], str] = field(default=_default_reply)
+    seed: Optional[int] = None
+
+
+class FaultInjectingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that simulates a Gemini-compatible endpoint."""
+
+    def __init__(self, config: FaultConfig):
+        self.config = config
+        self.requests = 0
+        self._random = random.Random(config.seed)
+        # cache name / system text -> token count
+        self._cached: dict[str, int] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        cfg = self.config
+        roll = self._random.random()
+
+        if roll < cfg.hang_rate:
+            await asyncio.sleep(3600)
+
+        latency = cfg.base_latency_ms + self._random.uniform(0, cfg.jitter_ms)
+        if self._random.random() < cfg.tail_rate:
+            latency = cfg.tail_latency_ms
+        await asyncio.sleep(latency / 1000)
+
+        roll = self._random.random()
+        if roll < cfg.error_rate:
+            return httpx.Response(500, json={"error": {"message": "injected failure"}})
+        if roll < cfg.error_rate + cfg.throttle_rate:
+            return httpx.Response(429, json={"error": {"message": "injected throttle"}})
+
+        if request.method == "GET":
+            return httpx.Response(200, json={"models": [], "data": []})
+
+        body = json.loads(request.content)
+        if request.url.path.endswith("/cachedContents"):
+            name = f"cachedContents/mock-{len(self._cached)}"
+            system = "".join(p["text"] for p in body["systemInstruction"]["parts"])
+            self._cached[name] = count_tokens(system)
+            return httpx.Response(200, json={"name": name, "model": body["model"]})
+
+        if request.url.path.endswith("/v1/messages"):
+            if body.get("stream"):
+                return self._anthropic_stream(body)
+            return self._anthropic_reply(body)
+        if request.url.path.endswith(":streamGenerateContent"):
+            return self._gemini_stream(body)
+        return self._gemini_reply(body)
+
+    def _gemini_stream(self, body: dict) -> httpx.Response:
+        prompt = "".join(p.get("text", "") for p in body["contents"][-1]["parts"])
+        events = [
+            {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+            for chunk in _chunks(self.config.reply(prompt))
+        ]
+        return _sse_response(events)
+
+    def _anthropic_stream(self, body: dict) -> httpx.Response:
+        prompt = body["messages"][-1]["content"]
+        events = [{"type": "message_start", "message": {"usage": {"input_tokens": count_tokens(prompt)}}}]
+        events += [
+            {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}}
+            for chunk in _chunks(self.config.reply(prompt))
+        ]
+        events.append({"type": "message_stop"})
+        return _sse_response(events)
+
+    def _gemini_reply(self, body: dict) -> httpx.Response:
+        prompt = "".join(p.get("text", "") for p in body["contents"][-1]["parts"])
+        text = self.config.reply(prompt)
+        cached = self._cached.get(body.get("cachedContent"), 0)
+        system = "".join(p["text"] for p in body.get("systemInstruction", {}).get("parts", []))
+        return httpx.Response(200, json={
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}],
+            "usageMetadata": {
+                "promptTokenCount": count_tokens(prompt) + count_tokens(system) + cached,
+                "candidatesTokenCount": count_tokens(text),
+                "cachedContentTokenCount": cached,
+            },
+        })
+
+    def _anthropic_reply(self, body: dict) -> httpx.Response:
+        prompt = body["messages"][-1]["content"]
+        text = self.config.reply(prompt)
+        usage = {"input_tokens": count_tokens(prompt), "output_tokens": count_tokens(text)}
+        system = body.get("system", "")
+        if isinstance(system, list):
+            system = system[0]["text"]
+            tokens = count_tokens(system)
+            if system in self._cached:
+                usage["cache_read_input_tokens"] = tokens
+            else:
+                self._cached[system] = tokens
+                usage["cache_creation_input_tokens"] = tokens
+        else:
+            usage["input_tokens"] += count_tokens(system)
+        return httpx.Response(200, json={"content": [{"type": "text", "text": text}], "usage": usage})
+
+
+def _chunks(text: str) -> list[str]:
+    words = text.split(" ")
+    return [words[0]] + [" " + word for word in words[1:]]
+
+
+def _sse_response(events: list[dict]) -> httpx.Response:
+    body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+    return httpx.Response(200, headers={"Content-Type": "text/event-stream"}, content=body.encode())
+
+
+_PROVIDER_OPTIONS = ("cost_per_1k_input", "cost_per_1k_output", "max_concurrency", "prompt_cache")
+_CLIENT_OPTIONS = ("hedge", "max_retries", "timeout")
+
+
+def mock_llm_client(name: str = "mock", api: str = "gemini", **faults) -> LLMClient:
+    """
+    Build an LLMClient wired to a fault-injecting mock.
+
+    Args:
+        name: Provider name used for routing and metrics
+        api: Wire format to simulate ("gemini" or "anthropic")
+        **faults: FaultConfig fields, Provider pricing/concurrency
+                  fields, and LLMClient options (hedge, max_retries, timeout)
+    """
+    provider_options = {k: faults.pop(k) for k in _PROVIDER_OPTIONS if k in faults}
+    client_options = {k: faults.pop(k) for k in _CLIENT_OPTIONS if k in faults}
+    provider_cls = AnthropicProvider if api == "anthropic" else GeminiProvider
+    provider = provider_cls(
+        name=name,
+        model=f"mock-{name}",
+        api_key="mock",
+        base_url=f"http://{name}.mock.local",
+        **provider_options
+    )
+    transport = FaultInjectingTransport(FaultConfig(**faults))
+    return LLMClient(provider, transport=transport, **client_options)
+
+
+def mock_router(**providers: dict) -> LLMRouter:
+    """
+    Build an LLMRouter over several mock providers.
+
+    Each keyword is a provider name mapped to mock_llm_client options.
+    """
+    return LLMRouter([mock_llm_client(name=name, **opts) for name, opts in providers.items()])
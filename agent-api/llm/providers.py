@@ -0,0 +1,317 @@
+"""
+LLM Providers
+
+Request/response mapping for each supported LLM backend. Providers
+are plain descriptions of an HTTP API; retries, hedging and circuit
+breaking live in LLMClient, and backend selection in LLMRouter.
+
+Prompt prefix caching: a long, static system prompt can be cached
+provider-side so each call only pays full price (and prefill time) for
+the per-lead user prompt.
+- Gemini: explicit context caching - the system instruction is uploaded
+  once to cachedContents and referenced by name in generateContent
+- Anthropic: the system block is marked cache_control "ephemeral"
+
+Both providers have a minimum cacheable prefix size (MIN_CACHE_TOKENS);
+shorter prefixes are sent inline as before.
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import httpx
+
+import metrics
+from config import settings
+from llm.tokens import count_tokens
+
+
+@dataclass
+class Provider:
+    """Base provider: connection details and pricing."""
+    name: str
+    model: str
+    api_key: str
+    base_url: str
+    cost_per_1k_input: float = 0.0
+    cost_per_1k_output: float = 0.0
+    max_concurrency: int = 16
+    prompt_cache: bool = False
+
+    # Smallest system prefix the provider will cache, in tokens
+    MIN_CACHE_TOKENS = 0
+    # Price of a cached input token relative to an uncached one
+    CACHED_INPUT_RATE = 1.0
+
+    def headers(self) -> dict:
+        return {}
+
+    def warmup_path(self) -> str:
+        """Cheap authenticated GET used to open a pooled connection."""
+        return "/"
+
+    def cacheable(self, system: Optional[str]) -> bool:
+        """Whether a system prefix is worth caching on this provider."""
+        return bool(self.prompt_cache and system and count_tokens(system) >= self.MIN_CACHE_TOKENS)
+
+    async def cache_prefix(self, http: httpx.AsyncClient, system: str) -> Optional[str]:
+        """
+        Make sure the system prefix is cached provider-side.
+
+        Returns:
+            A cache reference to pass to build_request, or None to send
+            the system prompt inline
+        """
+        return None
+
+    def build_request(
+        self,
+        prompt: str,
+        system: Optional[str],
+        options: Optional[dict],
+        cached: Optional[str] = None
+    ) -> tuple[str, dict]:
+        """Return (path, JSON body) for one completion request."""
+        raise NotImplementedError
+
+    def build_stream_request(
+        self,
+        prompt: str,
+        system: Optional[str],
+        options: Optional[dict],
+        cached: Optional[str] = None
+    ) -> tuple[str, dict]:
+        """Return (path, JSON body) for a completion streamed as server-sent events."""
+        raise NotImplementedError
+
+    def parse_stream_event(self, data: dict) -> str:
+        """Text delta carried by one server-sent event payload ("" if none)."""
+        raise NotImplementedError
+
+    def parse_response(self, data: dict) -> dict:
+        """
+        Map a response body to LLMResponse fields.
+
+        Returns a dict with text, input_tokens (including cached),
+        output_tokens, cached_tokens and, for providers that return
+        already-parsed structured output, structured.
+        """
+        raise NotImplementedError
+
+    def estimate_cost(self, input_tokens: int, output_tokens: int, cached_tokens: int = 0) -> float:
+        """Cost in USD for the given token counts."""
+        billed_input = input_tokens - cached_tokens + cached_tokens * self.CACHED_INPUT_RATE
+        return (billed_input * self.cost_per_1k_input + output_tokens * self.cost_per_1k_output) / 1000
+
+
+@dataclass
+class GeminiProvider(Provider):
+    """Google Gemini generateContent API."""
+
+    MIN_CACHE_TOKENS = 1024
+    CACHED_INPUT_RATE = 0.25
+
+    # sha256(system) -> (cachedContents name or None, refresh deadline)
+    _caches: dict = field(default_factory=dict, init=False, repr=False)
+    _cache_lock: asyncio.Lock = field(default_factory=asyncio.Lock, init=False, repr=False)
+
+    def headers(self) -> dict:
+        return {"x-goog-api-key": self.api_key}
+
+    def warmup_path(self) -> str:
+        return "/v1beta/models?pageSize=1"
+
+    async def cache_prefix(self, http: httpx.AsyncClient, system: str) -> Optional[str]:
+        if not self.cacheable(system):
+            return None
+        digest = hashlib.sha256(system.encode()).hexdigest()
+        entry = self._caches.get(digest)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+
+        async with self._cache_lock:
+            entry = self._caches.get(digest)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            name = await self._create_cache(http, system, digest)
+            # Refresh a minute before the provider expires it; after a
+            # failed create, retry no sooner than one TTL later
+            ttl = settings.LLM_PROMPT_CACHE_TTL_SECONDS
+            self._caches[digest] = (name, time.monotonic() + (ttl - 60 if name else ttl))
+            return name
+
+    async def _create_cache(self, http: httpx.AsyncClient, system: str, digest: str) -> Optional[str]:
+        try:
+            resp = await http.post("/v1beta/cachedContents", json={
+                "model": f"models/{self.model}",
+                "displayName": f"system-{digest[:16]}",
+                "systemInstruction": {"parts": [{"text": system}]},
+                "ttl": f"{settings.LLM_PROMPT_CACHE_TTL_SECONDS}s",
+            })
+        except httpx.HTTPError:
+            resp = None
+        if resp is None or resp.status_code >= 400:
+            metrics.increment("llm.prompt_cache.create", provider=self.name, result="failed")
+            return None
+        metrics.increment("llm.prompt_cache.create", provider=self.name, result="ok")
+        return resp.json()["name"]
+
+    def build_request(
+        self,
+        prompt: str,
+        system: Optional[str],
+        options: Optional[dict],
+        cached: Optional[str] = None
+    ) -> tuple[str, dict]:
+        body = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": settings.LLM_TEMPERATURE,
+                "maxOutputTokens": settings.LLM_MAX_TOKENS,
+                **(options or {}),
+            },
+        }
+        if cached:
+            body["cachedContent"] = cached
+        elif system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        return f"/v1beta/models/{self.model}:generateContent", body
+
+    def build_stream_request(
+        self,
+        prompt: str,
+        system: Optional[str],
+        options: Optional[dict],
+        cached: Optional[str] = None
+    ) -> tuple[str, dict]:
+        _, body = self.build_request(prompt, system, options, cached)
+        return f"/v1beta/models/{self.model}:streamGenerateContent?alt=sse", body
+
+    def parse_stream_event(self, data: dict) -> str:
+        # Each event is a partial GenerateContentResponse; the last may
+        # carry only usageMetadata
+        candidates = data.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(p.get("text", "") for p in parts)
+
+    def parse_response(self, data: dict) -> dict:
+        parts = data["candidates"][0]["content"]["parts"]
+        usage = data.get("usageMetadata", {})
+        return {
+            "text": "".join(p.get("text", "") for p in parts),
+            "input_tokens": usage.get("promptTokenCount", 0),
+            "output_tokens": usage.get("candidatesTokenCount", 0),
+            "cached_tokens": usage.get("cachedContentTokenCount", 0),
+        }
+
+
+class AnthropicProvider(Provider):
+    """Anthropic Messages API."""
+
+    API_VERSION = "2023-06-01"
+    # 2048 for Haiku models; shorter prefixes are simply not cached
+    MIN_CACHE_TOKENS = 1024
+    CACHED_INPUT_RATE = 0.1
+
+    def headers(self) -> dict:
+        return {"x-api-key": self.api_key, "anthropic-version": self.API_VERSION}
+
+    def warmup_path(self) -> str:
+        return "/v1/models?limit=1"
+
+    async def cache_prefix(self, http: httpx.AsyncClient, system: str) -> Optional[str]:
+        # Caching is requested inline, per call, via cache_control
+        return "ephemeral" if self.cacheable(system) else None
+
+    def build_request(
+        self,
+        prompt: str,
+        system: Optional[str],
+        options: Optional[dict],
+        cached: Optional[str] = None
+    ) -> tuple[str, dict]:
+        body = {
+            "model": self.model,
+            "max_tokens": settings.LLM_MAX_TOKENS,
+            "temperature": settings.LLM_TEMPERATURE,
+            "messages": [{"role": "user", "content": prompt}],
+            **(options or {}),
+        }
+        if system and cached:
+            body["system"] = [{"type": "text", "text": system, "cache_control": {"type": cached}}]
+        elif system:
+            body["system"] = system
+        return "/v1/messages", body
+
+    def build_stream_request(
+        self,
+        prompt: str,
+        system: Optional[str],
+        options: Optional[dict],
+        cached: Optional[str] = None
+    ) -> tuple[str, dict]:
+        path, body = self.build_request(prompt, system, options, cached)
+        return path, {**body, "stream": True}
+
+    def parse_stream_event(self, data: dict) -> str:
+        if data.get("type") == "content_block_delta" and data["delta"].get("type") == "text_delta":
+            return data["delta"]["text"]
+        if data.get("type") == "error":
+            raise ValueError(data["error"].get("message", "stream error"))
+        return ""
+
+    def parse_response(self, data: dict) -> dict:
+        usage = data.get("usage", {})
+        # Forced tool use returns the structured output already parsed
+        structured = next(
+            (block["input"] for block in data["content"] if block.get("type") == "tool_use"),
+            None
+        )
+        # input_tokens excludes cache reads/writes; report the full prompt
+        cache_read = usage.get("cache_read_input_tokens", 0)
+        cache_write = usage.get("cache_creation_input_tokens", 0)
+        return {
+            "text": "".join(block.get("text", "") for block in data["content"] if block.get("type") == "text"),
+            "input_tokens": usage.get("input_tokens", 0) + cache_read + cache_write,
+            "output_tokens": usage.get("output_tokens", 0),
+            "cached_tokens": cache_read,
+            "structured": structured,
+        }
+
+
+def configured_providers(models: Optional[dict[str, str]] = None) -> list[Provider]:
+    """
+    Build providers for every API key present in settings.
+
+    Args:
+        models: Optional model per provider name, overriding LLM_MODEL /
+                ANTHROPIC_MODEL (e.g. {"gemini": "gemini-2.5-pro"})
+    """
+    models = models or {}
+    providers = []
+    if settings.GEMINI_API_KEY:
+        providers.append(GeminiProvider(
+            name="gemini",
+            model=models.get("gemini", settings.LLM_MODEL),
+            api_key=settings.GEMINI_API_KEY,
+            base_url=settings.LLM_BASE_URL,
+            cost_per_1k_input=settings.GEMINI_COST_PER_1K_INPUT,
+            cost_per_1k_output=settings.GEMINI_COST_PER_1K_OUTPUT,
+            max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+            prompt_cache=settings.LLM_PROMPT_CACHE_ENABLED,
+        ))
+    if settings.ANTHROPIC_API_KEY:
+        providers.append(AnthropicProvider(
+            name="anthropic",
+            model=models.get("anthropic", settings.ANTHROPIC_MODEL),
+            api_key=settings.ANTHROPIC_API_KEY,
+            base_url=settings.ANTHROPIC_BASE_URL,
+            cost_per_1k_input=settings.ANTHROPIC_COST_PER_1K_INPUT,
+            cost_per_1k_output=settings.ANTHROPIC_COST_PER_1K_OUTPUT,
+            max_concurrency=settings.ANTHROPIC_MAX_CONCURRENCY,
+            prompt_cache=settings.LLM_PROMPT_CACHE_ENABLED,
+        ))
+    return providers
@@ -0,0 +1,278 @@
+"""
+LLM Router
+
+Picks a provider for each scoring/drafting call based on rolling
+latency, error rate and cost, and fails over to the next provider
+when a call fails.
+
+Each provider has its own LLMClient (connection pool, retries,
+hedging, circuit breaker) and its own concurrency limit. A provider
+whose breaker is open or whose concurrency limit is full is skipped.
+
+Selection cost per provider (lower is better):
+
+    latency_ewma_ms
+    + ERROR_PENALTY_MS * error_rate_ewma
+    + COST_PENALTY_MS_PER_USD * avg_cost_usd
+
+A small share of calls (EXPLORE_RATE) goes to a non-best provider so
+stale statistics recover after a provider comes back.
+"""
+
+import asyncio
+import random
+from typing import AsyncIterator, Optional
+
+import metrics
+from llm.client import LLMClient, LLMResponse
+from llm.errors import LLMError
+from llm.providers import configured_providers
+
+
+class ProviderStats:
+    """Exponentially weighted latency, error rate and cost for a provider."""
+
+    ALPHA = 0.2
+
+    def __init__(self):
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.cost_usd = 0.0
+
+    def record_success(self, response: LLMResponse) -> None:
+        self.latency_ms = self._ewma(self.latency_ms, response.latency_ms)
+        self.error_rate = self._ewma(self.error_rate, 0.0)
+        self.cost_usd = self._ewma(self.cost_usd, response.cost_usd)
+
+    def record_failure(self) -> None:
+        self.error_rate = self._ewma(self.error_rate, 1.0)
+
+    def _ewma(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return current + self.ALPHA * (value - current)
+
+
+class LLMRouter:
+    """Latency/error/cost-aware router with failover across providers."""
+
+    ERROR_PENALTY_MS = 5000.0
+    COST_PENALTY_MS_PER_USD = 100_000.0
+    # Assumed latency for a provider with no observations yet
+    UNKNOWN_LATENCY_MS = 1000.0
+    EXPLORE_RATE = 0.05
+
+    def __init__(self, clients: list[LLMClient]):
+        if not clients:
+            raise ValueError("LLMRouter needs at least one provider client")
+        self.clients = clients
+        self.stats = {c.provider.name: ProviderStats() for c in clients}
+        self._slots = {c.provider.name: asyncio.Semaphore(c.provider.max_concurrency) for c in clients}
+        self._random = random.Random()
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[dict] = None
+    ) -> LLMResponse:
+        """
+        Generate a completion on the best available provider.
+
+        Providers are tried in ranked order until one succeeds. A
+        provider at its concurrency limit is passed over; if every
+        provider is busy the call queues on the best-ranked busy one.
+
+        Args:
+            prompt: User prompt
+            system: Optional system instruction
+            options: Provider-specific request fields, keyed by provider
+                     name (e.g. {"gemini": {...}, "anthropic": {...}})
+
+        Returns:
+            LLMResponse from the provider that answered
+
+        Raises:
+            LLMError: If every provider failed or was unavailable
+        """
+        last_error: Optional[LLMError] = None
+        busy = []
+        for client in self.rank():
+            if self._slots[client.provider.name].locked():
+                metrics.increment("llm.router.skipped", provider=client.provider.name, reason="concurrency")
+                busy.append(client)
+                continue
+            try:
+                return await self._attempt(client, prompt, system, options)
+            except LLMError as e:
+                last_error = e
+
+        # Everything free has failed or was busy - wait for a busy provider
+        for client in busy:
+            try:
+                return await self._attempt(client, prompt, system, options)
+            except LLMError as e:
+                last_error = e
+
+        raise last_error or LLMError("No LLM provider available", retryable=True)
+
+    async def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        options: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a completion from the best available provider.
+
+        Providers are tried in ranked order until one starts streaming;
+        once a chunk has been yielded there is no failover and a failure
+        is raised to the caller.
+
+        Args:
+            prompt: User prompt
+            system: Optional system instruction
+            options: Provider-specific request fields, keyed by provider name
+
+        Yields:
+            Text chunks
+
+        Raises:
+            LLMError: If every provider failed before streaming, or the
+                      stream broke off
+        """
+        last_error: Optional[LLMError] = None
+        for client in self.rank():
+            name = client.provider.name
+            started = False
+            try:
+                async with self._slots[name]:
+                    async for text in client.stream(prompt, system, (options or {}).get(name)):
+                        started = True
+                        yield text
+            except LLMError as e:
+                self.stats[name].record_failure()
+                metrics.increment("llm.router.failover", provider=name)
+                if started:
+                    raise
+                last_error = e
+                continue
+            metrics.increment("llm.router.selected", provider=name)
+            return
+
+        raise last_error or LLMError("No LLM provider available", retryable=True)
+
+    async def _attempt(
+        self,
+        client: LLMClient,
+        prompt: str,
+        system: Optional[str],
+        options: Optional[dict]
+    ) -> LLMResponse:
+        name = client.provider.name
+        async with self._slots[name]:
+            try:
+                response = await client.generate(prompt, system, (options or {}).get(name))
+            except LLMError:
+                self.stats[name].record_failure()
+                metrics.increment("llm.router.failover", provider=name)
+                raise
+
+        self.stats[name].record_success(response)
+        metrics.increment("llm.router.selected", provider=name)
+        return response
+
+    def rank(self) -> list[LLMClient]:
+        """Order providers by selection cost, skipping open breakers."""
+        available = [c for c in self.clients if c.breaker.state != "open"] or list(self.clients)
+        ranked = sorted(available, key=self._selection_cost)
+        if len(ranked) > 1 and self._random.random() < self.EXPLORE_RATE:
+            explore = self._random.randrange(1, len(ranked))
+            ranked.insert(0, ranked.pop(explore))
+        return ranked
+
+    def snapshot(self) -> dict:
+        """Current routing statistics per provider."""
+        return {
+            c.provider.name: {
+                "model": c.model,
+                "latency_ms": self.stats[c.provider.name].latency_ms,
+                "error_rate": self.stats[c.provider.name].error_rate,
+                "avg_cost_usd": self.stats[c.provider.name].cost_usd,
+                "breaker": c.breaker.state,
+            }
+            for c in self.clients
+        }
+
+    async def warm(self, timeout: float) -> dict[str, bool]:
+        """
+        Warm every provider's connection pool concurrently.
+
+        Args:
+            timeout: Seconds to wait overall; slow providers count as cold
+
+        Returns:
+            Provider name -> whether its pool is warm
+        """
+        tasks = {c.provider.name: asyncio.create_task(c.warm()) for c in self.clients}
+        await asyncio.wait(tasks.values(), timeout=timeout)
+        warm = {}
+        for name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+            warm[name] = task.done() and not task.cancelled() and task.result()
+        return warm
+
+    async def close(self) -> None:
+        for client in self.clients:
+            await client.close()
+
+    def _selection_cost(self, client: LLMClient) -> float:
+        stats = self.stats[client.provider.name]
+        latency = stats.latency_ms if stats.latency_ms is not None else self.UNKNOWN_LATENCY_MS
+        return (
+            latency
+            + self.ERROR_PENALTY_MS * stats.error_rate
+            + self.COST_PENALTY_MS_PER_USD * stats.cost_usd
+        )
+
+
+_router: Optional[LLMRouter] = None
+# Routers with per-provider model overrides (agent pools), keyed by the overrides
+_model_routers: dict[tuple, LLMRouter] = {}
+
+
+def get_llm_router(models: Optional[dict[str, str]] = None) -> LLMRouter:
+    """
+    Get the shared router over every configured provider.
+
+    Args:
+        models: Optional model per provider name; each distinct set of
+                overrides gets its own router (and connection pools)
+
+    Raises:
+        LLMError: If no provider API key is configured
+    """
+    global _router
+    key = tuple(sorted(models.items())) if models else None
+    router = _router if key is None else _model_routers.get(key)
+    if router is None:
+        providers = configured_providers(models)
+        if not providers:
+            raise LLMError("No LLM provider configured (set GEMINI_API_KEY or ANTHROPIC_API_KEY)")
+        router = LLMRouter([LLMClient(p) for p in providers])
+        if key is None:
+            _router = router
+        else:
+            _model_routers[key] = router
+    return router
+
+
+async def close_llm_router() -> None:
+    """Close every provider client on shutdown."""
+    global _router
+    routers = list(_model_routers.values()) + ([_router] if _router is not None else [])
+    _router = None
+    _model_routers.clear()
+    for router in routers:
+        await router.close()
@@ -0,0 +1,260 @@
+"""
+Structured Output
+
+Schema-constrained scoring output and a fast validation path.
+
+Providers are asked for JSON that matches the ScoreResult schema
+(Gemini responseSchema, Anthropic forced tool use), and the reply is
+validated straight from the JSON text with model_validate_json - no
+json.loads / dict / model round trip.
+
+Malformed replies are repaired locally (code fences, surrounding
+prose, trailing commas, Python literals, single quotes, truncation,
+out-of-range scores) instead of paying for another LLM round trip.
+Outcomes and parse time are recorded in metrics:
+
+    llm.structured.outcome{result=ok|repaired|failed}
+    llm.structured.parse_us
+"""
+
+import json
+import re
+import time
+from typing import TYPE_CHECKING, Optional
+
+from pydantic import ValidationError
+
+import metrics
+from config import SCORING_WEIGHTS
+from models import ScoreResult
+
+if TYPE_CHECKING:
+    from llm.client import LLMResponse
+
+
+SCORE_TOOL_NAME = "record_lead_score"
+
+_TIERS = ["reject", "nurture", "qualified", "needs_info"]
+_SEGMENTS = ["smb", "enterprise"]
+_CONFIDENCE = ["low", "medium", "high"]
+
+
+def _gemini_schema() -> dict:
+    """ScoreResult in Gemini's OpenAPI-subset schema format."""
+    criterion = {"type": "INTEGER"}
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "score": {"type": "INTEGER"},
+            "tier": {"type": "STRING", "enum": _TIERS},
+            "segment": {"type": "STRING", "enum": _SEGMENTS},
+            "criteria_scores": {
+                "type": "OBJECT",
+                "properties": {k: criterion for k in SCORING_WEIGHTS},
+                "required": list(SCORING_WEIGHTS),
+            },
+            "missing_fields": {"type": "ARRAY", "items": {"type": "STRING"}},
+            "confidence": {"type": "STRING", "enum": _CONFIDENCE},
+            "reasoning": {"type": "STRING"},
+        },
+        "required": ["score", "tier", "segment", "criteria_scores", "confidence", "reasoning"],
+        "propertyOrdering": [
+            "score", "tier", "segment", "criteria_scores",
+            "missing_fields", "confidence", "reasoning",
+        ],
+    }
+
+
+def _json_schema() -> dict:
+    """ScoreResult as standard JSON Schema (Anthropic tool input)."""
+    criterion = {"type": "integer", "minimum": 0, "maximum": 100}
+    return {
+        "type": "object",
+        "properties": {
+            "score": {"type": "integer", "minimum": 0, "maximum": 100},
+            "tier": {"type": "string", "enum": _TIERS},
+            "segment": {"type": "string", "enum": _SEGMENTS},
+            "criteria_scores": {
+                "type": "object",
+                "properties": {k: criterion for k in SCORING_WEIGHTS},
+                "required": list(SCORING_WEIGHTS),
+            },
+            "missing_fields": {"type": "array", "items": {"type": "string"}},
+            "confidence": {"type": "string", "enum": _CONFIDENCE},
+            "reasoning": {"type": "string"},
+        },
+        "required": ["score", "tier", "segment", "criteria_scores", "confidence", "reasoning"],
+    }
+
+
+# Per-provider request options for LLMRouter.generate
+SCORE_OUTPUT_OPTIONS = {
+    "gemini": {
+        "responseMimeType": "application/json",
+        "responseSchema": _gemini_schema(),
+    },
+    "anthropic": {
+        "tools": [{
+            "name": SCORE_TOOL_NAME,
+            "description": "Record the lead qualification score.",
+            "input_schema": _json_schema(),
+        }],
+        "tool_choice": {"type": "tool", "name": SCORE_TOOL_NAME},
+    },
+}
+
+
+def parse_score_result(response: "LLMResponse") -> ScoreResult:
+    """
+    Validate an LLM reply into a ScoreResult.
+
+    Fast path: a provider-parsed tool input is validated as-is, and JSON
+    text goes straight through model_validate_json. Only if that fails
+    is the local repair pass run.
+
+    Args:
+        response: Reply from the LLM router/client
+
+    Returns:
+        ScoreResult
+
+    Raises:
+        ValueError: If the reply cannot be repaired into a valid result
+    """
+    started = time.perf_counter()
+    result = "ok"
+    try:
+        try:
+            if response.structured is not None:
+                return ScoreResult.model_validate(response.structured)
+            return ScoreResult.model_validate_json(response.text)
+        except ValidationError:
+            result = "repaired"
+            repaired = repair_score_json(
+                json.dumps(response.structured) if response.structured is not None else response.text
+            )
+            if repaired is None:
+                result = "failed"
+                raise ValueError("Malformed scoring response could not be repaired")
+            return repaired
+    finally:
+        metrics.increment("llm.structured.outcome", result=result, provider=response.provider)
+        metrics.observe("llm.structured.parse_us", (time.perf_counter() - started) * 1e6)
+
+
+def repair_score_json(text: str) -> Optional[ScoreResult]:
+    """
+    Repair common malformed scoring output.
+
+    Handles markdown code fences, prose around the object, trailing
+    commas, Python True/False/None, single-quoted JSON, truncated
+    output (unclosed strings/brackets) and out-of-range scores.
+
+    Args:
+        text: Raw reply text
+
+    Returns:
+        ScoreResult, or None if the text is beyond repair
+    """
+    candidate = _extract_object(text)
+    if candidate is None:
+        return None
+
+    for fix in (lambda s: s, _fix_literals, _fix_quotes, _close_truncated):
+        candidate = fix(candidate)
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(data, dict):
+            return None
+        try:
+            return ScoreResult.model_validate(_clamp_scores(data))
+        except ValidationError:
+            return None
+    return None
+
+
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_PY_LITERAL_PATTERN = re.compile(r"\b(True|False|None)\b")
+
+
+def _extract_object(text: str) -> Optional[str]:
+    """Strip code fences and prose around the first JSON object."""
+    fenced = _FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start == -1:
+        return None
+    end, _, _ = _scan(text, start)
+    body = text[start:end] if end is not None else text[start:]
+    return _TRAILING_COMMA_PATTERN.sub(r"\1", body)
+
+
+def _scan(text: str, start: int = 0) -> tuple[Optional[int], list[str], bool]:
+    """
+    Walk a JSON-ish string tracking strings and brackets.
+
+    Returns:
+        (index just past the first complete top-level value or None,
+         closers still open, whether the text ends inside a string)
+    """
+    stack = []
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+            if not stack:
+                return i + 1, stack, False
+    return None, stack, in_string
+
+
+def _fix_literals(text: str) -> str:
+    return _PY_LITERAL_PATTERN.sub(lambda m: _PY_LITERALS[m.group(1)], text)
+
+
+def _fix_quotes(text: str) -> str:
+    # Only safe when the model used single quotes throughout
+    if '"' in text:
+        return text
+    return text.replace("'", '"')
+
+
+def _close_truncated(text: str) -> str:
+    """Close an unterminated string and any open brackets."""
+    end, stack, in_string = _scan(text)
+    if end is not None:
+        return text
+
+    closed = text + ('"' if in_string else "")
+    closed = closed.rstrip().rstrip(",")
+    return _TRAILING_COMMA_PATTERN.sub(r"\1", closed + "".join(reversed(stack)))
+
+
+def _clamp_scores(data: dict) -> dict:
+    """Drop nulls (so defaults apply) and clamp score fields into 0-100."""
+    data = {k: v for k, v in data.items() if v is not None}
+    if isinstance(data.get("score"), (int, float)):
+        data["score"] = max(0, min(100, int(data["score"])))
+    criteria = data.get("criteria_scores")
+    if isinstance(criteria, dict):
+        for key, value in criteria.items():
+            if isinstance(value, (int, float)):
+                criteria[key] = max(0, min(100, int(value)))
+    return data
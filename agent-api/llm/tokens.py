@@ -0,0 +1,75 @@
+"""
+Token Counting
+
+Token counts for prompt-size reports and prompt-cache eligibility.
+
+Uses tiktoken (cl100k_base, in requirements.txt; the Docker image
+bakes in the encoding file). If tiktoken or its encoding file is
+unavailable, counts fall back to a regex estimate and is_estimate()
+says so - reports must label those counts as estimates.
+
+cl100k_base is not the provider's own tokenizer either, so treat counts
+as within ~10-15% of what Gemini/Anthropic bill - close enough to
+compare prompt variants and to check provider cache minimums.
+"""
+
+import math
+import re
+from functools import lru_cache
+
+# Loaded on first use, not at import: tiktoken pulls in requests and
+# the BPE ranks, and may download the encoding file
+_UNLOADED = object()
+_encoding = _UNLOADED
+
+
+# Words, digit groups, and single punctuation characters
+_PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def tokenizer_name() -> str:
+    """Name of the tokenizer count_tokens is using."""
+    return "tiktoken/cl100k_base" if _get_encoding() is not None else "estimate"
+
+
+def is_estimate() -> bool:
+    """True when count_tokens is using the regex estimate."""
+    return _get_encoding() is None
+
+
+@lru_cache(maxsize=256)
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in text.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Token count (exact for cl100k_base, estimated otherwise)
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(_estimate_piece(piece) for piece in _PIECE_PATTERN.findall(text))
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is _UNLOADED:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # not installed, or encoding file unavailable offline
+            _encoding = None
+    return _encoding
+
+
+def _estimate_piece(piece: str) -> int:
+    # BPE vocabularies hold most short words whole; long words split
+    # roughly every 4 characters and numbers every 3 digits
+    if piece.isdigit():
+        return math.ceil(len(piece) / 3)
+    if len(piece) <= 6:
+        return 1
+    return math.ceil(len(piece) / 4)
@@ -4,16 +4,92 @@ Lead Qualification Agent API
 Engineer Track Sample Project
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
+import metrics
+from config import settings
+from db.postgres import fetch_pipeline_stats, get_db_connection, record_config_snapshot
+from db.redis import get_redis_connection
+from events import START, get_event_feed, parse_cursor
+from ids import new_id
+from scoring_config import current_scoring_config, get_config_service
+from serialization import dumps, dumps_str
+from guardrails.approval import process_approval
+from guardrails.rate_limit import RateLimitExceeded, check_lead_rate_limit
+from scheduler import get_lead_scheduler, lead_lane
+from dispatcher import get_dispatcher
+from records import LeadRecord
+from tools.accounts import domain_key
+from tools.upsert_lead import get_lead_by_key, get_lead_snapshot
+from tools.draft_email import stream_draft_email, draft_inputs_from_row
+from tools.task_sweeper import get_sweeper
+from tools.lead_import import ImportCheckpoint, ImportFormatError, detect_format, import_stream
+from llm.errors import LLMError
+from llm.router import get_llm_router, close_llm_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build shared clients and warm their pools before serving traffic.
+
+    Done here rather than at import time so importing the app (tests,
+    workers, tooling) stays cheap, and so the first leads after a
+    scale-up don't pay for DNS/TLS handshakes.
+    """
+    print("Starting Lead Qualification Agent API...")
+    print(f"Gemini API Key configured: {'Yes' if os.getenv('GEMINI_API_KEY') else 'No'}")
+    print(f"Database URL configured: {'Yes' if os.getenv('DATABASE_URL') else 'No'}")
+    print(f"Redis URL configured: {'Yes' if os.getenv('REDIS_URL') else 'No'}")
+
+    await get_db_connection()
+    get_redis_connection()
+    # Leads are stamped with this version; keep its rules for re-qualification
+    rules = current_scoring_config()
+    await record_config_snapshot(rules.version, rules.to_dict())
+    # Follow runtime config changes (config file / Postgres NOTIFY)
+    config_task = asyncio.create_task(get_config_service().watch())
+    try:
+        router = get_llm_router()
+    except LLMError as e:
+        print(f"LLM router not started ({e}) - rule-based scoring only")
+    else:
+        warm = await router.warm(settings.LLM_WARMUP_TIMEOUT_SECONDS)
+        print(f"LLM connection pools warm: {warm}")
+
+    # Background escalation of overdue follow-up tasks
+    sweeper_task = asyncio.create_task(get_sweeper().run())
+
+    yield
+
+    get_sweeper().stop()
+    await sweeper_task
+    get_config_service().stop()
+    await config_task
+    await close_llm_router()
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with serialization.dumps (orjson)."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
 app = FastAPI(
     title="Lead Qualification Agent",
     description="Sample capstone project - Engineer Track",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 
@@ -49,7 +125,9 @@ class AgentResult(BaseModel):
     actions_taken: list[str]
     approval_required: bool
     approval_reason: Optional[str] = None
+    approval_id: Optional[str] = None  # POST /approve/{approval_id}
     trace_id: str
+    config_version: Optional[str] = None
 
 
 # --- Endpoints ---
@@ -57,11 +135,35 @@ class AgentResult(BaseModel):
 @app.get("/health")
 def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config_version": current_scoring_config().version,
+    }
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Process-local metrics (rate limiters, queue waits, latencies)."""
+    return metrics.snapshot()
+
+
+@app.get("/stats")
+async def get_stats(hours: int = Query(24, ge=1, le=24 * 90)):
+    """
+    Pipeline analytics for the last `hours` hours: leads by tier,
+    segment, industry and status (the conversion funnel), trace approval
+    outcomes, average score and token cost, plus an hourly series.
+
+    Served from hourly rollup tables maintained on write, never from a
+    GROUP BY over leads/traces.
+    """
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return await fetch_pipeline_stats(now - timedelta(hours=hours - 1))
 
 
 @app.post("/lead", response_model=AgentResult)
-async def submit_lead(lead: LeadInput):
+async def submit_lead(lead: LeadInput, x_api_key: Optional[str] = Header(None)):
     """
     Submit a lead for qualification.
 
@@ -71,33 +173,183 @@ async def submit_lead(lead: LeadInput):
     3. Apply guardrails (approval gates)
     4. Execute allowed actions
     5. Return results with trace ID
+
+    Requests are throttled per API key and per company domain (free-mail
+    senders individually); over-limit
+    callers get a 429 with Retry-After.
+
+    Leads run in the scheduler's hot lane when they show enterprise,
+    executive or urgency signals (scheduler.lead_lane), otherwise in
+    the standard lane. The dispatcher then hands enterprise leads to
+    the specialist agent pool and the rest to the lean SMB agent.
     """
-    # TODO: Implement agent loop
-    # See agent.py for the full implementation
-
-    # Placeholder response
-    return AgentResult(
-        lead_key=f"{lead.email.lower()}_{datetime.utcnow().strftime('%Y%W')}",
-        score_result=ScoreResult(
-            score=0,
-            tier="needs_info",
-            segment="smb",
-            criteria_scores={},
-            missing_fields=["need", "timeline"] if not lead.need else [],
-            confidence="low",
-            reasoning="Placeholder - implement scoring logic"
-        ),
-        actions_taken=[],
-        approval_required=False,
-        trace_id=f"trace_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
-    )
+    limited = await check_lead_rate_limit(x_api_key or "anonymous", domain_key(lead.email))
+    if limited:
+        raise HTTPException(
+            status_code=429,
+            detail=str(limited),
+            headers={"Retry-After": str(max(1, int(limited.retry_after + 0.999)))}
+        )
+
+    # High-value leads jump ahead of bulk imports and nurture-grade
+    # traffic; a saturated worker answers 503 rather than queueing forever
+    try:
+        async with get_lead_scheduler().slot(lead_lane(lead), settings.LEAD_SCHEDULER_QUEUE_TIMEOUT_SECONDS):
+            # Enterprise leads go to the specialist agent pool, the rest
+            # to the lean SMB agent (dispatcher.py)
+            record = await get_dispatcher().dispatch(LeadRecord.from_input(lead))
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(e.retry_after + 0.999)))}
+        )
+
+    # Returning the response directly skips FastAPI's dump/re-validate/
+    # serialize of response_model (kept for the OpenAPI schema); the
+    # model is written to bytes once by its own serializer
+    return FastJSONResponse(record.to_result())
+
+
+@app.post("/leads/import")
+async def import_leads(
+    request: Request,
+    format: Optional[str] = None,
+    import_id: Optional[str] = None
+):
+    """
+    Import a CSV or NDJSON lead file streamed in the request body.
+
+    The body is processed as it arrives (never buffered whole), through
+    the same validation, dedupe and scoring as POST /lead, and upserted
+    in batches. The format comes from ?format= or the Content-Type.
+
+    The response carries an import_id. If the upload is interrupted,
+    send the same file again with ?import_id=... and rows up to the
+    last committed batch are skipped.
+    """
+    try:
+        fmt = format or detect_format(content_type=request.headers.get("content-type"))
+        import_id = import_id or new_id("import")
+        checkpoint = ImportCheckpoint.for_import(import_id)
+        stats = await import_stream(request.stream(), fmt, checkpoint)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"import_id": import_id, **stats.to_dict()}
 
 
 @app.get("/lead/{lead_key}")
-async def get_lead(lead_key: str):
-    """Get lead status by key."""
-    # TODO: Implement database lookup
-    raise HTTPException(status_code=404, detail="Lead not found")
+async def get_lead(lead_key: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Get lead status by key.
+
+    Served from the lead cache (see tools/upsert_lead.py). Responses
+    carry an ETag; pollers sending it back in If-None-Match get a 304
+    until the lead changes.
+    """
+    snapshot = await get_lead_snapshot(lead_key)
+    if snapshot.body is None:
+        raise HTTPException(status_code=404, detail="Lead not found")
+
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    if if_none_match and _etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+@app.get("/events")
+async def get_events(
+    request: Request,
+    since: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    wait: float = Query(25.0, ge=0, le=60),
+    accept: Optional[str] = Header(None),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Lead change feed (see events.py).
+
+    Long-poll by default: returns up to `limit` events after the `since`
+    cursor (default: the oldest retained), waiting up to `wait` seconds
+    for one, plus the cursor to send next time. With
+    `Accept: text/event-stream` the events are streamed as SSE instead;
+    a reconnecting EventSource resumes from Last-Event-ID.
+    """
+    cursor = last_event_id or since or START
+    try:
+        parse_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    feed = get_event_feed()
+
+    if not accept or "text/event-stream" not in accept:
+        events = await feed.read(cursor, limit, wait)
+        return {"events": events, "cursor": events[-1].id if events else cursor}
+
+    async def event_stream():
+        after = cursor
+        while not await request.is_disconnected():
+            events = await feed.read(after, limit, 15.0)
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            yield "".join(
+                f"id: {e.id}\nevent: {e.type}\ndata: {dumps_str(e)}\n\n" for e in events
+            )
+            after = events[-1].id
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/lead/{lead_key}/draft/stream")
+async def stream_lead_draft(
+    lead_key: str,
+    template_type: Optional[str] = None,
+    model: Optional[str] = None
+):
+    """
+    Stream an LLM-personalized email draft over Server-Sent Events.
+
+    Emits `token` events as text is generated and a final `done` event
+    with the saved draft, or an `error` event if generation broke off
+    midway (the tokens sent so far are not a complete draft). Repeat
+    requests for the same lead, template and model are served from the
+    cached completed draft.
+    """
+    row = await get_lead_by_key(lead_key)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Lead not found")
+
+    lead, score_result = draft_inputs_from_row(row)
+
+    async def event_stream():
+        try:
+            async for event in stream_draft_email(lead_key, lead, score_result, template_type, model):
+                if event["type"] == "token":
+                    yield f"event: token\ndata: {dumps_str(event['text'])}\n\n"
+                else:
+                    yield f"event: done\ndata: {dumps_str(event['draft'])}\n\n"
+        except LLMError as e:
+            # Headers are long gone; end the stream with a terminal event
+            yield f"event: error\ndata: {dumps_str({'detail': f'Draft generation failed: {e}'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/memory/{domain}")
@@ -114,9 +366,10 @@ async def get_company_history(domain: str):
 
 
 @app.post("/approve/{action_id}")
-async def approve_action(action_id: str, approved: bool):
-    """Approve or reject a pending action."""
-    # TODO: Implement approval workflow
+async def approve_action(action_id: str, approved: bool, notes: Optional[str] = None):
+    """Approve or reject a pending action (approving commits its prepared work)."""
+    if not await process_approval(action_id, approved, notes):
+        raise HTTPException(status_code=404, detail="No pending approval request with this ID")
     return {
         "action_id": action_id,
         "approved": approved,
@@ -129,14 +382,3 @@ async def list_traces(limit: int = 10):
     """List recent agent traces."""
     # TODO: Implement trace retrieval from Postgres
     return {"traces": [], "total": 0}
-
-
-# --- Startup ---
-
-@app.on_event("startup")
-async def startup():
-    """Initialize connections on startup."""
-    print("Starting Lead Qualification Agent API...")
-    print(f"Gemini API Key configured: {'Yes' if os.getenv('GEMINI_API_KEY') else 'No'}")
-    print(f"Database URL configured: {'Yes' if os.getenv('DATABASE_URL') else 'No'}")
-    print(f"Redis URL configured: {'Yes' if os.getenv('REDIS_URL') else 'No'}")
@@ -0,0 +1,114 @@
+"""
+In-Process Metrics
+
+Lightweight counters, gauges and latency summaries exposed on
+GET /metrics. Each worker process keeps its own registry.
+
+Metric names are dotted strings; labels are folded into the key,
+e.g. "ratelimit.throttled{limiter=lead_api_key}".
+"""
+
+import threading
+from collections import deque
+from typing import Optional
+
+
+# Recent observations kept per summary for percentile estimates
+SUMMARY_WINDOW = 1024
+
+_lock = threading.Lock()
+_counters: dict[str, float] = {}
+_gauges: dict[str, float] = {}
+_summaries: dict[str, "_Summary"] = {}
+
+
+class _Summary:
+    """Count/sum/max plus a sliding window for percentiles."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.window: deque[float] = deque(maxlen=SUMMARY_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.window.append(value)
+
+    def to_dict(self) -> dict:
+        ordered = sorted(self.window)
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+            "p99": _percentile(ordered, 0.99),
+            "max": self.max,
+        }
+
+
+def metric_key(name: str, **labels) -> str:
+    """Build a metric key from a name and labels."""
+    if not labels:
+        return name
+    label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_str}}}"
+
+
+def increment(name: str, amount: float = 1, **labels) -> None:
+    """Increment a counter."""
+    key = metric_key(name, **labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    """Set a gauge to an absolute value."""
+    key = metric_key(name, **labels)
+    with _lock:
+        _gauges[key] = value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record an observation (e.g. a latency in ms) in a summary."""
+    key = metric_key(name, **labels)
+    with _lock:
+        summary = _summaries.get(key)
+        if summary is None:
+            summary = _summaries[key] = _Summary()
+        summary.observe(value)
+
+
+def get_summary(name: str, **labels) -> Optional[dict]:
+    """Get one summary as a dictionary, or None if never observed."""
+    key = metric_key(name, **labels)
+    with _lock:
+        summary = _summaries.get(key)
+        return summary.to_dict() if summary else None
+
+
+def snapshot() -> dict:
+    """Return all metrics as a JSON-serializable dictionary."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "summaries": {k: s.to_dict() for k, s in _summaries.items()},
+        }
+
+
+def reset() -> None:
+    """Clear all metrics (used by benchmarks)."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _summaries.clear()
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(q * len(ordered)))
+    return ordered[index]
@@ -78,7 +78,9 @@ class AgentResult(BaseModel):
     actions_taken: List[str]
     approval_required: bool
     approval_reason: Optional[str] = None
+    approval_id: Optional[str] = None  # POST /approve/{approval_id}
     trace_id: str
+    config_version: Optional[str] = None
 
 
 # --- Memory Models ---
@@ -127,6 +129,8 @@ class TraceRecord(BaseModel):
     approval_reason: Optional[str] = None
     error: Optional[str] = None
     token_usage: Optional[dict] = None
+    config_version: Optional[str] = None
+    route: Optional[dict] = None
 
 
 # --- Approval Models ---
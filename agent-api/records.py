@@ -0,0 +1,197 @@
+"""
+Pipeline Records
+
+Slotted dataclasses used inside the agent pipeline in place of the
+pydantic models in models.py.
+
+Pydantic models validate on construction (a LeadInput costs ~100us,
+mostly email validation), and each instance carries a __dict__ plus
+fields-set bookkeeping. Inside the pipeline the data is already
+valid, so it is checked once at the API boundary (FastAPI validates
+LeadInput) and carried as records: construction is a plain __init__,
+an instance is a fixed-size slot array, and orjson serializes them
+natively (see serialization.py).
+
+Convert at the edges only:
+    record = LeadRecord.from_input(lead)     # after API validation
+    result = score.to_result()                # when building a response
+
+The to_* methods use model_construct(), which skips re-validation;
+only call them on records built from validated data.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+
+from models import AgentResult, LeadInput, LeadRow, ScoreResult, TraceRecord
+
+
+@dataclass(slots=True)
+class LeadRecord:
+    """A validated lead. Treat as read-only."""
+    email: str
+    company: str
+    need: Optional[str] = None
+    timeline: Optional[str] = None
+    budget: Optional[str] = None
+    title: Optional[str] = None
+    company_size: Optional[int] = None
+    industry: Optional[str] = None
+
+    @classmethod
+    def from_input(cls, lead: LeadInput) -> "LeadRecord":
+        return cls(
+            lead.email, lead.company, lead.need, lead.timeline,
+            lead.budget, lead.title, lead.company_size, lead.industry
+        )
+
+    def to_input(self) -> LeadInput:
+        return LeadInput.model_construct(
+            email=self.email, company=self.company, need=self.need,
+            timeline=self.timeline, budget=self.budget, title=self.title,
+            company_size=self.company_size, industry=self.industry
+        )
+
+    def present_fields(self) -> dict[str, Any]:
+        """Fields that are set, in declaration order (the LLM prompt payload)."""
+        return {
+            name: value for name in self.__slots__
+            if (value := getattr(self, name)) is not None
+        }
+
+
+@dataclass(slots=True)
+class ScoreRecord:
+    """Scoring output; mirrors ScoreResult."""
+    score: int
+    tier: str
+    segment: str
+    criteria_scores: dict
+    missing_fields: list[str]
+    confidence: str
+    reasoning: str
+
+    @classmethod
+    def from_result(cls, result: ScoreResult) -> "ScoreRecord":
+        return cls(
+            result.score, result.tier, result.segment, result.criteria_scores,
+            result.missing_fields, result.confidence, result.reasoning
+        )
+
+    def to_result(self) -> ScoreResult:
+        return ScoreResult.model_construct(
+            score=self.score, tier=self.tier, segment=self.segment,
+            criteria_scores=self.criteria_scores, missing_fields=self.missing_fields,
+            confidence=self.confidence, reasoning=self.reasoning
+        )
+
+
+@dataclass(slots=True)
+class LeadRowRecord:
+    """A lead row as written to the database/sheet; mirrors LeadRow."""
+    lead_key: str
+    email: str
+    company: str
+    score: int
+    tier: str
+    segment: str
+    need: Optional[str] = None
+    timeline: Optional[str] = None
+    budget: Optional[str] = None
+    title: Optional[str] = None
+    company_size: Optional[int] = None
+    industry: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    status: str = "new"
+    notes: Optional[str] = None
+    # Per-criterion scores and the scoring rules version they were
+    # combined under (see scoring_config.py)
+    criteria_scores: Optional[dict] = None
+    config_version: Optional[str] = None
+
+    @classmethod
+    def build(
+        cls,
+        lead_key: str,
+        lead: LeadRecord,
+        score: ScoreRecord,
+        now: datetime,
+        config_version: Optional[str] = None
+    ) -> "LeadRowRecord":
+        """Row for a scored lead (also accepts LeadInput / ScoreResult)."""
+        return cls(
+            lead_key, lead.email, lead.company, score.score, score.tier, score.segment,
+            lead.need, lead.timeline, lead.budget, lead.title, lead.company_size,
+            lead.industry, now, now, "new", score.reasoning,
+            score.criteria_scores, config_version
+        )
+
+    def to_row(self) -> LeadRow:
+        return LeadRow.model_construct(**{name: getattr(self, name) for name in LeadRow.model_fields})
+
+
+@dataclass(slots=True)
+class AgentRecord:
+    """Agent outcome for one lead; mirrors AgentResult."""
+    lead_key: str
+    score: ScoreRecord
+    actions_taken: list[str]
+    approval_required: bool
+    trace_id: str
+    approval_reason: Optional[str] = None
+    approval_id: Optional[str] = None
+    config_version: Optional[str] = None
+
+    def to_result(self) -> AgentResult:
+        return AgentResult.model_construct(
+            lead_key=self.lead_key,
+            score_result=self.score.to_result(),
+            actions_taken=self.actions_taken,
+            approval_required=self.approval_required,
+            approval_reason=self.approval_reason,
+            approval_id=self.approval_id,
+            trace_id=self.trace_id,
+            config_version=self.config_version
+        )
+
+
+@dataclass(slots=True)
+class TraceEntry:
+    """Agent execution trace; mirrors TraceRecord."""
+    trace_id: str
+    lead_key: str
+    started_at: datetime
+    input_data: LeadRecord
+    completed_at: Optional[datetime] = None
+    score_result: Optional[ScoreRecord] = None
+    actions_taken: list[str] = field(default_factory=list)
+    approval_required: bool = False
+    approval_reason: Optional[str] = None
+    error: Optional[str] = None
+    token_usage: Optional[dict] = None
+    config_version: Optional[str] = None
+    route: Optional[dict] = None
+
+    def to_record(self) -> TraceRecord:
+        return TraceRecord.model_construct(
+            trace_id=self.trace_id,
+            lead_key=self.lead_key,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            input_data=self.input_data.present_fields(),
+            score_result=None if self.score_result is None else _as_dict(self.score_result),
+            actions_taken=self.actions_taken,
+            approval_required=self.approval_required,
+            approval_reason=self.approval_reason,
+            error=self.error,
+            token_usage=self.token_usage,
+            config_version=self.config_version,
+            route=self.route
+        )
+
+
+def _as_dict(record) -> dict:
+    # Shallow, unlike dataclasses.asdict, which deep-copies every value
+    return {name: getattr(record, name) for name in record.__slots__}
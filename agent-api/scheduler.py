@@ -0,0 +1,181 @@
+"""
+Lead Scheduler
+
+Priority-aware admission to the agent pipeline, so the inbound leads
+sales cares about most don't queue behind thousands of import rows.
+
+Lanes (LEAD_LANES in config.py):
+    hot       inbound leads with a strong pre-LLM signal (see lead_lane)
+    standard  other inbound leads
+    bulk      imports
+
+Each process runs at most LEAD_SCHEDULER_CONCURRENCY leads at once.
+When leads are waiting, free slots go to lanes by weighted fair
+queuing: every grant advances the lane's virtual clock by 1/weight and
+the waiting lane with the lowest clock goes next, so busy lanes share
+capacity in proportion to their weights. A lane coming back from idle
+starts at the current virtual time and can't bank credit. Reserved
+slots are only ever used by their own lane, so a hot lead starts at
+once even while an import fills every other slot.
+
+Time spent waiting for a slot is recorded per lane as
+scheduler.queue_wait_ms. Limits are per process; the LLM governor
+still caps LLM calls across replicas.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+import metrics
+from config import settings, LEAD_LANES
+from guardrails.rate_limit import RateLimitExceeded
+from models import LeadInput
+from records import LeadRecord
+from scoring_config import current_scoring_config
+from tools.score_lead import EXECUTIVE_TITLES, URGENT_TIMELINES
+
+
+@dataclass
+class _Lane:
+    name: str
+    weight: float
+    reserved: int
+    waiters: deque = field(default_factory=deque)
+    running: int = 0
+    tag: float = 0.0  # virtual time of the lane's next grant
+
+
+class LeadScheduler:
+    """Weighted fair queuing over lanes, with per-lane reserved slots."""
+
+    def __init__(self, concurrency: int, lanes: dict[str, tuple[float, int]]):
+        if sum(reserved for _, reserved in lanes.values()) > concurrency:
+            raise ValueError("Reserved slots exceed scheduler concurrency")
+        self.concurrency = concurrency
+        self._lanes = {name: _Lane(name, weight, reserved) for name, (weight, reserved) in lanes.items()}
+        self._running = 0
+        self._vtime = 0.0
+
+    @asynccontextmanager
+    async def slot(self, lane: str, timeout: Optional[float] = None):
+        """
+        Hold one pipeline slot in a lane for the duration of the block.
+
+        Args:
+            lane: Lane name (see LEAD_LANES)
+            timeout: Seconds to wait for a slot (None waits indefinitely)
+
+        Raises:
+            RateLimitExceeded: If no slot came free within the timeout
+        """
+        state = self._lanes[lane]
+        started = time.monotonic()
+        await self._acquire(state, timeout)
+        metrics.observe("scheduler.queue_wait_ms", (time.monotonic() - started) * 1000, lane=lane)
+        try:
+            yield
+        finally:
+            self._release(state)
+
+    def stats(self) -> dict:
+        """Running and queued leads per lane."""
+        return {
+            lane.name: {"running": lane.running, "queued": len(lane.waiters)}
+            for lane in self._lanes.values()
+        }
+
+    async def _acquire(self, lane: _Lane, timeout: Optional[float]) -> None:
+        if not lane.waiters and self._can_start(lane):
+            self._grant(lane)
+            return
+        if not lane.waiters:
+            lane.tag = max(lane.tag, self._vtime)
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        self._report(lane)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we gave up; pass the slot on
+                self._release(lane)
+            elif waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+                self._report(lane)
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.increment("scheduler.timeouts", lane=lane.name)
+                raise RateLimitExceeded(f"lead_scheduler:{lane.name}", 1.0) from None
+            raise
+
+    def _can_start(self, lane: _Lane) -> bool:
+        free = self.concurrency - self._running
+        if free <= 0:
+            return False
+        if lane.running < lane.reserved:
+            return True
+        # Leave other lanes' unused reservations free
+        held = sum(max(0, other.reserved - other.running) for other in self._lanes.values() if other is not lane)
+        return free > held
+
+    def _grant(self, lane: _Lane) -> None:
+        lane.tag = max(lane.tag, self._vtime)
+        self._vtime = lane.tag
+        lane.tag += 1 / lane.weight
+        lane.running += 1
+        self._running += 1
+        self._report(lane)
+
+    def _release(self, lane: _Lane) -> None:
+        lane.running -= 1
+        self._running -= 1
+        self._report(lane)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting lanes: under-reservation lanes first, then lowest clock."""
+        while True:
+            ready = [lane for lane in self._lanes.values() if lane.waiters and self._can_start(lane)]
+            if not ready:
+                return
+            lane = min(ready, key=lambda l: (l.running >= l.reserved, l.tag))
+            waiter = lane.waiters.popleft()
+            if waiter.done():
+                continue
+            self._grant(lane)
+            waiter.set_result(None)
+
+    def _report(self, lane: _Lane) -> None:
+        metrics.set_gauge("scheduler.running", lane.running, lane=lane.name)
+        metrics.set_gauge("scheduler.queued", len(lane.waiters), lane=lane.name)
+
+
+def lead_lane(lead: Union[LeadRecord, LeadInput]) -> str:
+    """
+    Lane for an inbound lead, from signals available before scoring.
+
+    Enterprise company size, an executive title or an urgent timeline
+    (the rule-based scoring heuristics) put a lead in the hot lane.
+    """
+    if current_scoring_config().segment_for(lead.company_size) == "enterprise":
+        return "hot"
+    if lead.title and any(t in lead.title.lower() for t in EXECUTIVE_TITLES):
+        return "hot"
+    if lead.timeline and any(t in lead.timeline.lower() for t in URGENT_TIMELINES):
+        return "hot"
+    return "standard"
+
+
+_scheduler: Optional[LeadScheduler] = None
+
+
+def get_lead_scheduler() -> LeadScheduler:
+    """Get the shared lead scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LeadScheduler(settings.LEAD_SCHEDULER_CONCURRENCY, LEAD_LANES)
+    return _scheduler
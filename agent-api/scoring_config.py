@@ -0,0 +1,289 @@
+"""
+Runtime Scoring Configuration
+
+The tunable rules of the agent - scoring weights, score and segment
+thresholds, approval rules and scoring prompts - as immutable,
+versioned snapshots that can be swapped while the service runs.
+
+config.py holds the defaults. A snapshot can override any of them from:
+- a JSON file (RUNTIME_CONFIG_PATH), re-read when it changes, or
+- a row in Postgres config_snapshots made active with publish_config(),
+  which NOTIFYs every worker on the scoring_config channel.
+
+A swap replaces a single reference, so readers never see a half-applied
+change. Take one snapshot per lead with current_scoring_config() and
+use it for that lead's score, tier, approval check and cache keys.
+
+The version is a short hash of the rules: the same rules always get
+the same version. Leads and traces record the version they were
+processed under. Caches key on it, so a change invalidates exactly the
+entries it affects. tools/requalify.py uses the recorded versions to
+re-tier only the leads a change can affect.
+"""
+
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import metrics
+from config import (
+    APPROVAL_REQUIRED_ACTIONS,
+    SCORE_THRESHOLDS,
+    SCORING_WEIGHTS,
+    SEGMENT_THRESHOLDS,
+    settings,
+)
+from serialization import dumps, loads
+
+
+# Criteria stored as leads.crit_<name> columns
+CRITERIA = ("industry_fit", "budget", "authority", "need", "timeline", "company_size")
+
+MAX_SCORE = 100
+
+
+@dataclass(frozen=True)
+class ScoringConfig:
+    """One version of the runtime rules. Never mutated; replaced whole."""
+    weights: dict
+    score_thresholds: dict
+    segment_thresholds: dict
+    approval_actions: dict = field(default_factory=lambda: dict(APPROVAL_REQUIRED_ACTIONS))
+    prompt_variant: str = field(default_factory=lambda: settings.SCORING_PROMPT_VARIANT)
+    # Prompt variant -> system prompt text, overriding tools/score_lead.py
+    prompts: dict = field(default_factory=dict)
+    version: str = field(init=False)
+    # Tier of every possible score, so tier_for is an index lookup
+    _tiers: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        unknown = set(self.weights) - set(CRITERIA)
+        if unknown:
+            raise ValueError(f"Unknown scoring criteria: {sorted(unknown)}")
+        if sum(self.weights.values()) != 100:
+            raise ValueError(f"Scoring weights must sum to 100, got {sum(self.weights.values())}")
+        if not self.score_thresholds or not self.segment_thresholds:
+            raise ValueError("Score and segment thresholds must not be empty")
+        object.__setattr__(self, "version", hashlib.sha256(dumps(self.to_dict())).hexdigest()[:12])
+        object.__setattr__(self, "_tiers", tuple(
+            _lookup(self.score_thresholds, s) for s in range(MAX_SCORE + 1)
+        ))
+
+    def to_dict(self) -> dict:
+        # Infinite bounds become None so the snapshot is valid JSON
+        return {
+            "weights": dict(sorted(self.weights.items())),
+            "score_thresholds": _ranges_to_json(self.score_thresholds),
+            "segment_thresholds": _ranges_to_json(self.segment_thresholds),
+            "approval_actions": dict(sorted(self.approval_actions.items())),
+            "prompt_variant": self.prompt_variant,
+            "prompts": dict(sorted(self.prompts.items())),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScoringConfig":
+        """Build a snapshot; keys left out keep their config.py defaults."""
+        defaults = default_scoring_config()
+        return cls(
+            weights=data.get("weights", defaults.weights),
+            score_thresholds=_ranges_from_json(data["score_thresholds"])
+            if "score_thresholds" in data else defaults.score_thresholds,
+            segment_thresholds=_ranges_from_json(data["segment_thresholds"])
+            if "segment_thresholds" in data else defaults.segment_thresholds,
+            approval_actions=data.get("approval_actions", defaults.approval_actions),
+            prompt_variant=data.get("prompt_variant", defaults.prompt_variant),
+            prompts=data.get("prompts", defaults.prompts),
+        )
+
+    def weighted_score(self, criteria_scores: dict) -> int:
+        """Overall 0-100 score; criteria without a value count as neutral (50)."""
+        total = sum(criteria_scores.get(name, 50) * weight for name, weight in self.weights.items())
+        return int(total / 100)
+
+    def tier_for(self, score: int) -> str:
+        """Tier whose score range contains score."""
+        return self._tiers[min(max(int(score), 0), MAX_SCORE)]
+
+    def segment_for(self, company_size: Optional[int]) -> str:
+        """Segment for a company size; unknown sizes are the smallest segment."""
+        return _lookup(self.segment_thresholds, company_size or 0)
+
+    def requires_approval(self, action: str) -> bool:
+        return bool(self.approval_actions.get(action))
+
+
+def _lookup(ranges: dict, value: float) -> str:
+    # Ranges are contiguous integer bands; pick the last one starting at or below value
+    ordered = sorted(ranges.items(), key=lambda item: item[1][0])
+    match = ordered[0][0]
+    for name, (low, _) in ordered:
+        if value >= low:
+            match = name
+    return match
+
+
+def _ranges_to_json(ranges: dict) -> dict:
+    return {
+        name: [low, None if high == float("inf") else high]
+        for name, (low, high) in sorted(ranges.items())
+    }
+
+
+def _ranges_from_json(ranges: dict) -> dict:
+    return {
+        name: (low, float("inf") if high is None else high)
+        for name, (low, high) in ranges.items()
+    }
+
+
+def default_scoring_config() -> ScoringConfig:
+    """The rules in config.py."""
+    return ScoringConfig(
+        weights=dict(SCORING_WEIGHTS),
+        score_thresholds=dict(SCORE_THRESHOLDS),
+        segment_thresholds=dict(SEGMENT_THRESHOLDS),
+    )
+
+
+class ConfigService:
+    """
+    Holds the current snapshot and swaps in new ones.
+
+    watch() polls RUNTIME_CONFIG_PATH (mtime and size, then content)
+    and listens for Postgres NOTIFY on the scoring_config channel. An
+    invalid update is logged and ignored, and the previous snapshot
+    stays live.
+    """
+
+    def __init__(self, path: str = "", poll_seconds: float = 5.0):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._current = default_scoring_config()
+        self._file_stamp: Optional[tuple] = None
+        self._listeners: list[Callable[[ScoringConfig, ScoringConfig], None]] = []
+        self._pending_versions: asyncio.Queue = asyncio.Queue()
+        self._running = False
+        self._wakeup = asyncio.Event()
+        if path:
+            self.reload_file()
+
+    def current(self) -> ScoringConfig:
+        return self._current
+
+    def subscribe(self, listener: Callable[[ScoringConfig, ScoringConfig], None]) -> None:
+        """Call listener(old, new) after every swap."""
+        self._listeners.append(listener)
+
+    def apply(self, config: ScoringConfig, source: str = "api") -> bool:
+        """
+        Make config the current snapshot.
+
+        Returns:
+            True if the version changed
+        """
+        old = self._current
+        if config.version == old.version:
+            return False
+        self._current = config
+        metrics.increment("config.swaps", source=source)
+        print(f"Scoring config {old.version} -> {config.version} ({source})")
+        for listener in self._listeners:
+            listener(old, config)
+        return True
+
+    def reload_file(self) -> bool:
+        """Re-read the config file if it changed; True if a new snapshot was applied."""
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            if self._file_stamp is not None:
+                print(f"[CONFIG] {self.path} unreadable ({e}); keeping {self._current.version}")
+                self._file_stamp = None
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._file_stamp:
+            return False
+        self._file_stamp = stamp
+        try:
+            with open(self.path, "rb") as f:
+                config = ScoringConfig.from_dict(loads(f.read()))
+        except (ValueError, TypeError, KeyError) as e:
+            metrics.increment("config.rejected", source="file")
+            print(f"[CONFIG] Ignoring invalid {self.path}: {e}")
+            return False
+        return self.apply(config, source="file")
+
+    async def reload_version(self, version: str) -> bool:
+        """Apply a snapshot recorded in Postgres."""
+        from db.postgres import fetch_config_snapshot
+
+        rules = await fetch_config_snapshot(version)
+        if rules is None:
+            print(f"[CONFIG] Notified of unknown config version {version}")
+            return False
+        try:
+            config = ScoringConfig.from_dict(rules)
+        except (ValueError, TypeError, KeyError) as e:
+            metrics.increment("config.rejected", source="postgres")
+            print(f"[CONFIG] Ignoring invalid snapshot {version}: {e}")
+            return False
+        return self.apply(config, source="postgres")
+
+    async def watch(self) -> None:
+        """Follow the file and Postgres until stop() is called."""
+        from db.postgres import fetch_active_config_version, listen_config_changes, record_config_snapshot
+
+        self._running = True
+        listening = await listen_config_changes(self._pending_versions.put_nowait)
+        if not self.path:
+            active = await fetch_active_config_version()
+            if active:
+                await self.reload_version(active)
+        while self._running:
+            if self.path:
+                if self.reload_file():
+                    # Leads stamped with this version need its rules on record
+                    await record_config_snapshot(self._current.version, self._current.to_dict())
+            while not self._pending_versions.empty():
+                await self.reload_version(self._pending_versions.get_nowait())
+
+            if not self.path and not listening:
+                break  # nothing to follow
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._running = False
+        self._wakeup.set()
+
+
+async def publish_config(config: ScoringConfig) -> None:
+    """
+    Record a snapshot, make it the active Postgres config and notify
+    every worker (those not pinned to a RUNTIME_CONFIG_PATH file).
+    """
+    from db.postgres import activate_config_snapshot, record_config_snapshot
+
+    await record_config_snapshot(config.version, config.to_dict())
+    await activate_config_snapshot(config.version)
+
+
+_service: Optional[ConfigService] = None
+
+
+def get_config_service() -> ConfigService:
+    """Get the shared config service."""
+    global _service
+    if _service is None:
+        _service = ConfigService(settings.RUNTIME_CONFIG_PATH, settings.RUNTIME_CONFIG_POLL_SECONDS)
+    return _service
+
+
+def current_scoring_config() -> ScoringConfig:
+    """The live snapshot. Take it once per lead and pass it along."""
+    return get_config_service().current()
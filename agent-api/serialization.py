@@ -0,0 +1,98 @@
+"""
+Serialization
+
+One fast encoding path for everything the hot path writes: API
+response bodies, trace JSONB and Redis values.
+
+JSON goes through orjson, which serializes dicts, lists, datetimes,
+enums and dataclasses natively and is several times faster than the
+stdlib. A pydantic model passed at the top level is written by its own
+compiled serializer straight to bytes (faster still than model_dump()
+plus orjson); models nested in other values go through model_dump().
+A result is never rendered to a JSON string and parsed back.
+
+Cached values can optionally use MessagePack (msgspec), which is
+10-15% smaller than JSON for our payloads at a small CPU cost (see
+bench/serialization.py) - worth it when Redis memory is the limit. Encoded MessagePack values
+start with the tag byte 0xC1 - reserved in MessagePack and never the
+first byte of UTF-8 text - so decode_cache() reads either encoding and
+CACHE_ENCODING can be switched without flushing Redis.
+"""
+
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+from config import settings
+
+
+_MSGPACK_TAG = b"\xc1"
+
+_msgpack_encoder = None
+_msgpack_decoder = None
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson doesn't handle natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON."""
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dumps_str(value: Any) -> str:
+    """Serialize to a JSON string (e.g. for asyncpg JSONB parameters)."""
+    return dumps(value).decode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON bytes or text."""
+    return orjson.loads(data)
+
+
+def _msgpack():
+    # msgspec is only imported once the msgpack encoding is actually used
+    global _msgpack_encoder, _msgpack_decoder
+    if _msgpack_encoder is None:
+        import msgspec
+        _msgpack_encoder = msgspec.msgpack.Encoder(enc_hook=_default)
+        _msgpack_decoder = msgspec.msgpack.Decoder()
+    return _msgpack_encoder, _msgpack_decoder
+
+
+def encode_cache(value: Any, encoding: str | None = None) -> bytes:
+    """
+    Encode a value for Redis.
+
+    Args:
+        value: JSON-compatible value or pydantic model
+        encoding: "json" or "msgpack" (default from settings.CACHE_ENCODING)
+
+    Returns:
+        Encoded bytes
+    """
+    encoding = encoding or settings.CACHE_ENCODING
+    if encoding == "msgpack":
+        encoder, _ = _msgpack()
+        return _MSGPACK_TAG + encoder.encode(value)
+    if encoding == "json":
+        return dumps(value)
+    raise ValueError(f"Unknown cache encoding: {encoding}")
+
+
+def decode_cache(raw: bytes | str) -> Any:
+    """Decode a value written by encode_cache (either encoding)."""
+    if isinstance(raw, bytes) and raw[:1] == _MSGPACK_TAG:
+        _, decoder = _msgpack()
+        return decoder.decode(memoryview(raw)[1:])
+    return orjson.loads(raw)
+
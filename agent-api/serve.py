@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Production Server
+
+Runs the API under gunicorn with several uvicorn worker processes, so
+CPU-bound work (validation, JSON, scoring rules) uses every core in the
+container instead of one.
+
+Pre-fork warm-up: the master imports the app and builds every
+read-only structure once - compiled validator regexes, email
+templates, scoring prompts/schemas, the MinHash permutations and the
+domain resolver - then freezes the GC so those objects stay shared
+copy-on-write with the workers. The Public Suffix List, when the full
+list is configured, is moved into a memory-mapped table that every
+worker maps from the same pages (see shared_tables.py).
+
+Connections are never shared across fork: anything the master opened
+is dropped in post_fork, and each worker builds its own Postgres/Redis
+connections and LLM connection pools in the FastAPI lifespan.
+
+Usage:
+    python serve.py                     # WEB_CONCURRENCY workers (default: CPU count)
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+
+For development use `uvicorn main:app --reload` instead.
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+
+from config import settings
+
+
+def shared_tables_dir() -> str:
+    """Directory for memory-mapped tables: RAM-backed /dev/shm if present."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "lead-agent")
+
+
+def warm_shared_state() -> None:
+    """Build read-only state in the master so workers inherit it."""
+    import guardrails.validators  # noqa: F401 - compiles the validator patterns
+    import tools.score_lead  # noqa: F401 - scoring prompts and output schemas
+    import tools.dedupe  # noqa: F401 - MinHash permutations
+    from tools.accounts import get_account_resolver, share_suffix_table
+    from tools.email_templates import get_registry
+
+    get_registry()
+    get_account_resolver()
+    if settings.PUBLIC_SUFFIX_LIST_PATH:
+        path = share_suffix_table(shared_tables_dir())
+        print(f"Public Suffix List shared via {path}")
+
+    # Move everything allocated so far out of the collector's reach, so
+    # GC passes in the workers don't touch (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+
+
+def reset_after_fork() -> None:
+    """Drop any connection or client the master created before forking."""
+    import db.postgres
+    import db.redis
+    import llm.router
+
+    db.postgres._connection = None
+    db.redis._redis_client = None
+    db.redis._scripts.clear()
+    llm.router._router = None
+    llm.router._model_routers.clear()
+
+
+def gunicorn_options(workers: int, bind: str) -> dict:
+    return {
+        "bind": bind,
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "timeout": settings.SERVER_WORKER_TIMEOUT_SECONDS,
+        "graceful_timeout": settings.SERVER_WORKER_TIMEOUT_SECONDS,
+        "keepalive": 5,
+        # Recycle workers periodically so slow leaks can't accumulate;
+        # jitter keeps them from all restarting at once
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS // 10,
+        "post_fork": lambda server, worker: reset_after_fork(),
+        "accesslog": "-",
+        "loglevel": settings.LOG_LEVEL.lower(),
+    }
+
+
+def run_gunicorn(workers: int, bind: str) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class LeadAgentServer(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from main import app
+            warm_shared_state()
+            return app
+
+    LeadAgentServer(gunicorn_options(workers, bind)).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Lead Qualification Agent API")
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY or os.cpu_count() or 1)
+    parser.add_argument("--bind", default=f"{settings.SERVER_HOST}:{settings.SERVER_PORT}")
+    args = parser.parse_args()
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        # gunicorn is POSIX-only; uvicorn's own multi-process mode spawns
+        # fresh interpreters, so there is no pre-fork sharing
+        import uvicorn
+        host, _, port = args.bind.rpartition(":")
+        print("gunicorn not available - falling back to uvicorn workers without pre-fork warm-up")
+        uvicorn.run("main:app", host=host, port=int(port), workers=args.workers)
+        return
+
+    run_gunicorn(args.workers, args.bind)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Shared Read-Only Tables
+
+Lookup tables stored in a flat file and memory-mapped read-only, so
+every worker process maps the same physical pages instead of holding
+its own copy.
+
+Python objects built before fork are shared copy-on-write at first,
+but reading them updates reference counts, which dirties their pages
+and gradually duplicates them in every worker. A memory-mapped table
+is never written, so it stays shared.
+
+File layout (little-endian):
+    magic  b"LQST"   version uint32   count uint32
+    offsets          (count + 1) x uint32, into the blob
+    blob             sorted UTF-8 strings, concatenated
+
+Lookups are a binary search over the sorted strings: O(log n) byte
+comparisons with no per-lookup allocation beyond the key itself.
+
+Usage:
+    MmapStringSet.build("/dev/shm/lead-agent/suffixes.bin", rules)
+    rules = MmapStringSet("/dev/shm/lead-agent/suffixes.bin")
+    "co.uk" in rules
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+_MAGIC = b"LQST"
+_VERSION = 1
+_HEADER = struct.Struct("<4sII")
+
+
+class MmapStringSet:
+    """Immutable set of strings backed by a memory-mapped file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self._count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a shared table (version {_VERSION})")
+        self._offsets = memoryview(self._map)[_HEADER.size:_HEADER.size + 4 * (self._count + 1)].cast("I")
+        self._blob_start = _HEADER.size + 4 * (self._count + 1)
+
+    @staticmethod
+    def build(path: str, strings: Iterable[str]) -> "MmapStringSet":
+        """
+        Write a table file atomically and open it.
+
+        Args:
+            path: Destination file (e.g. under /dev/shm)
+            strings: Table contents; duplicates are dropped
+        """
+        encoded = sorted({s.encode("utf-8") for s in strings})
+        offsets = [0]
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item))
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(encoded)))
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            f.write(b"".join(encoded))
+        os.replace(tmp, path)
+        return MmapStringSet(path)
+
+    def __contains__(self, value: str) -> bool:
+        key = value.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            item = self._item(mid)
+            if item < key:
+                lo = mid + 1
+            elif item > key:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._item(i).decode("utf-8")
+
+    def _item(self, index: int) -> bytes:
+        start = self._blob_start + self._offsets[index]
+        end = self._blob_start + self._offsets[index + 1]
+        return self._map[start:end]
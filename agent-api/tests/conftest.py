@@ -0,0 +1,33 @@
+"""
+Shared pytest setup.
+
+Tests import modules the way the app does (from agent-api/), and run
+without Postgres, Redis or API keys: everything stays in placeholder
+mode and LLM calls go to llm/mock.py.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import metrics  # noqa: E402
+from config import settings  # noqa: E402
+from guardrails.rate_limit import llm_governor  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """Isolate tests: empty metrics, full LLM rate buckets, no retry backoff."""
+    metrics.reset()
+    llm_governor.rpm._local.clear()
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_SECONDS", 0.0)
+    yield
+    metrics.reset()
+
+
+def counter(name: str, **labels) -> float:
+    """Current value of a counter (0 if never incremented)."""
+    return metrics.snapshot()["counters"].get(metrics.metric_key(name, **labels), 0)
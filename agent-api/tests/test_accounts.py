@@ -0,0 +1,77 @@
+"""Account resolution (tools/accounts.py)."""
+
+import hashlib
+
+import pytest
+
+import tools.accounts
+from tools.accounts import AccountResolver, TrigramIndex
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """A dict standing in for Redis, shared by every resolver in the test."""
+    store = {}
+    monkeypatch.setattr(tools.accounts, "cache_get", store.get)
+    monkeypatch.setattr(tools.accounts, "cache_set", lambda key, value, ttl_seconds=None: store.__setitem__(key, value))
+    return store
+
+
+def test_subdomain_and_sibling_domain_share_an_account(shared_cache):
+    resolver = AccountResolver(name_threshold=0.8)
+
+    first = resolver.resolve("jo@acme.com", "Acme Inc")
+    sub = resolver.resolve("al@mail.acme.com", "Acme")
+    sibling = resolver.resolve("kim@acme.co.uk", "Acme Ltd")
+
+    assert first.account_id == sub.account_id == sibling.account_id == "acme.com"
+    assert sibling.matched_by == "sibling"
+
+
+def test_free_mail_matches_by_company_name(shared_cache):
+    resolver = AccountResolver(name_threshold=0.8)
+    resolver.resolve("jo@acme.com", "Acme Widgets")
+
+    account = resolver.resolve("someone@gmail.com", "ACME Widgets, Inc.")
+
+    assert account.account_id == "acme.com"
+    assert account.free_mail
+
+
+def test_replicas_resolve_names_the_same_way(shared_cache):
+    first = AccountResolver(name_threshold=0.8).resolve("jo@gmail.com", "Apex Widgets")
+    # Another worker, with none of the first one's in-memory state
+    second = AccountResolver(name_threshold=0.8).resolve("al@yahoo.com", "Apex Widgets")
+
+    assert first.account_id == second.account_id == "name:apex widgets"
+    assert second.matched_by == "company"
+
+
+def test_in_memory_maps_are_bounded(shared_cache):
+    resolver = AccountResolver(name_threshold=0.8, max_cached=50)
+
+    names = [hashlib.md5(str(i).encode()).hexdigest()[:12] for i in range(500)]
+    for i, name in enumerate(names):
+        resolver.resolve(f"jo@company{i}.com", f"Company Number {i}")
+        resolver.resolve(f"jo{i}@gmail.com", f"Shop {name}")
+
+    assert len(resolver._domains) <= 50
+    assert len(resolver._account_names) <= 50
+    assert len(resolver._names) <= 50
+    assert sum(len(accounts) for accounts in resolver._brands.values()) <= 50
+
+    # Evicted aliases come back from the shared cache
+    assert resolver.resolve("al@company3.com").account_id == "company3.com"
+    assert resolver.resolve("al@gmail.com", f"Shop {names[3]}").account_id == f"name:shop {names[3]}"
+
+
+def test_trigram_index_remove_drops_postings():
+    index = TrigramIndex()
+    index.add("acme widgets", "a")
+    index.add("apex tools", "b")
+
+    index.remove("acme widgets")
+
+    assert index.search("acme widgets", 0.5) is None
+    assert index.search("apex tools", 0.9) == ("b", 1.0)
+    assert all("acme widgets" not in texts for texts in index._postings.values())
@@ -0,0 +1,41 @@
+"""Email drafts (tools/draft_email.py) and the draft SSE endpoint."""
+
+from fastapi.testclient import TestClient
+
+import main
+from llm.errors import LLMError
+from models import LeadRow
+from tools.draft_email import draft_inputs_from_row, render_draft
+
+
+def needs_info_row() -> LeadRow:
+    return LeadRow(lead_key="jo@acme.com_202642", email="jo@acme.com", company="Acme",
+                   score=0, tier="needs_info", segment="smb", budget="$10k")
+
+
+def test_needs_info_draft_from_a_stored_row_asks_for_missing_fields():
+    lead, score_result = draft_inputs_from_row(needs_info_row())
+
+    draft = render_draft(lead, score_result)
+
+    assert score_result.missing_fields == ["need", "timeline"]
+    assert "What challenge are you hoping to solve?" in draft.body
+    assert "When are you hoping to have this up and running?" in draft.body
+
+
+def test_stream_broken_midway_ends_with_error_event(monkeypatch):
+    async def get_lead_by_key(lead_key):
+        return needs_info_row()
+
+    async def broken_stream(*args, **kwargs):
+        yield {"type": "token", "text": "Hi"}
+        raise LLMError("Transport error: connection reset", retryable=True)
+
+    monkeypatch.setattr(main, "get_lead_by_key", get_lead_by_key)
+    monkeypatch.setattr(main, "stream_draft_email", broken_stream)
+
+    response = TestClient(main.app).get("/lead/jo@acme.com_202642/draft/stream")
+
+    events = [block.split("\n", 1)[0] for block in response.text.strip().split("\n\n")]
+    assert events == ["event: token", "event: error"]
+    assert "connection reset" in response.text
@@ -0,0 +1,42 @@
+"""Change feed reads and the Redis tail (events.py)."""
+
+import asyncio
+import threading
+
+import events
+from events import EventFeed
+
+
+def test_redis_reads_run_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def stream_read(key, after, count, block_ms=None):
+        threads.append(threading.current_thread())
+        return [("5-0", {"e": b'{"type":"lead.upserted","key":"k","at":"now","data":{}}'})]
+
+    monkeypatch.setattr(events, "stream_read", stream_read)
+    feed = EventFeed("test:events", maxlen=100, local_buffer=100)
+
+    read = asyncio.run(feed.read())
+
+    assert [event.id for event in read] == ["5-0"]
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_tail_backs_off_while_redis_is_unavailable(monkeypatch):
+    calls = []
+    monkeypatch.setattr(events, "stream_read", lambda *args: calls.append(args))
+    monkeypatch.setattr(events.random, "uniform", lambda low, high: high)
+    feed = EventFeed("test:events", maxlen=100, local_buffer=100)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        feed._waiters.add((loop, asyncio.Event(), (0, 0)))
+        tail = asyncio.create_task(feed._tail())
+        await asyncio.sleep(0.3)
+        tail.cancel()
+
+    asyncio.run(run())
+
+    # Sleeps of 1s after the first failure, instead of a hot loop
+    assert len(calls) == 1
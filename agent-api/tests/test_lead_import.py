@@ -0,0 +1,56 @@
+"""Row splitting for streamed lead imports (tools/lead_import.py)."""
+
+import asyncio
+
+from tools.lead_import import _parse_row, _rows
+
+
+def split(data: bytes, fmt: str, chunk_size: int = 7) -> list[tuple[int, bytes]]:
+    async def chunks():
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    async def run():
+        return [row async for row in _rows(chunks(), 0, fmt)]
+
+    return asyncio.run(run())
+
+
+def test_ndjson_escaped_quote_does_not_merge_rows():
+    data = (
+        b'{"email":"a@acme.com","need":"5\\" monitors"}\n'
+        b'{"email":"b@acme.com"}\n'
+        b'{"email":"c@acme.com"}\n'
+    )
+
+    rows = split(data, "ndjson")
+
+    assert [_parse_row(raw, "ndjson", None)["email"] for _, raw in rows] == [
+        "a@acme.com", "b@acme.com", "c@acme.com",
+    ]
+    assert _parse_row(rows[0][1], "ndjson", None)["need"] == '5" monitors'
+    assert rows[-1][0] == len(data)
+
+
+def test_csv_quoted_newline_continues_the_row():
+    header = ["email", "need"]
+    data = b'a@acme.com,"two\nlines"\nb@acme.com,plain\n'
+
+    rows = split(data, "csv")
+
+    assert [_parse_row(raw, "csv", header) for _, raw in rows] == [
+        {"email": "a@acme.com", "need": "two\nlines"},
+        {"email": "b@acme.com", "need": "plain"},
+    ]
+
+
+def test_csv_doubled_quotes_are_escapes():
+    header = ["email", "need"]
+    data = b'a@acme.com,"5"" monitors"\nb@acme.com,"say ""hi""\nthere"\nc@acme.com,x\n'
+
+    rows = split(data, "csv")
+
+    assert [_parse_row(raw, "csv", header)["need"] for _, raw in rows] == [
+        '5" monitors', 'say "hi"\nthere', "x",
+    ]
+    assert [offset for offset, _ in rows][-1] == len(data)
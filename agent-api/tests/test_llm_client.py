@@ -0,0 +1,262 @@
+"""LLMClient retries, hedging, circuit breaker and streaming, against llm/mock.py."""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+
+import llm.client
+from config import settings
+from conftest import counter
+from guardrails.rate_limit import RateLimitExceeded, llm_governor
+from llm.client import LLMClient
+from llm.errors import CircuitOpenError, LLMError
+from llm.mock import FaultConfig, FaultInjectingTransport
+from llm.providers import GeminiProvider
+
+
+def make_client(hedge: bool = False, max_retries: int = 2, **faults) -> tuple[LLMClient, FaultInjectingTransport]:
+    transport = FaultInjectingTransport(FaultConfig(base_latency_ms=1, jitter_ms=0, seed=7, **faults))
+    provider = GeminiProvider(name="mock", model="mock-model", api_key="mock", base_url="http://mock.local")
+    return LLMClient(provider, transport=transport, hedge=hedge, max_retries=max_retries), transport
+
+
+@pytest.fixture
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "LLM_BREAKER_RESET_SECONDS", 60)
+
+
+def test_generate_returns_parsed_reply():
+    client, transport = make_client()
+
+    response = asyncio.run(client.generate("Score this lead"))
+
+    assert json.loads(response.text)["score"] == 72
+    assert response.provider == "mock"
+    assert response.input_tokens > 0
+    assert transport.requests == 1
+    assert client.breaker.state == "closed"
+
+
+def test_retries_until_exhausted():
+    client, transport = make_client(error_rate=1.0, max_retries=2)
+
+    with pytest.raises(LLMError) as raised:
+        asyncio.run(client.generate("Score this lead"))
+
+    assert raised.value.retryable
+    assert raised.value.status_code == 500
+    assert transport.requests == 3
+    assert counter("llm.retries", model="mock-model") == 2
+
+
+def test_retry_recovers_from_throttling():
+    client, transport = make_client(throttle_rate=1.0, max_retries=3)
+
+    async def run():
+        task = asyncio.create_task(client.generate("Score this lead"))
+        while transport.requests < 2:
+            await asyncio.sleep(0.001)
+        transport.config.throttle_rate = 0.0
+        return await task
+
+    response = asyncio.run(run())
+
+    assert response.text
+    assert counter("llm.retries", model="mock-model") >= 1
+
+
+def test_malformed_json_is_an_llm_error():
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"<html>busy</html>"))
+    provider = GeminiProvider(name="mock", model="mock-model", api_key="mock", base_url="http://mock.local")
+    client = LLMClient(provider, transport=transport, hedge=False, max_retries=0)
+
+    with pytest.raises(LLMError, match="Malformed response"):
+        asyncio.run(client.generate("Score this lead"))
+    assert client.breaker._failures == 1
+
+
+def test_breaker_opens_and_fails_fast(breaker_settings):
+    client, transport = make_client(error_rate=1.0, max_retries=0)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(LLMError):
+                await client.generate("Score this lead")
+        with pytest.raises(CircuitOpenError):
+            await client.generate("Score this lead")
+
+    asyncio.run(run())
+
+    assert client.breaker.state == "open"
+    assert transport.requests == 2
+    assert counter("llm.short_circuited", model="mock-model") == 1
+
+
+def test_half_open_probe_success_closes(breaker_settings):
+    client, transport = make_client(error_rate=1.0, max_retries=0)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(LLMError):
+                await client.generate("Score this lead")
+        client.breaker.reset_seconds = 0
+        transport.config.error_rate = 0.0
+        return await client.generate("Score this lead")
+
+    assert asyncio.run(run()).text
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_probe_failure_reopens(breaker_settings):
+    client, _ = make_client(error_rate=1.0, max_retries=0)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(LLMError):
+                await client.generate("Score this lead")
+        client.breaker.reset_seconds = 0
+        with pytest.raises(LLMError):
+            await client.generate("Score this lead")
+
+    asyncio.run(run())
+
+    assert client.breaker.state == "open"
+
+
+def test_cancelled_probe_does_not_wedge_breaker(breaker_settings):
+    client, transport = make_client(error_rate=1.0, max_retries=0)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(LLMError):
+                await client.generate("Score this lead")
+        client.breaker.reset_seconds = 0
+        transport.config.error_rate = 0.0
+        transport.config.hang_rate = 1.0
+
+        probe = asyncio.create_task(client.generate("Score this lead"))
+        while transport.requests < 3:
+            await asyncio.sleep(0.001)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        assert client.breaker.state == "half_open"
+
+        # The next call is allowed to probe, and closes the circuit
+        transport.config.hang_rate = 0.0
+        return await client.generate("Score this lead")
+
+    assert asyncio.run(run()).text
+    assert client.breaker.state == "closed"
+
+
+def test_governor_refusal_releases_probe(breaker_settings, monkeypatch):
+    client, transport = make_client(error_rate=1.0, max_retries=0)
+
+    class RefusingGovernor:
+        @asynccontextmanager
+        async def slot(self, timeout=None, provider="gemini"):
+            raise RateLimitExceeded("llm_rpm", 1.0)
+            yield
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(LLMError):
+                await client.generate("Score this lead")
+        client.breaker.reset_seconds = 0
+        with monkeypatch.context() as patch:
+            patch.setattr(llm.client, "llm_governor", RefusingGovernor())
+            with pytest.raises(RateLimitExceeded):
+                await client.generate("Score this lead")
+        # A refusal says nothing about the provider: still half-open, probe free
+        assert client.breaker.state == "half_open"
+        transport.config.error_rate = 0.0
+        return await client.generate("Score this lead")
+
+    assert asyncio.run(run()).text
+    assert client.breaker.state == "closed"
+
+
+def test_hedge_answers_when_primary_stalls(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY_MS", 20)
+    client, transport = make_client(hedge=True, hang_rate=1.0)
+    client._latencies.extend([0.005] * 20)
+
+    async def run():
+        task = asyncio.create_task(client.generate("Score this lead"))
+        while transport.requests < 1:
+            await asyncio.sleep(0.001)
+        transport.config.hang_rate = 0.0
+        return await task
+
+    response = asyncio.run(run())
+
+    assert response.hedged
+    assert transport.requests == 2
+    assert counter("llm.hedges", model="mock-model") == 1
+
+
+def test_cancelled_caller_cancels_the_primary_attempt(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY_MS", 10_000)
+    client, transport = make_client(hedge=True, hang_rate=1.0)
+
+    async def run():
+        call = asyncio.create_task(client.generate("Score this lead"))
+        while transport.requests < 1:
+            await asyncio.sleep(0.001)
+        assert llm_governor.concurrency._local_holders
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        # Let the cancelled attempt unwind and hand back its slot
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert not llm_governor.concurrency._local_holders
+
+
+def test_fast_reply_is_not_hedged(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY_MS", 200)
+    client, transport = make_client(hedge=True)
+
+    response = asyncio.run(client.generate("Score this lead"))
+
+    assert not response.hedged
+    assert transport.requests == 1
+
+
+def test_stream_yields_reply_in_chunks():
+    client, _ = make_client(reply=lambda prompt: "Hi there, thanks for reaching out")
+
+    async def run():
+        return [chunk async for chunk in client.stream("Draft an email")]
+
+    chunks = asyncio.run(run())
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == "Hi there, thanks for reaching out"
+    assert client.breaker.state == "closed"
+
+
+def test_stream_retries_before_first_chunk():
+    client, transport = make_client(error_rate=1.0, max_retries=3, reply=lambda prompt: "Hello again")
+
+    async def run():
+        chunks = []
+        stream = client.stream("Draft an email")
+        task = asyncio.create_task(stream.__anext__())
+        while transport.requests < 2:
+            await asyncio.sleep(0.001)
+        transport.config.error_rate = 0.0
+        chunks.append(await task)
+        chunks += [chunk async for chunk in stream]
+        return chunks
+
+    assert "".join(asyncio.run(run())) == "Hello again"
+    assert counter("llm.retries", model="mock-model") >= 1
@@ -0,0 +1,154 @@
+"""LLMRouter ranking and failover, over mock providers (llm.mock.mock_router)."""
+
+import asyncio
+
+import pytest
+
+from conftest import counter
+from llm.errors import LLMError
+from llm.mock import mock_router
+from llm.router import LLMRouter
+
+
+@pytest.fixture(autouse=True)
+def no_exploration(monkeypatch):
+    monkeypatch.setattr(LLMRouter, "EXPLORE_RATE", 0.0)
+
+
+def names(clients) -> list[str]:
+    return [c.provider.name for c in clients]
+
+
+def make_router(**overrides):
+    providers = {
+        "fast": {"base_latency_ms": 2, "jitter_ms": 0, "hedge": False, "max_retries": 0},
+        "slow": {"base_latency_ms": 40, "jitter_ms": 0, "hedge": False, "max_retries": 0},
+    }
+    for name, options in overrides.items():
+        providers[name].update(options)
+    return mock_router(**providers)
+
+
+def test_ranks_by_observed_latency():
+    router = make_router()
+
+    async def run():
+        for client in router.clients:
+            await router._attempt(client, "Score this lead", None, None)
+
+    asyncio.run(run())
+
+    assert router.stats["fast"].latency_ms < router.stats["slow"].latency_ms
+    assert names(router.rank()) == ["fast", "slow"]
+
+
+def test_error_rate_outweighs_latency():
+    router = make_router()
+    router.stats["fast"].latency_ms = 10.0
+    router.stats["slow"].latency_ms = 400.0
+    router.stats["fast"].error_rate = 0.5
+
+    assert names(router.rank()) == ["slow", "fast"]
+
+
+def test_cost_outweighs_latency():
+    router = make_router()
+    router.stats["fast"].latency_ms = 10.0
+    router.stats["slow"].latency_ms = 50.0
+    router.stats["fast"].cost_usd = 0.01
+
+    assert names(router.rank()) == ["slow", "fast"]
+
+
+def test_open_breaker_is_skipped():
+    router = make_router()
+    router.stats["fast"].latency_ms = 10.0
+    router.stats["slow"].latency_ms = 400.0
+    router.clients[0].breaker.state = "open"
+
+    assert names(router.rank()) == ["slow"]
+
+
+def test_all_breakers_open_still_ranks_everyone():
+    router = make_router()
+    for client in router.clients:
+        client.breaker.state = "open"
+
+    assert sorted(names(router.rank())) == ["fast", "slow"]
+
+
+def test_fails_over_to_next_provider():
+    router = make_router(fast={"error_rate": 1.0})
+    router.stats["fast"].latency_ms = 10.0
+    router.stats["slow"].latency_ms = 400.0
+
+    response = asyncio.run(router.generate("Score this lead"))
+
+    assert response.provider == "slow"
+    assert router.stats["fast"].error_rate > 0
+    assert counter("llm.router.failover", provider="fast") == 1
+    assert counter("llm.router.selected", provider="slow") == 1
+
+
+def test_raises_when_every_provider_fails():
+    router = make_router(fast={"error_rate": 1.0}, slow={"error_rate": 1.0})
+
+    with pytest.raises(LLMError):
+        asyncio.run(router.generate("Score this lead"))
+    assert counter("llm.router.failover", provider="fast") == 1
+    assert counter("llm.router.failover", provider="slow") == 1
+
+
+def test_busy_provider_is_passed_over():
+    router = make_router(fast={"max_concurrency": 1})
+    router.stats["fast"].latency_ms = 10.0
+    router.stats["slow"].latency_ms = 400.0
+
+    async def run():
+        async with router._slots["fast"]:
+            return await router.generate("Score this lead")
+
+    assert asyncio.run(run()).provider == "slow"
+    assert counter("llm.router.skipped", provider="fast", reason="concurrency") == 1
+
+
+def test_per_provider_options_are_routed(monkeypatch):
+    router = make_router()
+    provider = router.clients[0].provider
+    build = provider.build_request
+    seen = {}
+
+    def build_request(prompt, system, options, cached):
+        seen["options"] = options
+        return build(prompt, system, options, cached)
+
+    monkeypatch.setattr(provider, "build_request", build_request)
+    router.stats["fast"].latency_ms = 10.0
+    router.stats["slow"].latency_ms = 400.0
+
+    asyncio.run(router.generate("Score this lead", options={"fast": {"temperature": 0.2}, "slow": {}}))
+
+    assert seen["options"] == {"temperature": 0.2}
+
+
+def test_stream_fails_over_before_first_chunk():
+    router = make_router(fast={"error_rate": 1.0})
+    router.stats["fast"].latency_ms = 10.0
+    router.stats["slow"].latency_ms = 400.0
+
+    async def run():
+        return [chunk async for chunk in router.stream("Draft an email")]
+
+    assert "".join(asyncio.run(run()))
+    assert counter("llm.router.failover", provider="fast") == 1
+    assert counter("llm.router.selected", provider="slow") == 1
+
+
+def test_stream_raises_when_every_provider_fails():
+    router = make_router(fast={"error_rate": 1.0}, slow={"error_rate": 1.0})
+
+    async def run():
+        return [chunk async for chunk in router.stream("Draft an email")]
+
+    with pytest.raises(LLMError):
+        asyncio.run(run())
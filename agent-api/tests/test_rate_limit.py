@@ -0,0 +1,80 @@
+"""Token buckets, the concurrency limit and the LLM governor (guardrails/rate_limit.py)."""
+
+import asyncio
+import threading
+
+import pytest
+
+import guardrails.rate_limit
+from guardrails.rate_limit import (
+    ConcurrencyLimit, LLMGovernor, RateLimitExceeded, TokenBucket,
+    check_lead_rate_limit, lead_limiter_by_api_key, lead_limiter_by_domain,
+)
+
+
+def local_tokens(bucket: TokenBucket, key: str) -> float:
+    return bucket._local[key][0]
+
+
+def test_redis_calls_run_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def eval_script(script, keys, args):
+        threads.append(threading.current_thread())
+        return None  # Redis unavailable: fall back to the local bucket
+
+    monkeypatch.setattr(guardrails.rate_limit, "eval_script", eval_script)
+    bucket = TokenBucket("test", per_minute=60)
+
+    allowed, _ = asyncio.run(bucket.try_acquire("k"))
+
+    assert allowed
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_rejected_lead_refunds_the_api_key_token(monkeypatch):
+    monkeypatch.setattr(lead_limiter_by_api_key, "_local", type(lead_limiter_by_api_key._local)())
+    monkeypatch.setattr(lead_limiter_by_domain, "_local", type(lead_limiter_by_domain._local)())
+    domain_capacity = lead_limiter_by_domain.capacity
+
+    async def run():
+        for _ in range(domain_capacity):
+            assert await check_lead_rate_limit("key-a", "acme.com") is None
+        return await check_lead_rate_limit("key-b", "acme.com")
+
+    limited = asyncio.run(run())
+
+    assert isinstance(limited, RateLimitExceeded)
+    assert limited.limiter == "lead_domain"
+    assert local_tokens(lead_limiter_by_api_key, "key-b") == pytest.approx(lead_limiter_by_api_key.capacity, abs=0.1)
+
+
+def test_governor_refunds_token_when_no_slot_frees_up():
+    governor = LLMGovernor(max_concurrency=1, per_minute=60, queue_timeout=0.05)
+
+    async def run():
+        async with governor.slot(provider="p"):
+            before = local_tokens(governor.rpm, "p")
+            with pytest.raises(RateLimitExceeded):
+                async with governor.slot(provider="p"):
+                    pass
+            return before
+
+    before = asyncio.run(run())
+
+    assert local_tokens(governor.rpm, "p") == pytest.approx(before, abs=0.1)
+
+
+def test_concurrency_slots_are_released():
+    limit = ConcurrencyLimit("test", limit=1)
+
+    async def run():
+        holder = await limit.acquire(timeout=0.1)
+        with pytest.raises(RateLimitExceeded):
+            await limit.acquire(timeout=0.05)
+        await limit.release(holder)
+        await limit.release(await limit.acquire(timeout=0.1))
+
+    asyncio.run(run())
+
+    assert not limit._local_holders
@@ -0,0 +1,183 @@
+"""SheetsSync coalescing, diffing, quota handling and retries, against integrations/fake_sheets.py."""
+
+import asyncio
+import time
+
+import pytest
+
+import integrations.sheets
+from conftest import counter
+from integrations.fake_sheets import fake_sheets_client
+from integrations.sheets import COLUMNS, SheetsError, SheetsSync
+
+
+def lead(key: str, **fields) -> dict:
+    row = {"lead_key": key, "email": f"{key}@acme.com", "company": "Acme", "score": 50,
+           "tier": "nurture", "segment": "smb", "status": "new"}
+    row.update(fields)
+    return row
+
+
+def make_sync(**config):
+    client, fake = fake_sheets_client(latency_ms=0, **config)
+    return SheetsSync(client, sheet="Leads", per_minute=600, flush_seconds=0.1), fake
+
+
+def sheet_rows(fake) -> dict[str, list]:
+    """lead_key -> row values, asserting no lead appears twice."""
+    rows = fake.read("Leads!A2:J")
+    keys = [row[0] for row in rows if row]
+    assert len(keys) == len(set(keys)), f"duplicate rows: {keys}"
+    return {row[0]: row for row in rows if row}
+
+
+def test_first_flush_writes_header_and_rows():
+    sync, fake = make_sync()
+    sync.submit(lead("a"))
+    sync.submit(lead("b"))
+
+    assert asyncio.run(sync.flush()) == 2
+
+    assert fake.read("Leads!A1:J1") == [list(COLUMNS)]
+    assert set(sheet_rows(fake)) == {"a", "b"}
+    assert sync.pending == 0
+
+
+def test_updates_between_flushes_are_coalesced():
+    sync, fake = make_sync()
+    for score in range(10, 110, 10):
+        sync.submit(lead("a", score=score))
+
+    asyncio.run(sync.flush())
+
+    assert fake.writes == 2  # header + one batch
+    assert sheet_rows(fake)["a"][3] == 100
+
+
+def test_only_changed_cells_are_written():
+    sync, fake = make_sync()
+
+    async def run():
+        sync.submit(lead("a"))
+        await sync.flush()
+        cells = fake.cells_written
+
+        sync.submit(lead("a", score=80))
+        await sync.flush()
+        assert fake.cells_written - cells == 1
+
+        # Adjacent changes (score, tier) go out as one range
+        sync.submit(lead("a", score=90, tier="qualified"))
+        await sync.flush()
+        assert fake.cells_written - cells == 3
+
+        # Nothing changed: no request at all
+        writes = fake.write_requests
+        sync.submit(lead("a", score=90, tier="qualified"))
+        await sync.flush()
+        assert fake.write_requests == writes
+
+    asyncio.run(run())
+
+    assert sheet_rows(fake)["a"][3:5] == [90, "qualified"]
+
+
+def test_reload_finds_existing_rows():
+    sync, fake = make_sync()
+    sync.submit(lead("a"))
+    sync.submit(lead("b"))
+    asyncio.run(sync.flush())
+
+    # A restarted worker re-reads the sheet instead of appending duplicates
+    restarted = SheetsSync(sync.client, sheet="Leads", per_minute=600)
+    restarted.submit(lead("b", score=75))
+    restarted.submit(lead("c"))
+    asyncio.run(restarted.flush())
+
+    rows = sheet_rows(fake)
+    assert list(rows) == ["a", "b", "c"]
+    assert rows["b"][3] == 75
+
+
+def test_429_honors_retry_after():
+    sync, fake = make_sync(writes_per_minute=2)
+
+    async def run():
+        sync.submit(lead("a"))
+        assert await sync._flush_with_retry()  # header + batch use the quota
+
+        sync.submit(lead("a", score=90))
+        assert not await sync._flush_with_retry()
+        assert fake.throttled == 1
+        assert sync.pending == 1
+        assert sync._retry_at - time.monotonic() > 30  # the fake's Retry-After, not a short backoff
+
+        # Inside the Retry-After window nothing is sent
+        requests = fake.write_requests
+        assert not await sync._flush_with_retry()
+        assert fake.write_requests == requests
+
+    asyncio.run(run())
+
+    assert counter("sheets.retries") == 1
+
+
+def test_lost_reply_retry_is_idempotent():
+    sync, fake = make_sync()
+
+    async def run():
+        await sync.load()
+        fake.config.lost_reply_rate = 1.0
+        sync.submit(lead("a", score=60))
+        with pytest.raises(SheetsError):
+            await sync.flush()
+        # The write landed even though the reply was lost
+        assert sheet_rows(fake)["a"][3] == 60
+        assert sync.pending == 1
+
+        fake.config.lost_reply_rate = 0.0
+        assert await sync.flush() == 1
+
+    asyncio.run(run())
+
+    assert list(sheet_rows(fake)) == ["a"]
+
+
+def test_newer_submission_wins_over_failed_batch():
+    sync, fake = make_sync()
+
+    async def run():
+        await sync.load()
+        sync.submit(lead("a", score=60))
+        await sync.flush()
+
+        fake.config.error_rate = 1.0
+        sync.submit(lead("a", score=70))
+        with pytest.raises(SheetsError):
+            await sync.flush()
+
+        sync.submit(lead("a", score=80))
+        fake.config.error_rate = 0.0
+        await sync.flush()
+
+    asyncio.run(run())
+
+    assert sheet_rows(fake)["a"][3] == 80
+    assert sync.pending == 0
+
+
+def test_drain_converges_under_faults(monkeypatch):
+    monkeypatch.setattr(integrations.sheets.random, "uniform", lambda low, high: 0.0)
+    sync, fake = make_sync(error_rate=0.2, lost_reply_rate=0.3, seed=3)
+    sync.max_rows_per_request = 5
+    expected = {}
+    for i in range(20):
+        for score in (40, 60 + i):
+            sync.submit(lead(f"lead{i}", score=score))
+        expected[f"lead{i}"] = 60 + i
+
+    asyncio.run(asyncio.wait_for(sync.drain(), timeout=10))
+
+    rows = sheet_rows(fake)
+    assert {key: row[3] for key, row in rows.items()} == expected
+    assert fake.failed > 0
@@ -0,0 +1,63 @@
+"""Approval-time execution of prepared act-phase work (tools/speculative.py)."""
+
+import asyncio
+from dataclasses import asdict
+from datetime import datetime
+
+import pytest
+
+import tools.speculative
+from guardrails.approval import ApprovalRequest
+from records import LeadRecord, ScoreRecord
+from tools.speculative import PREPARED_TOOLS, execute_approved_action, prepare_action
+
+LEAD = LeadRecord(
+    email="buyer@corp.com", company="Corp", title="VP Engineering", need="Lead routing",
+    timeline="this quarter", budget="$250k", company_size=2000, industry="software"
+)
+SCORE = ScoreRecord(
+    score=90, tier="qualified", segment="enterprise", criteria_scores={"placeholder": 90},
+    missing_fields=[], confidence="low", reasoning="test"
+)
+
+
+@pytest.fixture
+def commits(monkeypatch):
+    calls = []
+
+    async def commit(action_id, notes=None, lead_row=None, task=None, draft=None):
+        calls.append({"lead_row": lead_row, "task": task, "draft": draft})
+        return True
+
+    monkeypatch.setattr(tools.speculative, "commit_approved_action", commit)
+    monkeypatch.setattr(tools.speculative.get_sweeper(), "schedule", lambda task: None)
+    return calls
+
+
+def make_request(prepared=None, config_version="v-old") -> ApprovalRequest:
+    return ApprovalRequest(
+        action_id="approval_1", action_type="enterprise_scheduling", lead_key="buyer@corp.com_202642",
+        reason="test", requested_at=datetime.utcnow(), prepared=prepared,
+        context={"lead": LEAD.present_fields(), "score": asdict(SCORE),
+                 "tools": list(PREPARED_TOOLS), "config_version": config_version},
+    )
+
+
+def test_prepared_draft_is_committed(commits):
+    prepared = prepare_action("buyer@corp.com_202642", LEAD, SCORE)
+    # As read back from approvals.prepared
+    request = make_request(prepared=prepared.to_dict())
+
+    assert asyncio.run(execute_approved_action(request))
+
+    draft = commits[0]["draft"]
+    assert draft["draft_id"] == prepared.draft["draft_id"]
+    assert draft["lead_key"] == "buyer@corp.com_202642"
+    assert commits[0]["lead_row"] is not None and commits[0]["task"] is not None
+
+
+def test_rebuilt_work_keeps_the_recorded_config_version(commits):
+    asyncio.run(execute_approved_action(make_request(config_version="v-old")))
+
+    assert commits[0]["lead_row"].config_version == "v-old"
+    assert commits[0]["draft"] is not None
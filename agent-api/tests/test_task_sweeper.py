@@ -0,0 +1,51 @@
+"""Overdue task escalation (tools/task_sweeper.py)."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import tools.task_sweeper
+from conftest import counter
+from tools.task_sweeper import TaskEscalationSweeper
+
+
+def overdue_task(task_id: str) -> dict:
+    return {"task_id": task_id, "lead_key": "lead_1", "due_date": datetime.utcnow() - timedelta(minutes=1)}
+
+
+def test_run_survives_database_errors(monkeypatch):
+    calls = {"fetch": 0, "mark": 0}
+
+    async def fetch(until, limit):
+        calls["fetch"] += 1
+        if calls["fetch"] == 1:
+            raise ConnectionError("database unavailable")
+        return [overdue_task("task_1")] if calls["fetch"] == 2 else []
+
+    async def mark(task_ids):
+        calls["mark"] += 1
+        if calls["mark"] == 1:
+            raise ConnectionError("database unavailable")
+        return task_ids
+
+    monkeypatch.setattr(tools.task_sweeper, "fetch_escalation_candidates", fetch)
+    monkeypatch.setattr(tools.task_sweeper, "mark_tasks_escalated", mark)
+    monkeypatch.setattr(tools.task_sweeper.random, "uniform", lambda low, high: 0.0)
+
+    escalated = []
+
+    async def on_escalate(tasks):
+        escalated.extend(t["task_id"] for t in tasks)
+
+    async def run():
+        sweeper = TaskEscalationSweeper(on_escalate=on_escalate, horizon=timedelta(milliseconds=10))
+        loop = asyncio.create_task(sweeper.run())
+        while not escalated and not loop.done():
+            await asyncio.sleep(0.01)
+        sweeper.stop()
+        await asyncio.wait_for(loop, timeout=1)
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    # The failed claim kept the task, so it was escalated once the database came back
+    assert escalated == ["task_1"]
+    assert counter("sweeper.errors") == 2
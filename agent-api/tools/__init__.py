@@ -8,19 +8,45 @@ Students implement these tools week by week:
 - Week 3: score_lead
 - Week 4: upsert_lead, create_task, draft_email
 - Week 5: memory (get/write company history)
+
+Tools are imported lazily (PEP 562): `from tools import score_lead`
+loads only tools/score_lead.py, so importing one tool - or a helper
+module like tools.accounts - doesn't pay for every other tool and its
+SDKs. See bench/import_time.py.
 """
 
-from .score_lead import score_lead
-from .upsert_lead import upsert_lead_row
-from .create_task import create_followup_task
-from .draft_email import draft_email
-from .memory import get_company_history, write_company_summary
-
-__all__ = [
-    "score_lead",
-    "upsert_lead_row",
-    "create_followup_task",
-    "draft_email",
-    "get_company_history",
-    "write_company_summary",
-]
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .score_lead import score_lead
+    from .upsert_lead import upsert_lead_row
+    from .create_task import create_followup_task
+    from .draft_email import draft_email, draft_emails_batch
+    from .memory import get_company_history, write_company_summary
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "score_lead": "score_lead",
+    "upsert_lead_row": "upsert_lead",
+    "create_followup_task": "create_task",
+    "draft_email": "draft_email",
+    "draft_emails_batch": "draft_email",
+    "get_company_history": "memory",
+    "write_company_summary": "memory",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
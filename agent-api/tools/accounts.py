@@ -0,0 +1,442 @@
+"""
+Account Resolution
+
+Maps every lead to a canonical account id so company memory, rate
+limits and LLM context are grouped per company rather than per raw
+email domain.
+
+    mail.acme.co.uk  -> acme.co.uk      (Public Suffix List)
+    acme.co.uk       -> acme.com        (sibling domain, same company name)
+    jo@gmail.com     -> by company name (free-mail never identifies a company)
+
+Components:
+- SuffixTrie: the Public Suffix List as a trie of reversed labels, so
+  finding the registrable domain is O(number of labels). A built-in
+  subset covers common TLDs; set PUBLIC_SUFFIX_LIST_PATH to load the
+  full list (https://publicsuffix.org/list/public_suffix_list.dat).
+  Under serve.py the rules move to a memory-mapped SuffixSet shared
+  by all worker processes (share_suffix_table).
+- FREE_MAIL_DOMAINS / FREE_MAIL_BRANDS: consumer mailbox providers
+- TrigramIndex: fuzzy company-name matching (Dice coefficient over
+  character trigrams) via an inverted index
+
+Account ids:
+    acme.com            business domain (the first domain seen for the account)
+    name:acme widgets   free-mail lead, resolved by company name
+    person:jo@gmail.com free-mail lead with no company
+
+Domain and exact company-name aliases are written through to Redis
+(account:alias:domain:{domain}, account:alias:name:{name}) so other
+replicas resolve them the same way. Sibling-domain and fuzzy name
+matching use per-process indexes: a replica can only fuzzy-match names
+it has seen itself, after which the variant's alias is shared too.
+
+The in-memory maps are LRU caches of at most MAX_CACHED entries each;
+an evicted alias is reloaded from Redis the next time it is needed.
+"""
+
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import metrics
+from config import settings
+from db.redis import cache_get, cache_set
+
+
+# Built-in Public Suffix List subset: generic TLDs plus the multi-label
+# suffixes we see most in lead traffic. Wildcard (*.) and exception (!)
+# rules are supported when the full list is loaded.
+_BUILTIN_SUFFIXES = """
+com net org edu gov mil int info biz io co ai app dev tech cloud xyz me us ca
+uk de fr es it nl be ch at se no dk fi pl pt ie cz gr hu ro ru ua tr il in cn
+jp kr sg hk tw au nz br mx ar cl za ng ke eg ae sa
+co.uk org.uk ac.uk gov.uk ltd.uk plc.uk me.uk net.uk
+com.au net.au org.au edu.au gov.au
+co.nz org.nz net.nz
+co.jp ne.jp or.jp ac.jp
+co.kr or.kr
+com.br net.br org.br
+com.mx org.mx
+com.cn net.cn org.cn
+com.hk com.sg com.tw com.tr com.ar com.co com.pl
+co.in net.in org.in firm.in
+co.za org.za
+co.il org.il
+github.io gitlab.io herokuapp.com vercel.app netlify.app pages.dev
+azurewebsites.net cloudfront.net appspot.com blogspot.com
+"""
+
+FREE_MAIL_DOMAINS = frozenset("""
+gmail.com googlemail.com yahoo.com ymail.com rocketmail.com hotmail.com
+outlook.com live.com msn.com aol.com icloud.com me.com mac.com
+protonmail.com proton.me pm.me gmx.com gmx.net gmx.de web.de mail.com
+zoho.com yandex.com yandex.ru mail.ru qq.com 163.com 126.com
+fastmail.com tutanota.com hey.com comcast.net verizon.net att.net
+""".split())
+
+# Regional variants (yahoo.co.uk, hotmail.fr, ...) share the brand label
+FREE_MAIL_BRANDS = frozenset({"gmail", "yahoo", "hotmail", "outlook", "live", "gmx", "yandex", "aol"})
+
+
+class _SuffixRules:
+    """Registrable-domain logic shared by the suffix rule stores."""
+
+    def public_suffix_length(self, labels: list[str]) -> int:
+        raise NotImplementedError
+
+    def registrable_domain(self, domain: str) -> Optional[str]:
+        """Public suffix plus one label, or None if domain is itself a suffix."""
+        labels = domain.strip(".").lower().split(".")
+        suffix = self.public_suffix_length(labels)
+        if suffix >= len(labels):
+            return None
+        return ".".join(labels[-(suffix + 1):])
+
+
+class SuffixTrie(_SuffixRules):
+    """Public Suffix List rules as a trie keyed by reversed labels."""
+
+    _RULE = object()
+
+    def __init__(self, rules):
+        self._root: dict = {}
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: str) -> None:
+        node = self._root
+        for label in reversed(rule.strip().lower().split(".")):
+            node = node.setdefault(label, {})
+        node[self._RULE] = True
+
+    def public_suffix_length(self, labels: list[str]) -> int:
+        """
+        Number of trailing labels that form the public suffix.
+
+        Args:
+            labels: Domain labels, e.g. ["mail", "acme", "co", "uk"]
+        """
+        node = self._root
+        matched = 1  # an unlisted TLD is its own public suffix
+        for depth, label in enumerate(reversed(labels), start=1):
+            exception = node.get("!" + label)
+            if exception is not None and self._RULE in exception:
+                return depth - 1
+            child = node.get(label) or node.get("*")
+            if child is None:
+                break
+            node = child
+            if self._RULE in node:
+                matched = depth
+        return matched
+
+
+class SuffixSet(_SuffixRules):
+    """
+    Public Suffix List rules as a flat set of rule strings.
+
+    Same results as SuffixTrie, with one set lookup per candidate
+    suffix. Used with a memory-mapped set (shared_tables.MmapStringSet)
+    so pre-forked workers share one copy of the full list.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def public_suffix_length(self, labels: list[str]) -> int:
+        # Longest candidate first; an exception rule beats any wildcard
+        for i in range(len(labels)):
+            candidate = ".".join(labels[i:])
+            if "!" + candidate in self.rules:
+                return len(labels) - i - 1
+            wildcard = "*." + ".".join(labels[i + 1:]) if i + 1 < len(labels) else None
+            if candidate in self.rules or (wildcard and wildcard in self.rules):
+                return len(labels) - i
+        return 1
+
+
+def _load_suffix_rules() -> list[str]:
+    path = settings.PUBLIC_SUFFIX_LIST_PATH
+    if path and Path(path).exists():
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return [line.split()[0] for line in lines if line.strip() and not line.startswith("//")]
+    return _BUILTIN_SUFFIXES.split()
+
+
+_suffixes: _SuffixRules = SuffixTrie(_load_suffix_rules())
+
+
+def share_suffix_table(directory: str) -> str:
+    """
+    Move the suffix rules into a memory-mapped table under directory.
+
+    Called once in the server master before forking workers (see
+    serve.py); afterwards every worker reads the same mapped pages.
+
+    Returns:
+        Path of the table file
+    """
+    from shared_tables import MmapStringSet
+
+    global _suffixes
+    path = str(Path(directory) / "public_suffixes.bin")
+    _suffixes = SuffixSet(MmapStringSet.build(path, _load_suffix_rules()))
+    return path
+
+
+def registrable_domain(email_or_domain: str) -> Optional[str]:
+    """
+    Registrable domain of an email address or host name.
+
+    Example: "jo@mail.acme.co.uk" -> "acme.co.uk"
+    """
+    return _suffixes.registrable_domain(email_or_domain.rsplit("@", 1)[-1])
+
+
+def is_free_mail(domain: Optional[str]) -> bool:
+    """True for consumer mailbox providers (registrable domain expected)."""
+    if not domain:
+        return False
+    return domain in FREE_MAIL_DOMAINS or domain.split(".", 1)[0] in FREE_MAIL_BRANDS
+
+
+def domain_key(email: str) -> str:
+    """
+    Per-company key for an email: the registrable domain, or the full
+    address for free-mail (so all gmail.com senders don't share a key).
+    """
+    domain = registrable_domain(email)
+    if domain is None or is_free_mail(domain):
+        return email.strip().lower()
+    return domain
+
+
+_NAME_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_LEGAL_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+                   "gmbh", "plc", "sa", "ag", "bv", "pty", "the"}
+
+
+def normalize_company_name(name: str) -> str:
+    """Lowercase, strip punctuation and legal suffixes."""
+    words = _NAME_WORD_PATTERN.findall(name.lower())
+    return " ".join(w for w in words if w not in _LEGAL_SUFFIXES) or " ".join(words)
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Fuzzy string lookup by shared character trigrams.
+
+    With max_entries set, the least recently matched texts beyond it
+    are dropped.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+        self._postings: dict[str, set[str]] = {}
+        self._sizes: dict[str, int] = {}
+        self._keys: OrderedDict[str, str] = OrderedDict()
+
+    def add(self, text: str, key: str) -> bool:
+        """
+        Index text under key (text is expected to be normalized).
+
+        Returns:
+            True if text was not indexed yet
+        """
+        if text in self._keys:
+            self._keys.move_to_end(text)
+            return False
+        grams = _trigrams(text)
+        self._keys[text] = key
+        self._sizes[text] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(text)
+        if self.max_entries is not None:
+            while len(self._keys) > self.max_entries:
+                self.remove(next(iter(self._keys)))
+        return True
+
+    def remove(self, text: str) -> None:
+        """Drop text from the index."""
+        if self._keys.pop(text, None) is None:
+            return
+        del self._sizes[text]
+        for gram in _trigrams(text):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(text)
+                if not postings:
+                    del self._postings[gram]
+
+    def search(self, text: str, threshold: float) -> Optional[tuple[str, float]]:
+        """
+        Best match by Dice similarity.
+
+        Returns:
+            (key, similarity) or None if nothing reaches threshold
+        """
+        if text in self._keys:
+            self._keys.move_to_end(text)
+            return self._keys[text], 1.0
+        grams = _trigrams(text)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        best = None
+        for candidate, common in shared.items():
+            score = 2 * common / (len(grams) + self._sizes[candidate])
+            if score >= threshold and (best is None or score > best[2]):
+                best = (candidate, self._keys[candidate], score)
+        if best is None:
+            return None
+        self._keys.move_to_end(best[0])
+        return best[1], best[2]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+@dataclass
+class Account:
+    """Canonical account a lead belongs to."""
+    account_id: str
+    domain: Optional[str]           # registrable domain, None for free-mail
+    company: Optional[str]          # normalized company name
+    matched_by: str                 # "domain" | "sibling" | "company" | "new"
+    free_mail: bool = False
+
+
+class AccountResolver:
+    """Resolves leads to canonical account ids."""
+
+    # Most domains, account names and indexed company names kept per
+    # process; least recently used ones beyond this are dropped
+    MAX_CACHED = 100_000
+
+    def __init__(self, name_threshold: float, max_cached: int = MAX_CACHED):
+        self.name_threshold = name_threshold
+        self.max_cached = max_cached
+        self._domains: OrderedDict[str, str] = OrderedDict()        # registrable domain -> account id
+        self._brands: dict[str, set[str]] = {}                      # brand label -> account ids
+        self._account_names: OrderedDict[str, str] = OrderedDict()  # account id -> normalized name
+        self._names = TrigramIndex(max_entries=max_cached)
+
+    def resolve(self, email: str, company: Optional[str] = None) -> Account:
+        """
+        Resolve a lead to its account.
+
+        Business email: known domain, then a sibling domain whose account
+        has a matching company name (acme.co.uk / acme.com), then a new
+        account. Free-mail: fuzzy company name, then a new account.
+
+        Args:
+            email: Lead email address
+            company: Company name as submitted
+
+        Returns:
+            Account
+        """
+        domain = registrable_domain(email)
+        free = is_free_mail(domain)
+        name = normalize_company_name(company) if company else None
+        account = self._resolve(email, domain, free, name)
+        account.free_mail = free
+        metrics.increment("accounts.resolved", matched_by=account.matched_by)
+        return account
+
+    def _resolve(self, email: str, domain: Optional[str], free: bool, name: Optional[str]) -> Account:
+        if domain and not free:
+            account_id = self._domains.get(domain) or self._load_alias(f"domain:{domain}")
+            if account_id:
+                return self._link(account_id, domain, name, "domain")
+
+            brand = domain.split(".", 1)[0]
+            for candidate in list(self._brands.get(brand, ())):
+                known = self._account_names.get(candidate)
+                if name and known and self._names_match(name, known):
+                    return self._link(candidate, domain, name, "sibling")
+
+            # A business domain is stronger evidence than a similar name
+            # (two "Apex Consulting"s are usually different companies)
+            return self._link(domain, domain, name, "new")
+
+        if name:
+            match = self._names.search(name, self.name_threshold)
+            if match is None or match[1] < 1.0:
+                # An exact alias from any replica beats a fuzzy local match
+                account_id = self._load_alias(f"name:{name}")
+                if account_id:
+                    return self._link(account_id, None, name, "company")
+            if match is not None:
+                return self._link(match[0], None, name, "company")
+            account_id = f"name:{name}"
+        else:
+            account_id = f"person:{email.strip().lower()}"
+        return self._link(account_id, None, name, "new")
+
+    def _link(self, account_id: str, domain: Optional[str], name: Optional[str], matched_by: str) -> Account:
+        if domain:
+            if self._domains.get(domain) != account_id:
+                self._remember_domain(domain, account_id)
+                cache_set(f"account:alias:domain:{domain}", account_id)
+            else:
+                self._domains.move_to_end(domain)
+        if name:
+            if account_id not in self._account_names:
+                self._account_names[account_id] = name
+                if len(self._account_names) > self.max_cached:
+                    self._account_names.popitem(last=False)
+            else:
+                self._account_names.move_to_end(account_id)
+            if self._names.add(name, account_id):
+                cache_set(f"account:alias:name:{name}", account_id)
+        return Account(
+            account_id=account_id,
+            domain=domain,
+            company=name or self._account_names.get(account_id),
+            matched_by=matched_by,
+        )
+
+    def _remember_domain(self, domain: str, account_id: str) -> None:
+        self._domains[domain] = account_id
+        self._domains.move_to_end(domain)
+        self._brands.setdefault(domain.split(".", 1)[0], set()).add(account_id)
+        while len(self._domains) > self.max_cached:
+            old_domain, old_account = self._domains.popitem(last=False)
+            brand = old_domain.split(".", 1)[0]
+            accounts = self._brands.get(brand)
+            if accounts is not None:
+                accounts.discard(old_account)
+                if not accounts:
+                    del self._brands[brand]
+
+    def _load_alias(self, key: str) -> Optional[str]:
+        account_id = cache_get(f"account:alias:{key}")
+        if account_id and key.startswith("domain:"):
+            self._remember_domain(key[len("domain:"):], account_id)
+        return account_id
+
+    def _names_match(self, a: str, b: str) -> bool:
+        if a == b:
+            return True
+        ga, gb = _trigrams(a), _trigrams(b)
+        return 2 * len(ga & gb) / (len(ga) + len(gb)) >= self.name_threshold
+
+
+_resolver: Optional[AccountResolver] = None
+
+
+def get_account_resolver() -> AccountResolver:
+    """Get the shared account resolver."""
+    global _resolver
+    if _resolver is None:
+        _resolver = AccountResolver(name_threshold=settings.ACCOUNT_NAME_MATCH_THRESHOLD)
+    return _resolver
@@ -8,6 +8,10 @@ Students implement this in Week 4.
 from typing import Optional
 from datetime import datetime, timedelta
 from models import LeadInput, ScoreResult
+from ids import new_id
+from db.postgres import insert_task, fetch_pending_tasks, mark_task_completed
+from events import publish_event
+from tools.task_sweeper import get_sweeper
 
 
 class TaskResult:
@@ -20,10 +24,11 @@ class TaskResult:
         self.due_date = due_date
 
 
-def create_followup_task(
+async def create_followup_task(
     lead: LeadInput,
     score_result: ScoreResult,
-    assigned_to: Optional[str] = None
+    assigned_to: Optional[str] = None,
+    lead_key: Optional[str] = None
 ) -> TaskResult:
     """
     Create a follow-up task based on lead tier.
@@ -39,96 +44,117 @@ def create_followup_task(
         lead: The original lead input
         score_result: The scoring result
         assigned_to: Optional assignee email
+        lead_key: Lead the task belongs to (default: email_YYYYWW)
 
     Returns:
         TaskResult with task details
     """
-    # Determine task type and due date based on tier
-    task_config = _get_task_config(score_result.tier, score_result.segment)
-
-    task_id = f"task_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{lead.email.split('@')[0]}"
-
-    # TODO: Implement in Week 4
-    # Options:
-    # 1. Google Tasks API
-    # 2. Google Sheets (task tracking sheet)
-    # 3. Internal task queue
+    task = build_task(
+        lead_key or f"{lead.email.lower()}_{datetime.utcnow().strftime('%Y%W')}",
+        score_result,
+        assigned_to
+    )
+    await insert_task(task)
 
-    # Placeholder implementation
-    print(f"[PLACEHOLDER] Would create task: {task_config['title']}")
-    print(f"  Lead: {lead.email}")
-    print(f"  Due: {task_config['due_date']}")
-    print(f"  Priority: {task_config['priority']}")
+    # Tasks due inside the sweeper's loaded window go straight on its heap
+    get_sweeper().schedule(task)
 
     return TaskResult(
         success=True,
-        task_id=task_id,
-        task_type=task_config["type"],
-        due_date=task_config["due_date"]
+        task_id=task["task_id"],
+        task_type=task["task_type"],
+        due_date=task["due_date"]
     )
 
 
-def _get_task_config(tier: str, segment: str) -> dict:
-    """Get task configuration based on tier and segment."""
-    now = datetime.utcnow()
-
-    configs = {
-        "needs_info": {
-            "type": "request_info",
-            "title": "Request missing information from lead",
-            "due_date": now + timedelta(hours=4),
-            "priority": "high",
-        },
-        "reject": {
-            "type": "review_reject",
-            "title": "Review rejected lead decision",
-            "due_date": now + timedelta(days=1),
-            "priority": "low",
-        },
-        "nurture": {
-            "type": "nurture_outreach",
-            "title": "Send nurture email sequence",
-            "due_date": now + timedelta(days=3),
-            "priority": "medium",
-        },
-        "qualified_smb": {
-            "type": "schedule_call",
-            "title": "Schedule discovery call with qualified lead",
-            "due_date": now + timedelta(days=1),
-            "priority": "high",
-        },
-        "qualified_enterprise": {
-            "type": "prepare_proposal",
-            "title": "Prepare enterprise proposal and schedule call",
-            "due_date": now + timedelta(days=1),
-            "priority": "urgent",
-        },
+def build_task(lead_key: str, score_result: ScoreResult, assigned_to: Optional[str] = None) -> dict:
+    """
+    Task row for a scored lead, without storing it.
+
+    Task type, priority and due date (from now) follow the lead's tier
+    and segment; see _TASK_CONFIGS.
+    """
+    task_config = _get_task_config(score_result.tier, score_result.segment)
+    return {
+        "task_id": new_id("task"),
+        "lead_key": lead_key,
+        "task_type": task_config["type"],
+        "title": task_config["title"],
+        "priority": task_config["priority"],
+        "assigned_to": assigned_to,
+        "due_date": task_config["due_date"],
     }
 
+
+# Task configuration by tier/segment key. Due dates are offsets from now.
+_TASK_CONFIGS = {
+    "needs_info": {
+        "type": "request_info",
+        "title": "Request missing information from lead",
+        "due_in": timedelta(hours=4),
+        "priority": "high",
+    },
+    "reject": {
+        "type": "review_reject",
+        "title": "Review rejected lead decision",
+        "due_in": timedelta(days=1),
+        "priority": "low",
+    },
+    "nurture": {
+        "type": "nurture_outreach",
+        "title": "Send nurture email sequence",
+        "due_in": timedelta(days=3),
+        "priority": "medium",
+    },
+    "qualified_smb": {
+        "type": "schedule_call",
+        "title": "Schedule discovery call with qualified lead",
+        "due_in": timedelta(days=1),
+        "priority": "high",
+    },
+    "qualified_enterprise": {
+        "type": "prepare_proposal",
+        "title": "Prepare enterprise proposal and schedule call",
+        "due_in": timedelta(days=1),
+        "priority": "urgent",
+    },
+}
+
+
+def _get_task_config(tier: str, segment: str) -> dict:
+    """Get task configuration based on tier and segment."""
     if tier == "qualified":
         key = f"qualified_{segment}"
     else:
         key = tier
 
-    return configs.get(key, configs["nurture"])
+    config = _TASK_CONFIGS.get(key, _TASK_CONFIGS["nurture"])
+    return {**config, "due_date": datetime.utcnow() + config["due_in"]}
 
 
-def list_pending_tasks(lead_key: Optional[str] = None) -> list:
+async def list_pending_tasks(
+    lead_key: Optional[str] = None,
+    due_before: Optional[datetime] = None,
+    limit: int = 100
+) -> list:
     """
     List pending tasks, optionally filtered by lead.
 
+    Uses an indexed range query ordered by due date, so cost depends
+    on the page size rather than the number of open tasks.
+
     Args:
         lead_key: Optional lead key to filter by
+        due_before: Optional due date cutoff (ignored when lead_key is set)
+        limit: Maximum number of tasks
 
     Returns:
         List of pending task dictionaries
     """
-    # TODO: Implement in Week 4
-    print(f"[PLACEHOLDER] Would list pending tasks")
-    return []
+    return await fetch_pending_tasks(lead_key=lead_key, due_before=due_before, limit=limit)
 
 
-def complete_task(task_id: str, notes: Optional[str] = None) -> bool:
+async def complete_task(task_id: str, notes: Optional[str] = None) -> bool:
     """
     Mark a task as completed.
 
@@ -139,6 +165,8 @@ def complete_task(task_id: str, notes: Optional[str] = None) -> bool:
     Returns:
         True if marked successfully
     """
-    # TODO: Implement in Week 4
-    print(f"[PLACEHOLDER] Would complete task: {task_id}")
-    return True
+    completed = await mark_task_completed(task_id, notes)
+    if completed:
+        get_sweeper().discard(task_id)
+        publish_event("task.completed", task_id, {"notes": notes})
+    return completed
@@ -0,0 +1,252 @@
+"""
+Near-Duplicate Lead Detection
+
+Finds an existing lead_key for a submission that is nearly identical
+to one already processed - form double-posts, bots spraying small
+variants, the same person using +aliases - so the agent can merge it
+instead of re-running the full pipeline.
+
+Each lead is reduced to a set of features (normalized email, company,
+title and need word shingles) and summarized by a MinHash signature
+of NUM_PERM values; the Jaccard similarity of two feature sets is
+estimated by the share of equal signature positions.
+
+Signatures are indexed with locality-sensitive hashing: the signature
+is cut into BANDS bands of ROWS values and each band is hashed to a
+bucket. Leads sharing any bucket are candidates, and candidates are
+confirmed by signature similarity >= DEDUP_THRESHOLD. With 16 bands of
+4 rows a pair at Jaccard 0.8 becomes a candidate >99.9% of the time and
+a pair at 0.3 about 12% of the time.
+
+Storage (Redis, expiring after DEDUP_WINDOW_DAYS):
+    dedup:lsh:{band}:{bucket}  SET of lead_keys
+    dedup:sig:{lead_key}       packed signature (NUM_PERM x uint32)
+
+A lookup is two pipelined round trips (bucket members, then candidate
+signatures) independent of index size; buckets are sampled with
+SRANDMEMBER so a hot bucket cannot blow up the candidate list. Without
+Redis a bounded per-process index is used. Computing a signature costs
+just under a millisecond of CPU for a typical lead.
+
+A match only means "same lead". Its cached score may be reused only
+when the scoring inputs are identical too (score_inputs_key). A
+resubmission that changes, say, company_size or timeline keeps the
+lead_key but is scored again.
+"""
+
+import hashlib
+import random
+import re
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import metrics
+from config import settings
+from db.redis import pipeline_execute
+from models import LeadInput
+
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Email identity is one feature but should outweigh a long need text
+EMAIL_WEIGHT = 8
+COMPANY_WEIGHT = 2
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_perm_random = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_perm_random.randrange(1, _MERSENNE_PRIME), _perm_random.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_COMPANY_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "gmbh", "plc", "sa", "ag"}
+_DOTLESS_MAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+# Lead fields scoring reads besides the email
+SCORE_INPUT_FIELDS = ("company", "title", "need", "timeline", "budget", "company_size", "industry")
+
+
+@dataclass
+class DuplicateMatch:
+    """An existing lead that a submission duplicates."""
+    lead_key: str
+    similarity: float
+
+
+def normalize_email(email: str) -> str:
+    """Lowercase, drop +tags, and drop dots for providers that ignore them."""
+    local, _, domain = email.strip().lower().partition("@")
+    local = local.split("+", 1)[0]
+    if domain in _DOTLESS_MAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"
+
+
+def lead_features(lead: LeadInput) -> set[str]:
+    """Feature set compared by MinHash."""
+    features = {f"e{i}:{normalize_email(lead.email)}" for i in range(EMAIL_WEIGHT)}
+
+    if lead.company:
+        words = [w for w in _WORD_PATTERN.findall(lead.company.lower()) if w not in _COMPANY_SUFFIXES]
+        name = " ".join(words)
+        features.update(f"c{i}:{name}" for i in range(COMPANY_WEIGHT))
+        features.update(f"cw:{w}" for w in words)
+
+    if lead.title:
+        features.update(f"t:{w}" for w in _WORD_PATTERN.findall(lead.title.lower()))
+
+    if lead.need:
+        words = _WORD_PATTERN.findall(lead.need.lower())
+        features.update(f"n:{w}" for w in words)
+        features.update(f"n2:{a} {b}" for a, b in zip(words, words[1:]))
+
+    return features
+
+
+def score_inputs_key(lead: LeadInput) -> str:
+    """Digest of the normalized SCORE_INPUT_FIELDS (case and spacing ignored)."""
+    values = []
+    for name in SCORE_INPUT_FIELDS:
+        value = getattr(lead, name)
+        values.append("" if value is None else " ".join(str(value).lower().split()))
+    return hashlib.blake2b("\x1f".join(values).encode(), digest_size=8).hexdigest()
+
+
+def minhash(features: set[str]) -> tuple[int, ...]:
+    """MinHash signature of NUM_PERM 32-bit values."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "little")
+        for f in features
+    ]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def band_keys(signature: tuple[int, ...]) -> list[str]:
+    """Redis keys of the LSH buckets a signature falls into."""
+    keys = []
+    for band in range(BANDS):
+        rows = array("I", signature[band * ROWS:(band + 1) * ROWS]).tobytes()
+        bucket = hashlib.blake2b(rows, digest_size=8).hexdigest()
+        keys.append(f"dedup:lsh:{band}:{bucket}")
+    return keys
+
+
+class LeadDedupeIndex:
+    """MinHash/LSH index of processed leads."""
+
+    # Size of the per-process fallback index
+    LOCAL_MAX_LEADS = 100_000
+
+    def __init__(self, threshold: float, window_days: int, max_candidates: int):
+        self.threshold = threshold
+        self.ttl_seconds = window_days * 86400
+        self.max_candidates = max_candidates
+        self._local_buckets: dict[str, set[str]] = {}
+        self._local_signatures: OrderedDict[str, tuple[int, ...]] = OrderedDict()
+
+    def find(self, signature: tuple[int, ...]) -> Optional[DuplicateMatch]:
+        """
+        Find the most similar indexed lead above the threshold.
+
+        Args:
+            signature: MinHash signature of the incoming lead
+
+        Returns:
+            DuplicateMatch, or None if the lead is new
+        """
+        started = time.perf_counter()
+        keys = band_keys(signature)
+        candidates = self._candidates(keys)
+        best = None
+        for lead_key, other in self._signatures(candidates).items():
+            score = similarity(signature, other)
+            if score >= self.threshold and (best is None or score > best.similarity):
+                best = DuplicateMatch(lead_key=lead_key, similarity=score)
+
+        metrics.observe("dedup.lookup_us", (time.perf_counter() - started) * 1e6)
+        metrics.observe("dedup.candidates", len(candidates))
+        metrics.increment("dedup.result", outcome="duplicate" if best else "unique")
+        return best
+
+    def add(self, lead_key: str, signature: tuple[int, ...]) -> None:
+        """Index a processed lead."""
+        keys = band_keys(signature)
+        commands = [("SET", f"dedup:sig:{lead_key}", array("I", signature).tobytes(), "EX", self.ttl_seconds)]
+        for key in keys:
+            commands.append(("SADD", key, lead_key))
+            commands.append(("EXPIRE", key, self.ttl_seconds))
+        if pipeline_execute(commands) is not None:
+            return
+
+        if lead_key in self._local_signatures:
+            self._local_remove(lead_key)
+        self._local_signatures[lead_key] = signature
+        for key in keys:
+            self._local_buckets.setdefault(key, set()).add(lead_key)
+        while len(self._local_signatures) > self.LOCAL_MAX_LEADS:
+            self._local_remove(next(iter(self._local_signatures)))
+
+    def _candidates(self, keys: list[str]) -> set[str]:
+        replies = pipeline_execute([("SRANDMEMBER", key, self.max_candidates) for key in keys])
+        if replies is None:
+            candidates = set()
+            for key in keys:
+                candidates.update(self._local_buckets.get(key, ()))
+            return candidates
+        return {
+            member.decode() if isinstance(member, bytes) else member
+            for reply in replies for member in reply
+        }
+
+    def _signatures(self, lead_keys: set[str]) -> dict[str, tuple[int, ...]]:
+        if not lead_keys:
+            return {}
+        ordered = list(lead_keys)
+        replies = pipeline_execute([("GET", f"dedup:sig:{key}") for key in ordered])
+        if replies is None:
+            return {key: self._local_signatures[key] for key in ordered if key in self._local_signatures}
+        return {key: tuple(array("I", raw)) for key, raw in zip(ordered, replies) if raw}
+
+    def _local_remove(self, lead_key: str) -> None:
+        signature = self._local_signatures.pop(lead_key)
+        for key in band_keys(signature):
+            bucket = self._local_buckets.get(key)
+            if bucket is not None:
+                bucket.discard(lead_key)
+                if not bucket:
+                    del self._local_buckets[key]
+
+
+_index: Optional[LeadDedupeIndex] = None
+
+
+def get_dedupe_index() -> LeadDedupeIndex:
+    """Get the shared dedupe index."""
+    global _index
+    if _index is None:
+        _index = LeadDedupeIndex(
+            threshold=settings.DEDUP_THRESHOLD,
+            window_days=settings.DEDUP_WINDOW_DAYS,
+            max_candidates=settings.DEDUP_MAX_CANDIDATES,
+        )
+    return _index
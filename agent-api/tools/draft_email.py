@@ -8,9 +8,20 @@ IMPORTANT: This tool creates DRAFTS only - it does NOT send emails.
 Sending emails requires human approval (Week 7 guardrails).
 """
 
-from typing import Optional
+from typing import Optional, Iterable, AsyncIterator
 from datetime import datetime
-from models import LeadInput, ScoreResult
+import asyncio
+from models import LeadInput, ScoreResult, LeadRow
+from config import settings
+from ids import new_id
+from llm.errors import LLMError
+from db.redis import cache_get, cache_set
+from tools.email_templates import CompiledTemplate, get_registry
+from tools.score_lead import _check_missing_fields
+
+
+# Completed streamed drafts are reused for identical (lead, template, model) requests
+DRAFT_CACHE_TTL_SECONDS = 24 * 60 * 60
 
 
 class EmailDraft:
@@ -22,13 +33,16 @@ class EmailDraft:
         to: str,
         subject: str,
         body: str,
-        template_type: str
+        template_type: str,
+        template_version: Optional[int] = None
     ):
         self.draft_id = draft_id
         self.to = to
         self.subject = subject
         self.body = body
         self.template_type = template_type
+        self.template_version = template_version
+        self.personalized = False
         self.created_at = datetime.utcnow()
 
 
@@ -53,14 +67,7 @@ def draft_email(
     Returns:
         EmailDraft ready for review/sending
     """
-    # Determine template type from tier if not specified
-    if not template_type:
-        template_type = _tier_to_template(score_result.tier)
-
-    # Generate draft content
-    subject, body = _generate_email_content(lead, score_result, template_type)
-
-    draft_id = f"draft_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+    draft = render_draft(lead, score_result, template_type)
 
     # TODO: Implement in Week 4
     # Options:
@@ -69,89 +76,351 @@ def draft_email(
     # 3. Return for human review
 
     # Placeholder implementation
-    print(f"[PLACEHOLDER] Would create email draft: {template_type}")
+    print(f"[PLACEHOLDER] Would create email draft: {draft.template_type}")
     print(f"  To: {lead.email}")
-    print(f"  Subject: {subject}")
+    print(f"  Subject: {draft.subject}")
+
+    return draft
+
+
+def render_draft(
+    lead: LeadInput,
+    score_result: ScoreResult,
+    template_type: Optional[str] = None
+) -> EmailDraft:
+    """
+    Render a draft from its template without storing it anywhere.
 
+    Side-effect free, so it can run ahead of an approval (see
+    tools/speculative.py). Also accepts LeadRecord / ScoreRecord.
+    """
+    # Determine template type from tier if not specified
+    if not template_type:
+        template_type = _tier_to_template(score_result.tier)
+
+    template = _select_template(template_type)
+    subject, body = template.render(_build_context(template, lead, score_result))
     return EmailDraft(
-        draft_id=draft_id,
+        draft_id=new_id("draft"),
         to=lead.email,
         subject=subject,
         body=body,
-        template_type=template_type
+        template_type=template.template_type,
+        template_version=template.version
     )
 
 
-def _tier_to_template(tier: str) -> str:
-    """Map tier to email template type."""
-    mapping = {
-        "reject": "nurture",  # Soft rejection, keep door open
-        "nurture": "nurture",
-        "qualified": "qualified",
-        "needs_info": "needs_info",
-    }
-    return mapping.get(tier, "nurture")
+def draft_emails_batch(
+    items: Iterable[tuple[LeadInput, ScoreResult]],
+    template_type: Optional[str] = None
+) -> list[EmailDraft]:
+    """
+    Render drafts for many leads in one pass.
+
+    Used by the weekly nurture campaign. Templates are resolved once per
+    template type rather than once per lead, and no per-draft logging
+    is done.
+
+    Args:
+        items: (lead, score_result) pairs
+        template_type: Optional override applied to every lead
+
+    Returns:
+        List of EmailDraft in input order
+    """
+    registry = get_registry()
+    resolved: dict[str, CompiledTemplate] = {}
+    drafts = []
+
+    for lead, score_result in items:
+        ttype = template_type or _tier_to_template(score_result.tier)
+        template = resolved.get(ttype)
+        if template is None:
+            template = resolved[ttype] = registry.get(ttype if ttype in registry else "nurture")
+
+        subject, body = template.render(_build_context(template, lead, score_result))
+        drafts.append(EmailDraft(
+            draft_id=new_id("draft"),
+            to=lead.email,
+            subject=subject,
+            body=body,
+            template_type=template.template_type,
+            template_version=template.version
+        ))
+
+    print(f"[PLACEHOLDER] Would create {len(drafts)} email drafts")
+    return drafts
+
+
+async def personalize_drafts(
+    drafts: list[EmailDraft],
+    leads: list[LeadInput],
+    max_concurrency: Optional[int] = None
+) -> list[EmailDraft]:
+    """
+    Optionally rewrite rendered drafts with the LLM.
+
+    Identical prompts (same template, need, company and title) are sent
+    once and the result is shared. Distinct prompts are fanned out
+    concurrently through the provider router; each call also takes a
+    slot from the shared LLM governor, so the campaign cannot starve
+    live scoring traffic of provider quota. Drafts whose LLM call fails or times out in the
+    governor queue keep their rendered body.
+
+    Args:
+        drafts: Drafts from draft_emails_batch
+        leads: The matching leads, in the same order
+        max_concurrency: Max in-flight calls from this batch (default from settings)
+
+    Returns:
+        The same drafts, with bodies personalized where possible
+    """
+    if not (settings.GEMINI_API_KEY or settings.ANTHROPIC_API_KEY):
+        print("[PLACEHOLDER] Would personalize drafts with LLM (no API key configured)")
+        return drafts
 
+    prompts = [_personalization_prompt(d, lead) for d, lead in zip(drafts, leads)]
+    unique_prompts = list(dict.fromkeys(prompts))
 
-def _generate_email_content(
+    fan_out = asyncio.Semaphore(max_concurrency or settings.EMAIL_PERSONALIZE_CONCURRENCY)
+
+    async def personalize(prompt: str) -> str:
+        async with fan_out:
+            return await _llm_personalize(prompt)
+
+    results = await asyncio.gather(
+        *(personalize(prompt) for prompt in unique_prompts),
+        return_exceptions=True
+    )
+    by_prompt = dict(zip(unique_prompts, results))
+
+    for draft, prompt in zip(drafts, prompts):
+        body = by_prompt[prompt]
+        if isinstance(body, str) and body:
+            draft.body = body
+            draft.personalized = True
+
+    print(f"[PERSONALIZE] {len(unique_prompts)} LLM calls for {len(drafts)} drafts")
+    return drafts
+
+
+async def stream_draft_email(
+    lead_key: str,
     lead: LeadInput,
     score_result: ScoreResult,
-    template_type: str
-) -> tuple[str, str]:
+    template_type: Optional[str] = None,
+    model: Optional[str] = None
+) -> AsyncIterator[dict]:
+    """
+    Stream an LLM-personalized draft chunk by chunk.
+
+    Yields events of the form {"type": "token", "text": ...} while the
+    body is generated, then one {"type": "done", "draft": {...}} event.
+    The draft is only persisted and cached after the last chunk; if the
+    consumer disconnects early nothing is saved.
+
+    Text comes from the LLM router, so calls go through the governor,
+    retries, circuit breakers and provider failover. Without a
+    configured provider, or if every provider fails before the first
+    chunk, the rendered template is streamed instead.
+
+    Identical (lead_key, template, version, model) requests are served
+    from the cached completed draft without calling the LLM. Only
+    personalized drafts are cached.
+
+    If the LLM stream breaks off after its first chunk, LLMError is
+    raised and nothing is saved; the consumer has part of the text.
+
+    Args:
+        lead_key: The lead the draft belongs to
+        lead: The lead input data
+        score_result: The scoring result
+        template_type: Optional override for template type
+        model: Optional LLM model override (default from settings)
+
+    Yields:
+        Stream events as dictionaries
+    """
+    template = _select_template(template_type or _tier_to_template(score_result.tier))
+    model = model or settings.LLM_MODEL
+    cache_key = f"draft:{lead_key}:{template.template_type}:v{template.version}:{model}"
+
+    cached = cache_get(cache_key)
+    if cached:
+        yield {"type": "token", "text": cached["body"]}
+        yield {"type": "done", "draft": {**cached, "cached": True}}
+        return
+
+    subject, body = template.render(_build_context(template, lead, score_result))
+    draft = EmailDraft(
+        draft_id=new_id("draft"),
+        to=lead.email,
+        subject=subject,
+        body=body,
+        template_type=template.template_type,
+        template_version=template.version
+    )
+
+    chunks = []
+    router = _draft_router(model)
+    if router is not None:
+        try:
+            async for text in router.stream(_personalization_prompt(draft, lead)):
+                chunks.append(text)
+                yield {"type": "token", "text": text}
+        except LLMError:
+            if chunks:
+                raise
+            router = None
+    if router is None:
+        # No LLM available - stream the rendered template word by word
+        for text in _template_chunks(draft.body):
+            chunks.append(text)
+            yield {"type": "token", "text": text}
+
+    # Stream completed - persist the final draft; cache it only if it
+    # is the model's, so a template fallback is never served as one
+    draft.body = "".join(chunks)
+    draft.personalized = router is not None
+    payload = draft_to_dict(draft)
+    _save_draft(lead_key, draft)
+    if draft.personalized:
+        cache_set(cache_key, payload, ttl_seconds=DRAFT_CACHE_TTL_SECONDS)
+
+    yield {"type": "done", "draft": {**payload, "cached": False}}
+
+
+def draft_inputs_from_row(row: LeadRow) -> tuple[LeadInput, ScoreResult]:
     """
-    Generate email subject and body.
+    Rebuild draft inputs from a stored lead row.
 
-    TODO: Replace with LLM-generated content in Week 4.
+    The row doesn't store missing fields, so they are recomputed from
+    the lead (needs_info drafts ask for them).
     """
-    templates = {
-        "nurture": {
-            "subject": f"Helpful resources for {lead.company}",
-            "body": f"""Hi,
+    lead = LeadInput(
+        email=row.email,
+        company=row.company,
+        need=row.need,
+        timeline=row.timeline,
+        budget=row.budget,
+        title=row.title,
+        company_size=row.company_size,
+        industry=row.industry
+    )
+    score_result = ScoreResult(
+        score=row.score,
+        tier=row.tier,
+        segment=row.segment,
+        criteria_scores={},
+        missing_fields=_check_missing_fields(lead),
+        confidence="medium",
+        reasoning=row.notes or ""
+    )
+    return lead, score_result
 
-Thanks for your interest! Based on what you shared about {lead.need or 'your needs'}, I thought you might find our guide helpful.
 
-[RESOURCE_LINK]
+def _draft_router(model: str):
+    """The LLM router for drafts on this model, or None if no provider is configured."""
+    # Deferred: keeps httpx and the LLM client stack out of `import agent`
+    from llm.router import get_llm_router
+    try:
+        return get_llm_router(None if model == settings.LLM_MODEL else {"gemini": model})
+    except LLMError:
+        return None
 
-No pressure to chat now - just wanted to share something useful. Feel free to reach out when the timing is right.
 
-Best,
-[SENDER_NAME]"""
-        },
-        "qualified": {
-            "subject": f"Quick chat about {lead.company}'s needs?",
-            "body": f"""Hi,
+def _template_chunks(body: str) -> Iterable[str]:
+    words = body.split(" ")
+    yield words[0]
+    for word in words[1:]:
+        yield " " + word
 
-Thanks for reaching out about {lead.need or 'your project'}. Based on your timeline of {lead.timeline or 'the near future'}, I'd love to learn more about your goals.
 
-Would any of these times work for a quick 15-minute call?
-- [TIME_SLOT_1]
-- [TIME_SLOT_2]
-- [TIME_SLOT_3]
+def _save_draft(lead_key: str, draft: EmailDraft) -> None:
+    """
+    Persist a completed draft.
 
-Or feel free to grab a time here: [CALENDAR_LINK]
+    TODO: Store in database / Gmail drafts in Week 4.
+    """
+    print(f"[PLACEHOLDER] Would save streamed draft: {draft.draft_id}")
+    print(f"  Lead: {lead_key}, Template: {draft.template_type} v{draft.template_version}")
+
+
+def draft_to_dict(draft: EmailDraft) -> dict:
+    """Serialize a draft for caching, API responses and approval requests."""
+    return {
+        "draft_id": draft.draft_id,
+        "to": draft.to,
+        "subject": draft.subject,
+        "body": draft.body,
+        "template_type": draft.template_type,
+        "template_version": draft.template_version,
+        "personalized": draft.personalized,
+        "created_at": draft.created_at.isoformat(),
+    }
 
-Looking forward to connecting!
 
-Best,
-[SENDER_NAME]"""
-        },
-        "needs_info": {
-            "subject": f"Quick question for {lead.company}",
-            "body": f"""Hi,
+def _personalization_prompt(draft: EmailDraft, lead: LeadInput) -> str:
+    """Build the LLM prompt used to personalize a rendered draft."""
+    return (
+        "Rewrite this sales email so it feels personal to the recipient. "
+        "Keep it short, keep every [PLACEHOLDER] token unchanged, and return only the body.\n\n"
+        f"Company: {lead.company}\n"
+        f"Title: {lead.title or 'unknown'}\n"
+        f"Need: {lead.need or 'unknown'}\n\n"
+        f"Email:\n{draft.body}"
+    )
 
-Thanks for reaching out! To make sure I can point you in the right direction, could you share a bit more about:
 
-{_format_missing_questions(score_result.missing_fields)}
+async def _llm_personalize(prompt: str) -> str:
+    """Send one personalization prompt to the LLM."""
+    # Deferred: keeps httpx and the LLM client stack out of `import agent`
+    from llm.router import get_llm_router
+    response = await get_llm_router().generate(prompt)
+    return response.text.strip()
 
-This will help me understand how we can best help.
 
-Thanks!
-[SENDER_NAME]"""
-        },
+def _tier_to_template(tier: str) -> str:
+    """Map tier to email template type."""
+    mapping = {
+        "reject": "nurture",  # Soft rejection, keep door open
+        "nurture": "nurture",
+        "qualified": "qualified",
+        "needs_info": "needs_info",
     }
+    return mapping.get(tier, "nurture")
+
+
+def _select_template(template_type: str) -> CompiledTemplate:
+    """Get the latest compiled template, falling back to nurture."""
+    registry = get_registry()
+    if template_type not in registry:
+        template_type = "nurture"
+    return registry.get(template_type)
 
-    template = templates.get(template_type, templates["nurture"])
-    return template["subject"], template["body"]
+
+# Field resolvers - only evaluated for fields a template actually uses
+_FIELD_RESOLVERS = {
+    "company": lambda lead, score: lead.company,
+    "need": lambda lead, score: lead.need,
+    "timeline": lambda lead, score: lead.timeline,
+    "budget": lambda lead, score: lead.budget,
+    "title": lambda lead, score: lead.title,
+    "missing_questions": lambda lead, score: _format_missing_questions(score.missing_fields),
+}
+
+
+def _build_context(
+    template: CompiledTemplate,
+    lead: LeadInput,
+    score_result: ScoreResult
+) -> dict:
+    """Build the render context for a template's fields."""
+    return {
+        field: _FIELD_RESOLVERS[field](lead, score_result)
+        for field in template.fields
+        if field in _FIELD_RESOLVERS
+    }
 
 
 def _format_missing_questions(missing_fields: list[str]) -> str:
@@ -0,0 +1,180 @@
+"""
+Email Template Registry
+
+Loads email templates from disk once and compiles them into
+literal/placeholder segments so rendering is a single join.
+
+Template files live in templates/email/ and are named
+``<template_type>.v<version>.txt``. Each file has a header block
+(currently just ``subject:``), a ``---`` separator, then the body.
+
+Placeholders use ``{field}`` or ``{field|default text}``.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+_FILENAME_PATTERN = re.compile(r"^(?P<name>[a-z_]+)\.v(?P<version>\d+)\.txt$")
+_PLACEHOLDER_PATTERN = re.compile(r"\{(?P<field>[a-z_]+)(?:\|(?P<default>[^}]*))?\}")
+
+# A compiled segment is either literal text or a (field, default) pair
+Segment = Union[str, tuple[str, Optional[str]]]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """An email template parsed into render-ready segments."""
+    template_type: str
+    version: int
+    subject: tuple[Segment, ...]
+    body: tuple[Segment, ...]
+    fields: frozenset[str]
+
+    def render(self, context: dict) -> tuple[str, str]:
+        """Render subject and body from a context of field values."""
+        return _render_segments(self.subject, context), _render_segments(self.body, context)
+
+
+def compile_template(template_type: str, version: int, source: str) -> CompiledTemplate:
+    """
+    Compile template source text.
+
+    Args:
+        template_type: Template name (nurture, qualified, needs_info)
+        version: Template version number
+        source: Raw file contents
+
+    Returns:
+        CompiledTemplate ready to render
+
+    Raises:
+        ValueError: If the template is missing a header or subject
+    """
+    header, sep, body = source.partition("\n---\n")
+    if not sep:
+        raise ValueError(f"Template {template_type}.v{version} is missing '---' separator")
+
+    headers = {}
+    for line in header.splitlines():
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    if "subject" not in headers:
+        raise ValueError(f"Template {template_type}.v{version} is missing a subject")
+
+    subject = _compile_segments(headers["subject"])
+    body_segments = _compile_segments(body.rstrip("\n"))
+
+    fields = frozenset(
+        seg[0] for seg in subject + body_segments if isinstance(seg, tuple)
+    )
+
+    return CompiledTemplate(
+        template_type=template_type,
+        version=version,
+        subject=subject,
+        body=body_segments,
+        fields=fields,
+    )
+
+
+class TemplateRegistry:
+    """
+    Versioned registry of compiled email templates.
+
+    Templates are read and compiled once when the registry loads.
+    By default the highest version of each template type is used.
+    """
+
+    def __init__(self, template_dir: Path = TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self._templates: dict[tuple[str, int], CompiledTemplate] = {}
+        self._latest: dict[str, int] = {}
+
+    def load(self) -> "TemplateRegistry":
+        """Load and compile every template file in the directory."""
+        templates = {}
+        latest = {}
+
+        for path in sorted(self.template_dir.glob("*.txt")):
+            match = _FILENAME_PATTERN.match(path.name)
+            if not match:
+                continue
+            name = match.group("name")
+            version = int(match.group("version"))
+            templates[(name, version)] = compile_template(
+                name, version, path.read_text(encoding="utf-8")
+            )
+            latest[name] = max(version, latest.get(name, 0))
+
+        # Swap in one step so readers never see a half-loaded registry
+        self._templates, self._latest = templates, latest
+        return self
+
+    def get(self, template_type: str, version: Optional[int] = None) -> CompiledTemplate:
+        """
+        Get a compiled template.
+
+        Args:
+            template_type: Template name
+            version: Specific version (default: latest)
+
+        Returns:
+            CompiledTemplate
+
+        Raises:
+            KeyError: If the template or version does not exist
+        """
+        if version is None:
+            version = self._latest[template_type]
+        return self._templates[(template_type, version)]
+
+    def versions(self, template_type: str) -> list[int]:
+        """List available versions for a template type."""
+        return sorted(v for (name, v) in self._templates if name == template_type)
+
+    def __contains__(self, template_type: str) -> bool:
+        return template_type in self._latest
+
+
+_registry: Optional[TemplateRegistry] = None
+
+
+def get_registry() -> TemplateRegistry:
+    """Get the shared template registry, loading it on first use."""
+    global _registry
+    if _registry is None:
+        _registry = TemplateRegistry().load()
+    return _registry
+
+
+def _compile_segments(text: str) -> tuple[Segment, ...]:
+    """Split text into literal strings and (field, default) placeholders."""
+    segments: list[Segment] = []
+    pos = 0
+    for match in _PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > pos:
+            segments.append(text[pos:match.start()])
+        segments.append((match.group("field"), match.group("default")))
+        pos = match.end()
+    if pos < len(text):
+        segments.append(text[pos:])
+    return tuple(segments)
+
+
+def _render_segments(segments: tuple[Segment, ...], context: dict) -> str:
+    """Join compiled segments, filling placeholders from context."""
+    parts = []
+    for seg in segments:
+        if isinstance(seg, str):
+            parts.append(seg)
+        else:
+            field, default = seg
+            value = context.get(field)
+            parts.append(str(value) if value else (default or ""))
+    return "".join(parts)
@@ -0,0 +1,443 @@
+"""
+Streaming Lead Import
+
+Loads CSV or NDJSON lead files of any size (cli.py import, POST
+/leads/import) without reading them into memory. Rows flow through
+a staged pipeline:
+
+    parse -> validate -> dedupe -> score -> bulk upsert
+
+Each stage is a task connected to the next by a bounded queue of
+IMPORT_BATCH_SIZE-row batches. When the database falls behind, the
+queues fill up and every upstream stage waits, down to the reader, so
+memory stays at about (stages x IMPORT_QUEUE_BATCHES) batches whatever
+the file size. CPU-bound stages run in a worker thread so an import
+running inside the API doesn't stall other requests.
+
+Checkpointing: after each batch is upserted, the byte offset just past
+its last row is written to a checkpoint file. Batches reach the upsert
+stage in file order, so every row before that offset has been
+committed or rejected. A crashed import restarts from there; rows
+after the checkpoint may be upserted again, which is harmless because
+the upsert is keyed on lead_key.
+
+Scoring takes a "bulk" lane slot from the lead scheduler per batch, so
+an import never holds capacity that inbound leads are waiting for (see
+scheduler.py).
+
+Imports only qualify and store leads. They don't create tasks or
+draft emails - those stay per-lead actions behind the approval gates.
+"""
+
+import asyncio
+import csv
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional
+
+from pydantic import ValidationError
+
+import metrics
+from config import settings
+from db.postgres import upsert_leads
+from guardrails.validators import sanitize_input, validate_lead_input
+from models import LeadInput
+from records import LeadRecord, LeadRowRecord
+from scoring_config import current_scoring_config
+from serialization import dumps, loads
+from tools.dedupe import get_dedupe_index, lead_features, minhash
+from tools.score_lead import score_lead_record
+from events import get_event_feed
+from scheduler import get_lead_scheduler
+from tools.upsert_lead import invalidate_lead_cache, lead_event_data
+
+
+FORMATS = ("csv", "ndjson")
+
+READ_CHUNK_BYTES = 1 << 20
+# A longer "row" means a broken file (e.g. an unterminated CSV quote)
+MAX_ROW_BYTES = 1 << 20
+# Rejected rows are counted; only the first few are reported
+MAX_REPORTED_ERRORS = 20
+
+_TEXT_FIELDS = ("email", "company", "need", "timeline", "budget", "title", "industry")
+_IMPORT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ImportFormatError(ValueError):
+    """The input cannot be read as the given format."""
+
+
+@dataclass
+class ImportStats:
+    """Running totals of an import (cumulative across resumes)."""
+    rows: int = 0
+    imported: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    offset: int = 0
+    completed: bool = False
+    errors: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ImportCheckpoint:
+    """Committed offset and stats of one import, kept in a small JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @classmethod
+    def for_import(cls, import_id: str) -> "ImportCheckpoint":
+        """Checkpoint for an uploaded import, under IMPORT_CHECKPOINT_DIR."""
+        if not _IMPORT_ID_PATTERN.match(import_id):
+            raise ValueError("import_id may only contain letters, digits, '_' and '-'")
+        return cls(os.path.join(settings.IMPORT_CHECKPOINT_DIR, f"{import_id}.json"))
+
+    def load(self) -> ImportStats:
+        try:
+            with open(self.path, "rb") as f:
+                return ImportStats(**loads(f.read()))
+        except FileNotFoundError:
+            return ImportStats()
+
+    def save(self, stats: ImportStats) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(dumps(stats.to_dict()))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+@dataclass
+class _Batch:
+    """
+    Rows moving between stages, and the file offset just past the last one.
+
+    Per-batch counts are only added to ImportStats once the batch is
+    committed, so a checkpoint never counts rows past its offset.
+    """
+    items: list
+    end_offset: int
+    rows: int = 0
+    duplicates: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    def reject(self, offset: int, message: str) -> None:
+        self.errors.append(f"row at byte {offset}: {message}")
+
+    def replace(self, items: list) -> "_Batch":
+        self.items = items
+        return self
+
+    def commit_to(self, stats: ImportStats, imported: int) -> None:
+        stats.rows += self.rows
+        stats.imported += imported
+        stats.invalid += len(self.errors)
+        stats.duplicates += self.duplicates
+        stats.errors.extend(self.errors[:max(0, MAX_REPORTED_ERRORS - len(stats.errors))])
+        stats.offset = self.end_offset
+
+
+_DONE = None
+
+
+def detect_format(name: Optional[str] = None, content_type: Optional[str] = None) -> str:
+    """Pick csv or ndjson from a file name or Content-Type."""
+    hint = (content_type or "").lower()
+    if "csv" in hint:
+        return "csv"
+    if "ndjson" in hint or "jsonl" in hint or "json-seq" in hint:
+        return "ndjson"
+    if name:
+        ext = os.path.splitext(name)[1].lower()
+        if ext == ".csv":
+            return "csv"
+        if ext in (".ndjson", ".jsonl"):
+            return "ndjson"
+    raise ImportFormatError("Cannot tell the format; pass csv or ndjson explicitly")
+
+
+async def import_file(
+    path: str,
+    fmt: Optional[str] = None,
+    checkpoint: Optional[ImportCheckpoint] = None,
+    restart: bool = False,
+    on_progress: Optional[Callable[[ImportStats], None]] = None
+) -> ImportStats:
+    """
+    Import a lead file, resuming from its checkpoint.
+
+    Args:
+        path: CSV or NDJSON file
+        fmt: "csv" or "ndjson" (default: from the file extension)
+        checkpoint: Where progress is recorded (default: <path>.checkpoint)
+        restart: Ignore an existing checkpoint and start over
+        on_progress: Called with the running stats after each committed batch
+
+    Returns:
+        Final ImportStats
+    """
+    fmt = fmt or detect_format(name=path)
+    checkpoint = checkpoint or ImportCheckpoint(f"{path}.checkpoint")
+    if restart:
+        checkpoint.clear()
+    stats = checkpoint.load()
+    if stats.completed:
+        return stats
+
+    header = None
+    if fmt == "csv":
+        # The header is read from the start; data rows from the checkpoint
+        with open(path, "rb") as f:
+            first = f.readline()
+        header = _parse_header(first)
+        stats.offset = max(stats.offset, len(first))
+
+    async def chunks() -> AsyncIterator[bytes]:
+        with open(path, "rb") as f:
+            f.seek(stats.offset)
+            while chunk := await asyncio.to_thread(f.read, READ_CHUNK_BYTES):
+                yield chunk
+
+    return await _run(_rows(chunks(), stats.offset, fmt), fmt, header, stats.offset, stats, checkpoint, on_progress)
+
+
+async def import_stream(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    checkpoint: Optional[ImportCheckpoint] = None,
+    on_progress: Optional[Callable[[ImportStats], None]] = None
+) -> ImportStats:
+    """
+    Import an uploaded lead file as it arrives.
+
+    A stream can't seek, so a resumed upload sends the whole file
+    again; rows before the checkpoint are split off but not parsed.
+
+    Args:
+        chunks: The body, from byte 0 (e.g. Request.stream())
+        fmt: "csv" or "ndjson"
+        checkpoint: Progress record, to make the upload resumable
+        on_progress: Called with the running stats after each committed batch
+
+    Returns:
+        Final ImportStats
+    """
+    stats = checkpoint.load() if checkpoint else ImportStats()
+    if stats.completed:
+        return stats
+    return await _run(_rows(chunks, 0, fmt), fmt, None, stats.offset, stats, checkpoint, on_progress)
+
+
+async def _run(
+    rows: AsyncIterator[tuple[int, bytes]],
+    fmt: str,
+    header: Optional[list[str]],
+    skip_until: int,
+    stats: ImportStats,
+    checkpoint: Optional[ImportCheckpoint],
+    on_progress: Optional[Callable[[ImportStats], None]]
+) -> ImportStats:
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Unknown import format {fmt!r} (expected one of {FORMATS})")
+
+    from agent import LeadAgent
+    agent = LeadAgent()  # lead keys are generated exactly as for POST /lead
+    batch_size = settings.IMPORT_BATCH_SIZE
+    queues = [asyncio.Queue(maxsize=settings.IMPORT_QUEUE_BATCHES) for _ in range(4)]
+    parsed, valid, unique, scored = queues
+
+    async def parse():
+        nonlocal header
+        batch = _Batch([], skip_until)
+        async for end_offset, raw in rows:
+            if header is None and fmt == "csv":
+                header = _parse_header(raw)
+                continue
+            if end_offset <= skip_until:
+                continue
+            batch.end_offset = end_offset
+            batch.rows += 1
+            try:
+                batch.items.append((end_offset, _parse_row(raw, fmt, header)))
+            except ImportFormatError as e:
+                batch.reject(end_offset, str(e))
+            if batch.rows >= batch_size:
+                await parsed.put(batch)
+                batch = _Batch([], end_offset)
+        if batch.rows:
+            await parsed.put(batch)
+        await parsed.put(_DONE)
+
+    def validate(batch: _Batch) -> _Batch:
+        leads = []
+        for offset, data in batch.items:
+            lead = _validate_row(data, offset, batch)
+            if lead is not None:
+                leads.append(lead)
+        return batch.replace(leads)
+
+    def dedupe(batch: _Batch) -> _Batch:
+        if not settings.DEDUP_ENABLED:
+            return batch.replace([(agent._generate_lead_key(lead.email), lead) for lead in batch.items])
+        index = get_dedupe_index()
+        keyed = []
+        for lead in batch.items:
+            lead_key = agent._generate_lead_key(lead.email)
+            signature = minhash(lead_features(lead))
+            match = index.find(signature)
+            # A match on its own key is this row, indexed before a crash
+            if match is not None and match.lead_key != lead_key:
+                batch.duplicates += 1
+                continue
+            index.add(lead_key, signature)
+            keyed.append((lead_key, lead))
+        return batch.replace(keyed)
+
+    def score(batch: _Batch) -> _Batch:
+        now = datetime.utcnow()
+        # One config snapshot per batch, so a batch is never split across versions
+        rules = current_scoring_config()
+        rows_by_key = {
+            lead_key: LeadRowRecord.build(lead_key, lead, score_lead_record(lead, rules), now, rules.version)
+            for lead_key, lead in batch.items
+        }
+        # One upsert statement can't touch the same key twice; last row wins
+        return batch.replace(list(rows_by_key.values()))
+
+    async def upsert():
+        while (batch := await scored.get()) is not _DONE:
+            imported = await upsert_leads(batch.items)
+            await asyncio.to_thread(_after_upsert, batch.items)
+            batch.commit_to(stats, imported)
+            metrics.increment("import.rows", batch.rows)
+            metrics.increment("import.imported", imported)
+            if checkpoint:
+                checkpoint.save(stats)
+            if on_progress:
+                on_progress(stats)
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(parse())
+            group.create_task(_stage(validate, parsed, valid))
+            group.create_task(_stage(dedupe, valid, unique))
+            group.create_task(_stage(score, unique, scored, lane="bulk"))
+            group.create_task(upsert())
+    except ExceptionGroup as e:
+        # One stage failed and the rest were cancelled; surface its error
+        raise e.exceptions[0]
+
+    stats.completed = True
+    if checkpoint:
+        checkpoint.save(stats)
+    return stats
+
+
+def _after_upsert(rows: list[LeadRowRecord]) -> None:
+    """Drop cached copies and announce the batch on the change feed."""
+    invalidate_lead_cache([row.lead_key for row in rows])
+    get_event_feed().publish_many([("lead.upserted", row.lead_key, lead_event_data(row)) for row in rows])
+
+
+async def _stage(
+    fn: Callable[[_Batch], _Batch],
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    lane: Optional[str] = None
+) -> None:
+    """Apply a CPU-bound batch function off the event loop, preserving order."""
+    while (batch := await inbox.get()) is not _DONE:
+        if lane is None:
+            await outbox.put(await asyncio.to_thread(fn, batch))
+            continue
+        async with get_lead_scheduler().slot(lane):
+            done = await asyncio.to_thread(fn, batch)
+        await outbox.put(done)
+    await outbox.put(_DONE)
+
+
+async def _rows(chunks: AsyncIterator[bytes], start: int, fmt: str) -> AsyncIterator[tuple[int, bytes]]:
+    """
+    Split a byte stream into rows, yielding (offset after the row, row).
+
+    An NDJSON row is exactly one line (JSON escapes newlines, but a
+    string may hold an escaped quote, so quotes are not counted). A CSV
+    row is one line unless it ends inside a quoted field, which may
+    contain newlines: the row continues while it holds an odd number of
+    quote characters. An escaped quote ("") adds two, so it never
+    opens or closes a field.
+    """
+    quoted = fmt == "csv"
+    buffer = b""
+    offset = start
+    async for chunk in chunks:
+        buffer += chunk
+        pos = 0
+        search = 0
+        while (newline := buffer.find(b"\n", search)) != -1:
+            row = buffer[pos:newline + 1]
+            if quoted and row.count(b'"') % 2:
+                search = newline + 1  # inside a quoted field
+                continue
+            offset += len(row)
+            pos = search = newline + 1
+            if row.strip():
+                yield offset, row
+        buffer = buffer[pos:]
+        if len(buffer) > MAX_ROW_BYTES:
+            raise ImportFormatError(f"Row at byte {offset} is longer than {MAX_ROW_BYTES} bytes")
+    if buffer.strip():
+        yield offset + len(buffer), buffer
+
+
+def _parse_header(raw: bytes) -> list[str]:
+    header = next(csv.reader([raw.decode("utf-8-sig")]), [])
+    columns = [name.strip().lower() for name in header]
+    if "email" not in columns:
+        raise ImportFormatError("CSV header has no email column")
+    return columns
+
+
+def _parse_row(raw: bytes, fmt: str, header: Optional[list[str]]) -> dict:
+    try:
+        if fmt == "ndjson":
+            data = loads(raw)
+            if not isinstance(data, dict):
+                raise ImportFormatError("NDJSON row is not an object")
+            return data
+        values = next(csv.reader(raw.decode("utf-8").splitlines(keepends=True)), [])
+    except (ValueError, csv.Error) as e:
+        if isinstance(e, ImportFormatError):
+            raise
+        raise ImportFormatError(f"Unparseable row ({e})") from None
+    return {name: value for name, value in zip(header, values) if value != ""}
+
+
+def _validate_row(data: dict, offset: int, batch: _Batch) -> Optional[LeadRecord]:
+    """Sanitize and validate one row as POST /lead would; None if rejected."""
+    for name in _TEXT_FIELDS:
+        value = data.get(name)
+        if isinstance(value, str):
+            data[name] = sanitize_input(value) or None
+    try:
+        lead = LeadInput.model_validate(data)
+    except ValidationError as e:
+        first = e.errors()[0]
+        batch.reject(offset, f"{'.'.join(str(p) for p in first['loc'])}: {first['msg']}")
+        return None
+
+    check = validate_lead_input(lead)
+    if not check.valid:
+        batch.reject(offset, "; ".join(check.errors))
+        return None
+    return LeadRecord.from_input(lead)
@@ -0,0 +1,169 @@
+"""
+Incremental Re-Qualification
+
+Re-tiers stored leads after SCORING_WEIGHTS, SCORE_THRESHOLDS or
+SEGMENT_THRESHOLDS change, touching only leads whose outcome can change
+and never calling the LLM.
+
+Every lead stores its per-criterion scores (crit_* columns) and the
+config version it was scored under. For the leads of one old version:
+
+- A weight change moves a lead's exact weighted score by at most
+  sum(|delta weight|) points, since each criterion score is 0-100 and
+  the weighted sum is divided by 100. One more point is allowed for
+  rounding. A lead with stored score s can change tier only
+  if some score within that band of s maps to a different tier under
+  the new thresholds than s does under the old ones. Scores are
+  integers 0-100, so the candidate score ranges are found by checking
+  every score. They are fetched with range scans on idx_leads_score.
+- A segment change affects only company sizes whose segment differs
+  between the old and new SEGMENT_THRESHOLDS.
+
+Candidates get score, tier and segment recomputed from their criteria
+columns in a single UPDATE per old version, and move to the new
+version. All other leads keep their old version, since their score is
+still the one computed under it. A later change is then bounded
+against that version's rules, which is why each version's rules are
+recorded in config_snapshots.
+
+This assumes a stored score is the weighted sum of its criteria
+(always true for rule-based scores; what the LLM is told to produce).
+Leads without criteria columns - placeholder or pre-migration rows -
+need a full re-score.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from db.postgres import (
+    count_leads_by_config_version,
+    fetch_config_snapshot,
+    record_config_snapshot,
+    requalify_leads,
+)
+from scoring_config import ScoringConfig, current_scoring_config
+from events import get_event_feed
+from tools.upsert_lead import invalidate_lead_cache
+
+
+MAX_SCORE = 100
+
+
+@dataclass
+class RequalifyPlan:
+    """Which leads of one old config version need recomputing."""
+    from_version: str
+    to_version: str
+    score_ranges: list[tuple[int, int]]
+    size_ranges: list[tuple[int, Optional[int]]]
+    leads: int = 0
+    recomputed: int = 0
+
+
+def score_band(old: ScoringConfig, new: ScoringConfig) -> int:
+    """Maximum change in a stored score caused by the weight change."""
+    names = set(old.weights) | set(new.weights)
+    delta = sum(abs(new.weights.get(n, 0) - old.weights.get(n, 0)) for n in names)
+    # Weighted sum is /100 of criteria in 0-100, so delta points;
+    # +1 for truncation to int on both sides
+    return (delta + 1) if delta else 0
+
+
+def affected_score_ranges(old: ScoringConfig, new: ScoringConfig) -> list[tuple[int, int]]:
+    """Stored scores whose tier may differ under the new config."""
+    band = score_band(old, new)
+    new_tiers = [new.tier_for(s) for s in range(MAX_SCORE + 1)]
+    candidates = [
+        s for s in range(MAX_SCORE + 1)
+        if any(t != old.tier_for(s) for t in new_tiers[max(0, s - band):min(MAX_SCORE, s + band) + 1])
+    ]
+    return _to_ranges(candidates)
+
+
+def affected_size_ranges(old: ScoringConfig, new: ScoringConfig) -> list[tuple[int, Optional[int]]]:
+    """company_size ranges whose segment differs under the new config."""
+    bounds = sorted({0} | {int(low) for low, _ in old.segment_thresholds.values()}
+                    | {int(low) for low, _ in new.segment_thresholds.values()})
+    ranges = []
+    # Segments are constant between consecutive lower bounds
+    for i, low in enumerate(bounds):
+        high = bounds[i + 1] - 1 if i + 1 < len(bounds) else None
+        if old.segment_for(low) != new.segment_for(low):
+            if ranges and ranges[-1][1] is not None and ranges[-1][1] + 1 == low:
+                ranges[-1] = (ranges[-1][0], high)
+            else:
+                ranges.append((low, high))
+    return ranges
+
+
+def plan_requalification(old: ScoringConfig, new: ScoringConfig) -> RequalifyPlan:
+    """Candidate ranges for moving leads from old to new."""
+    return RequalifyPlan(
+        from_version=old.version,
+        to_version=new.version,
+        score_ranges=affected_score_ranges(old, new),
+        size_ranges=affected_size_ranges(old, new),
+    )
+
+
+async def requalify(new: Optional[ScoringConfig] = None, dry_run: bool = False) -> list[RequalifyPlan]:
+    """
+    Bring stored leads up to date with the scoring rules.
+
+    Args:
+        new: Target rules (default: the current config snapshot)
+        dry_run: Only count candidate rows
+
+    Returns:
+        One RequalifyPlan per old config version found on leads
+    """
+    new = new or current_scoring_config()
+    await record_config_snapshot(new.version, new.to_dict())
+
+    plans = []
+    for version, leads in (await count_leads_by_config_version()).items():
+        if version == new.version:
+            continue
+        rules = await fetch_config_snapshot(version)
+        if rules is None:
+            # Unknown rules - can't bound the change, so recheck every score
+            plan = RequalifyPlan(version, new.version, [(0, MAX_SCORE)], [(0, None)])
+        else:
+            plan = plan_requalification(ScoringConfig.from_dict(rules), new)
+            # Snapshots recorded before a rule was added re-hash differently;
+            # the leads carry the stored version
+            plan.from_version = version
+        plan.leads = leads
+        plan.recomputed, changed = await requalify_leads(
+            plan.from_version,
+            plan.to_version,
+            plan.score_ranges,
+            plan.size_ranges,
+            new.weights,
+            _bounds(new.score_thresholds),
+            _bounds(new.segment_thresholds),
+            dry_run=dry_run,
+        )
+        # Only score/tier/segment are served by GET /lead; a version-only
+        # move leaves cached rows valid
+        invalidate_lead_cache(changed)
+        get_event_feed().publish_many([
+            ("lead.requalified", lead_key, {"from_version": plan.from_version, "to_version": plan.to_version})
+            for lead_key in changed
+        ])
+        plans.append(plan)
+    return plans
+
+
+def _bounds(ranges: dict) -> list[tuple[int, str]]:
+    return sorted((int(low), name) for name, (low, _) in ranges.items())
+
+
+def _to_ranges(values: list[int]) -> list[tuple[int, int]]:
+    ranges = []
+    for v in values:
+        if ranges and ranges[-1][1] + 1 == v:
+            ranges[-1] = (ranges[-1][0], v)
+        else:
+            ranges.append((v, v))
+    return ranges
@@ -5,11 +5,22 @@ Scores a lead using LLM-based evaluation against defined criteria.
 Students implement this in Week 3.
 """
 
-from typing import Optional
-import json
-import google.generativeai as genai
+from typing import TYPE_CHECKING, Optional, Union
 from models import LeadInput, ScoreResult
+from records import LeadRecord, ScoreRecord
+from scoring_config import ScoringConfig, current_scoring_config
+from serialization import dumps_str
 from config import settings, SCORING_WEIGHTS, REQUIRED_FIELDS
+import metrics
+from llm.errors import LLMError
+from llm.tokens import count_tokens, is_estimate, tokenizer_name
+from llm.structured import SCORE_OUTPUT_OPTIONS, parse_score_result
+from guardrails.rate_limit import RateLimitExceeded
+
+# The LLM client stack (httpx) is imported on first LLM call, so
+# rule-based scoring and health checks don't pay for it
+if TYPE_CHECKING:
+    from llm.router import LLMRouter
 
 
 # System prompt for lead scoring
@@ -63,6 +74,26 @@ Always respond with valid JSON:
 }"""
 
 
+# Token-minimized variant of SCORING_SYSTEM_PROMPT: same rules, no
+# markdown tables, and a one-line output spec (the schema itself is
+# enforced by SCORE_OUTPUT_OPTIONS). Well under half the tokens.
+SCORING_SYSTEM_PROMPT_COMPACT = """Qualify a B2B lead. Score each criterion 0-100; missing optional data = 50.
+Criteria (weight): industry_fit 20 target vertical; budget 20 meets minimum; authority 15 decision-maker/influencer; need 20 clear problem; timeline 15 urgency; company_size 10 SMB 10-200, enterprise 200+.
+score = weighted average. Tiers: 0-39 reject, 40-69 nurture, 70-100 qualified. Required: email, company, need, timeline; if any missing, tier = needs_info.
+Reply JSON only: score, tier, segment (smb|enterprise), criteria_scores {industry_fit, budget, authority, need, timeline, company_size}, missing_fields [], confidence (low|medium|high), reasoning (one sentence)."""
+
+
+SCORING_PROMPTS = {
+    "full": SCORING_SYSTEM_PROMPT,
+    "compact": SCORING_SYSTEM_PROMPT_COMPACT,
+}
+
+# Rule-based authority/timeline signals (also used by scheduler.lead_lane
+# to pick out high-value leads before scoring)
+EXECUTIVE_TITLES = ("ceo", "cto", "cfo", "owner", "founder")
+URGENT_TIMELINES = ("immediate", "asap", "urgent", "this month")
+
+
 def score_lead(lead: LeadInput) -> ScoreResult:
     """
     Score a lead 0-100 with tier classification.
@@ -76,10 +107,37 @@ def score_lead(lead: LeadInput) -> ScoreResult:
     Returns:
         ScoreResult with score, tier, segment, and reasoning
     """
+    # TODO: Implement LLM scoring in Week 3
+    # For now, return placeholder (or use score_lead_with_llm)
+    # import google.generativeai as genai  # keep SDK imports local - slow to import
+    # genai.configure(api_key=settings.GEMINI_API_KEY)
+    # model = genai.GenerativeModel(settings.LLM_MODEL)
+    # response = model.generate_content(...)
+
+    return score_lead_record(lead).to_result()
+
+
+def score_lead_record(
+    lead: Union[LeadRecord, LeadInput], rules: Optional[ScoringConfig] = None
+) -> ScoreRecord:
+    """
+    Rule-based scoring without building pydantic objects.
+
+    Used by the agent pipeline and bulk re-scoring, where per-lead
+    model construction and dumps dominate; convert the result with
+    ScoreRecord.to_result() only when it leaves the pipeline.
+
+    Args:
+        lead: The lead data to score
+        rules: Config snapshot to score under (default: current)
+
+    Returns:
+        ScoreRecord with score, tier, segment, and reasoning
+    """
     # Check for missing required fields first
     missing_fields = _check_missing_fields(lead)
     if missing_fields:
-        return ScoreResult(
+        return ScoreRecord(
             score=0,
             tier="needs_info",
             segment="smb",
@@ -88,32 +146,143 @@ def score_lead(lead: LeadInput) -> ScoreResult:
             confidence="high",
             reasoning=f"Missing required fields: {', '.join(missing_fields)}"
         )
+    return _rule_based_score(lead, rules)
 
-    # TODO: Implement LLM scoring in Week 3
-    # For now, return placeholder
-    # genai.configure(api_key=settings.GEMINI_API_KEY)
-    # model = genai.GenerativeModel(settings.LLM_MODEL)
-    # response = model.generate_content(...)
 
-    return _placeholder_score(lead)
+async def score_lead_with_llm(
+    lead: LeadInput,
+    router: Optional["LLMRouter"] = None,
+    prompt_variant: Optional[str] = None,
+    rules: Optional[ScoringConfig] = None
+) -> ScoreResult:
+    """
+    Score a lead with the LLM, falling back to rule-based scoring.
+
+    Providers are asked for schema-constrained JSON and the reply is
+    validated directly into ScoreResult; malformed replies are repaired
+    locally rather than re-requested (see llm/structured.py).
 
+    Calls go through the provider router, which picks the fastest
+    healthy provider and fails over between them; each provider client
+    retries, hedges and circuit-breaks on its own. If every provider is
+    degraded (breakers open, retries exhausted, governor queue timeout)
+    or the reply cannot be parsed, the lead is scored with
+    _placeholder_score instead of failing.
 
-def _check_missing_fields(lead: LeadInput) -> list[str]:
+    The system prompt is the static prefix of every call, so providers
+    cache it when it is long enough (see llm/providers.py); the compact
+    variant shrinks it instead.
+
+    Args:
+        lead: The lead data to score
+        router: Optional router override (e.g. over mock providers)
+        prompt_variant: Key in SCORING_PROMPTS (default: the config snapshot's variant)
+        rules: Config snapshot to score under (default: current)
+
+    Returns:
+        ScoreResult with score, tier, segment, and reasoning
+    """
+    rules = rules or current_scoring_config()
+    missing_fields = _check_missing_fields(lead)
+    if missing_fields:
+        return score_lead_record(lead, rules).to_result()
+
+    variant = prompt_variant or rules.prompt_variant
+    system = scoring_system_prompt(variant, rules)
+    try:
+        if router is None:
+            from llm.router import get_llm_router
+            router = get_llm_router()
+        response = await router.generate(
+            _build_scoring_prompt(lead),
+            system=system,
+            options=SCORE_OUTPUT_OPTIONS
+        )
+        metrics.observe("score_lead.input_tokens", response.input_tokens, variant=variant)
+        metrics.observe("score_lead.cached_tokens", response.cached_tokens, variant=variant)
+        return parse_score_result(response)
+    except (LLMError, RateLimitExceeded, ValueError) as e:
+        metrics.increment("score_lead.fallback", reason=type(e).__name__)
+        print(f"[FALLBACK] LLM scoring unavailable ({e}), using rule-based score")
+        return _rule_based_score(lead, rules).to_result()
+
+
+def scoring_system_prompt(variant: str, rules: Optional[ScoringConfig] = None) -> str:
+    """
+    Look up a scoring system prompt variant.
+
+    Prompts in the runtime config snapshot override SCORING_PROMPTS.
+
+    Raises:
+        ValueError: If the variant is unknown
+    """
+    prompts = (rules or current_scoring_config()).prompts
+    if variant in prompts:
+        return prompts[variant]
+    try:
+        return SCORING_PROMPTS[variant]
+    except KeyError:
+        raise ValueError(
+            f"Unknown scoring prompt variant {variant!r} "
+            f"(expected one of {sorted(set(SCORING_PROMPTS) | set(prompts))})"
+        ) from None
+
+
+def prompt_size_report(lead: Optional[LeadInput] = None) -> dict:
+    """
+    Size of each scoring prompt variant, in characters and tokens.
+
+    Args:
+        lead: Optional sample lead; adds the per-lead user prompt size
+
+    Returns:
+        Dict with the tokenizer used, whether its counts are regex
+        estimates, and per-variant sizes, including whether the system
+        prefix meets each provider's cache minimum
+    """
+    from llm.providers import GeminiProvider, AnthropicProvider
+
+    report = {"tokenizer": tokenizer_name(), "estimated": is_estimate(), "variants": {}}
+    for variant, system in SCORING_PROMPTS.items():
+        tokens = count_tokens(system)
+        report["variants"][variant] = {
+            "chars": len(system),
+            "system_tokens": tokens,
+            "cacheable": {
+                "gemini": tokens >= GeminiProvider.MIN_CACHE_TOKENS,
+                "anthropic": tokens >= AnthropicProvider.MIN_CACHE_TOKENS,
+            },
+        }
+    if lead is not None:
+        report["lead_prompt_tokens"] = count_tokens(_build_scoring_prompt(lead))
+    return report
+
+
+def _build_scoring_prompt(lead: Union[LeadRecord, LeadInput]) -> str:
+    """Render the per-lead user prompt."""
+    if isinstance(lead, LeadInput):
+        lead = LeadRecord.from_input(lead)
+    return "Score this lead:\n" + dumps_str(lead.present_fields())
+
+
+def _check_missing_fields(lead: Union[LeadRecord, LeadInput]) -> list[str]:
     """Check for missing required fields."""
-    missing = []
-    lead_dict = lead.model_dump()
-    for field in REQUIRED_FIELDS:
-        if not lead_dict.get(field):
-            missing.append(field)
-    return missing
+    return [field for field in REQUIRED_FIELDS if not getattr(lead, field, None)]
 
 
-def _placeholder_score(lead: LeadInput) -> ScoreResult:
+def _placeholder_score(lead: Union[LeadRecord, LeadInput]) -> ScoreResult:
     """
     Placeholder scoring logic.
 
     Replace this with LLM-based scoring in Week 3.
     """
+    return _rule_based_score(lead).to_result()
+
+
+def _rule_based_score(
+    lead: Union[LeadRecord, LeadInput], rules: Optional[ScoringConfig] = None
+) -> ScoreRecord:
+    """Heuristic criteria scores (the placeholder until LLM scoring)."""
     # Simple heuristic scoring
     score = 50
 
@@ -133,7 +302,7 @@ def _placeholder_score(lead: LeadInput) -> ScoreResult:
 
     if lead.title:
         title_lower = lead.title.lower()
-        if any(t in title_lower for t in ["ceo", "cto", "cfo", "owner", "founder"]):
+        if any(t in title_lower for t in EXECUTIVE_TITLES):
             criteria_scores["authority"] = 90
         elif any(t in title_lower for t in ["vp", "director", "head"]):
             criteria_scores["authority"] = 75
@@ -145,7 +314,7 @@ def _placeholder_score(lead: LeadInput) -> ScoreResult:
 
     if lead.timeline:
         timeline_lower = lead.timeline.lower()
-        if any(t in timeline_lower for t in ["immediate", "asap", "urgent", "this month"]):
+        if any(t in timeline_lower for t in URGENT_TIMELINES):
             criteria_scores["timeline"] = 90
         elif any(t in timeline_lower for t in ["q1", "q2", "next quarter"]):
             criteria_scores["timeline"] = 70
@@ -156,25 +325,14 @@ def _placeholder_score(lead: LeadInput) -> ScoreResult:
         elif lead.company_size > 50:
             criteria_scores["company_size"] = 70
 
-    # Calculate weighted score
-    total_score = sum(
-        criteria_scores[k] * (SCORING_WEIGHTS[k] / 100)
-        for k in SCORING_WEIGHTS.keys()
-    )
-
-    # Determine tier
-    if total_score < 40:
-        tier = "reject"
-    elif total_score < 70:
-        tier = "nurture"
-    else:
-        tier = "qualified"
-
-    # Determine segment
-    segment = "enterprise" if lead.company_size and lead.company_size > 200 else "smb"
+    # Weighted score, tier and segment under the given (or current) rules
+    rules = rules or current_scoring_config()
+    total_score = rules.weighted_score(criteria_scores)
+    tier = rules.tier_for(total_score)
+    segment = rules.segment_for(lead.company_size)
 
-    return ScoreResult(
-        score=int(total_score),
+    return ScoreRecord(
+        score=total_score,
         tier=tier,
         segment=segment,
         criteria_scores=criteria_scores,
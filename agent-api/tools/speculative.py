@@ -0,0 +1,185 @@
+"""
+Speculative Act Phase
+
+Leads that need human approval (reject decisions, enterprise
+scheduling) used to do all of their act-phase work only after the
+approver clicked: build the lead row, pick the follow-up task, render
+the email draft, then write. None of that depends on the decision, so
+it now runs while the lead is processed and is stored with the
+pending approval request (approvals.prepared), so any worker can
+carry it out:
+
+    request time   prepare_action()  - lead row, task, draft (no writes)
+    approval       execute_approved_action() - one DB statement
+                   (commit_approved_action: decision, lead row, task
+                   and draft), then cache invalidation, lead.upserted
+                   event and sweeper scheduling
+
+Rejecting an approval simply drops the prepared work. Requests without
+prepared work (e.g. created before this change) are rebuilt from the
+approval context at approval time.
+
+Approval-to-action latency is recorded as approval.action_ms
+{path=prepared|rerun}; the time spent preparing, off the approver's
+path, as approval.prepare_ms. See bench/approval_latency.py: nearly
+all of the gain comes from the single write. With placeholder scoring,
+rebuilding the work at approval time costs well under a millisecond,
+so preparing it ahead saves little on its own.
+"""
+
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Optional
+
+import metrics
+from db.postgres import commit_approved_action
+from events import publish_event
+from records import LeadRecord, LeadRowRecord, ScoreRecord
+from scoring_config import ScoringConfig, current_scoring_config
+from tools.create_task import build_task
+from tools.draft_email import draft_to_dict, render_draft
+from tools.task_sweeper import get_sweeper
+from tools.upsert_lead import invalidate_lead_cache, lead_event_data
+
+# Act-phase tools that have a prepared form
+PREPARED_TOOLS = ("upsert_lead_row", "create_followup_task", "draft_email")
+
+
+@dataclass(slots=True)
+class PreparedAction:
+    """Act-phase work for one lead, computed ahead of its approval."""
+    lead_row: Optional[LeadRowRecord] = None
+    task: Optional[dict] = None   # insert_task fields; due_date relative to prepared_at
+    draft: Optional[dict] = None  # see draft_to_dict
+    prepared_at: datetime = field(default_factory=datetime.utcnow)
+    prepare_ms: float = 0.0
+
+    @property
+    def actions(self) -> list[str]:
+        """Tools this work stands in for, in act-phase order."""
+        done = (self.lead_row, self.task, self.draft)
+        return [tool for tool, part in zip(PREPARED_TOOLS, done) if part is not None]
+
+    def to_dict(self) -> dict:
+        """JSON-ready form, stored in approvals.prepared."""
+        return {
+            "lead_row": asdict(self.lead_row) if self.lead_row is not None else None,
+            "task": self.task,
+            "draft": self.draft,
+            "prepared_at": self.prepared_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PreparedAction":
+        """Inverse of to_dict, for work read back from approvals.prepared."""
+        lead_row = data.get("lead_row")
+        if lead_row is not None:
+            lead_row = LeadRowRecord(**{
+                **lead_row,
+                "created_at": _parse_datetime(lead_row.get("created_at")),
+                "updated_at": _parse_datetime(lead_row.get("updated_at")),
+            })
+        task = data.get("task")
+        if task is not None:
+            task = {**task, "due_date": _parse_datetime(task["due_date"])}
+        return cls(
+            lead_row=lead_row,
+            task=task,
+            draft=data.get("draft"),
+            prepared_at=_parse_datetime(data["prepared_at"]),
+        )
+
+
+def prepare_action(
+    lead_key: str,
+    lead: LeadRecord,
+    score: ScoreRecord,
+    rules: Optional[ScoringConfig] = None,
+    tools: tuple[str, ...] = PREPARED_TOOLS
+) -> PreparedAction:
+    """
+    Do the side-effect-free part of the act phase for a lead.
+
+    Args:
+        lead_key: The lead's key
+        lead: The incoming lead
+        score: Its score
+        rules: Config snapshot the lead was scored under (default: current)
+        tools: Act-phase tools the agent would run (see PREPARED_TOOLS)
+
+    Returns:
+        PreparedAction to store with the approval request
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    prepared = PreparedAction(prepared_at=now)
+    if "upsert_lead_row" in tools:
+        prepared.lead_row = LeadRowRecord.build(
+            lead_key, lead, score, now, (rules or current_scoring_config()).version
+        )
+    if "create_followup_task" in tools:
+        prepared.task = build_task(lead_key, score)
+    if "draft_email" in tools:
+        prepared.draft = draft_to_dict(render_draft(lead, score))
+    prepared.prepare_ms = (time.perf_counter() - started) * 1000
+    metrics.observe("approval.prepare_ms", prepared.prepare_ms)
+    return prepared
+
+
+async def execute_approved_action(request, notes: Optional[str] = None) -> bool:
+    """
+    Carry out an approved action.
+
+    Commits the request's prepared work, or rebuilds it from the request
+    context if there is none.
+
+    Args:
+        request: The approved guardrails.approval.ApprovalRequest
+        notes: Optional notes from the approver
+
+    Returns:
+        True if the action was committed (False if it had already been)
+    """
+    started = time.perf_counter()
+    prepared = request.prepared
+    path = "prepared"
+    if isinstance(prepared, dict):
+        prepared = PreparedAction.from_dict(prepared)
+    if prepared is None:
+        path = "rerun"
+        context = request.context
+        prepared = prepare_action(
+            request.lead_key,
+            LeadRecord(**context["lead"]),
+            ScoreRecord(**context["score"]),
+            tools=tuple(context.get("tools", PREPARED_TOOLS))
+        )
+        # The lead was scored under the rules recorded with the request,
+        # which may no longer be live; stamp those, not today's
+        if prepared.lead_row is not None and context.get("config_version"):
+            prepared.lead_row.config_version = context["config_version"]
+
+    # Keep the task's due offset, counted from approval rather than
+    # from when the lead was processed
+    task = prepared.task
+    if task is not None:
+        task = {**task, "due_date": datetime.utcnow() + (task["due_date"] - prepared.prepared_at)}
+
+    draft = {**prepared.draft, "lead_key": request.lead_key} if prepared.draft is not None else None
+    committed = await commit_approved_action(request.action_id, notes, prepared.lead_row, task, draft)
+    if committed:
+        if prepared.lead_row is not None:
+            invalidate_lead_cache([request.lead_key])
+            publish_event("lead.upserted", request.lead_key, lead_event_data(prepared.lead_row))
+        if task is not None:
+            get_sweeper().schedule(task)
+
+    metrics.observe("approval.action_ms", (time.perf_counter() - started) * 1000, path=path)
+    metrics.increment("approval.executed", path=path)
+    return committed
+
+
+def _parse_datetime(value):
+    # orjson writes datetimes as ISO 8601 strings
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
@@ -0,0 +1,189 @@
+"""
+Task Escalation Sweeper
+
+Fires escalations for overdue follow-up tasks without polling the
+whole tasks table.
+
+Tasks due within a short horizon are loaded from the
+idx_tasks_escalation_due index into an in-memory min-heap. The sweeper
+sleeps until the earliest due date (or the next refill), escalates
+everything that is due, and refills from the index when the horizon
+runs out. Newly created tasks that fall inside the loaded window are
+pushed straight onto the heap by create_followup_task.
+
+A failed refill or sweep (database down, handler error) is logged and
+retried with backoff; the loop only ends on stop().
+"""
+
+import asyncio
+import heapq
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+import metrics
+from config import settings
+from db.postgres import fetch_escalation_candidates, mark_tasks_escalated
+
+
+EscalationHandler = Callable[[list[dict]], Awaitable[None]]
+
+
+async def _print_escalations(tasks: list[dict]) -> None:
+    """Default escalation handler."""
+    for task in tasks:
+        print(f"[ESCALATION] Task overdue: {task['task_id']} (lead: {task['lead_key']})")
+
+
+class TaskEscalationSweeper:
+    """Min-heap scheduler for overdue task escalations."""
+
+    # Backoff cap after repeated failures
+    MAX_RETRY_SECONDS = 60.0
+
+    def __init__(
+        self,
+        on_escalate: EscalationHandler = _print_escalations,
+        horizon: timedelta = timedelta(seconds=settings.TASK_SWEEP_HORIZON_SECONDS),
+        batch_size: int = settings.TASK_SWEEP_BATCH_SIZE
+    ):
+        self.on_escalate = on_escalate
+        self.horizon = horizon
+        self.batch_size = batch_size
+
+        self._heap: list[tuple[datetime, str]] = []
+        self._tasks: dict[str, dict] = {}
+        self._loaded_until = datetime.min
+        self._wakeup = asyncio.Event()
+        self._running = False
+
+    def schedule(self, task: dict) -> None:
+        """
+        Track a newly created task.
+
+        Only tasks inside the already-loaded window are pushed; anything
+        later is picked up by the next refill.
+        """
+        if task["due_date"] > self._loaded_until or task["task_id"] in self._tasks:
+            return
+        self._push(task)
+        if self._heap[0][1] == task["task_id"]:
+            self._wakeup.set()
+
+    def discard(self, task_id: str) -> None:
+        """Forget a task that was completed before it became overdue."""
+        # Lazy deletion - the heap entry is skipped when popped
+        self._tasks.pop(task_id, None)
+
+    async def refill(self, now: Optional[datetime] = None) -> int:
+        """
+        Load tasks due before now + horizon from the index.
+
+        If the batch is full, the window is cut at the last loaded due
+        date so nothing in between is missed.
+
+        Returns:
+            Number of tasks added to the heap
+        """
+        now = now or datetime.utcnow()
+        until = now + self.horizon
+        rows = await fetch_escalation_candidates(until, self.batch_size)
+
+        added = 0
+        for row in rows:
+            row["due_date"] = _to_naive_utc(row["due_date"])
+            if row["task_id"] not in self._tasks:
+                self._push(row)
+                added += 1
+
+        if rows and len(rows) >= self.batch_size:
+            self._loaded_until = rows[-1]["due_date"]
+        else:
+            self._loaded_until = until
+        return added
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """
+        Escalate every tracked task that is due.
+
+        Returns:
+            Number of tasks escalated
+        """
+        now = now or datetime.utcnow()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, task_id = heapq.heappop(self._heap)
+            task = self._tasks.pop(task_id, None)
+            if task is not None:
+                due.append(task)
+
+        if due:
+            # Every worker process (and replica) runs a sweeper; only the
+            # one whose UPDATE claimed a task sends its escalation
+            try:
+                claimed = set(await mark_tasks_escalated([t["task_id"] for t in due]))
+            except BaseException:
+                # Nothing was claimed; keep the tasks for the next sweep
+                for task in due:
+                    self._push(task)
+                raise
+            due = [t for t in due if t["task_id"] in claimed]
+            if due:
+                await self.on_escalate(due)
+        return len(due)
+
+    async def run(self) -> None:
+        """Run the sweep loop until stop() is called."""
+        self._running = True
+        failures = 0
+        while self._running:
+            now = datetime.utcnow()
+            try:
+                if now >= self._loaded_until:
+                    await self.refill(now)
+                await self.sweep(now)
+            except Exception as e:
+                failures += 1
+                metrics.increment("sweeper.errors")
+                # Full jitter, capped; stop() still wakes the loop
+                delay = random.uniform(0, min(self.MAX_RETRY_SECONDS, 0.5 * 2 ** failures))
+                print(f"[SWEEPER] Sweep failed ({e!r}); retrying in {delay:.1f}s")
+            else:
+                failures = 0
+                next_due = self._heap[0][0] if self._heap else self._loaded_until
+                delay = (min(next_due, self._loaded_until) - datetime.utcnow()).total_seconds()
+
+            self._wakeup.clear()
+            if not self._running:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0.05))
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        """Stop the sweep loop after the current iteration."""
+        self._running = False
+        self._wakeup.set()
+
+    def _push(self, task: dict) -> None:
+        self._tasks[task["task_id"]] = task
+        heapq.heappush(self._heap, (task["due_date"], task["task_id"]))
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """Postgres returns aware timestamps; the agent uses naive UTC."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+_sweeper: Optional[TaskEscalationSweeper] = None
+
+
+def get_sweeper() -> TaskEscalationSweeper:
+    """Get the shared sweeper instance."""
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = TaskEscalationSweeper()
+    return _sweeper
@@ -3,11 +3,28 @@ Lead Upsert Tool
 
 Creates or updates a lead row in the tracking system.
 Students implement this in Week 4.
+
+Reads go through a Redis cache holding each lead's serialized JSON and
+an ETag, so GET /lead/{lead_key} polls are answered (or 304'd) without
+touching Postgres. Every write path - upsert_lead_row,
+update_lead_status, bulk import, requalify - invalidates the leads it
+changed; the TTL bounds staleness if a read races a write.
 """
 
-from typing import Optional
+import hashlib
+from dataclasses import asdict, dataclass
+from typing import Optional, Union
 from datetime import datetime
+
+import metrics
+from config import settings
+from db.postgres import fetch_lead_row
+from db.redis import cache_get, cache_set, pipeline_execute
+from events import publish_event
 from models import LeadInput, ScoreResult, LeadRow
+from records import LeadRecord, ScoreRecord, LeadRowRecord
+from scoring_config import ScoringConfig, current_scoring_config
+from serialization import dumps
 
 
 class UpsertResult:
@@ -20,10 +37,22 @@ class UpsertResult:
         self.message = message
 
 
+@dataclass
+class LeadSnapshot:
+    """A lead as served by GET /lead/{lead_key}."""
+    etag: str
+    body: Optional[str] = None  # LeadRow JSON; None if the lead doesn't exist
+
+
+def lead_cache_key(lead_key: str) -> str:
+    return f"lead_row:{lead_key}"
+
+
 def upsert_lead_row(
     lead_key: str,
-    lead: LeadInput,
-    score_result: ScoreResult
+    lead: Union[LeadRecord, LeadInput],
+    score_result: Union[ScoreRecord, ScoreResult],
+    rules: Optional[ScoringConfig] = None
 ) -> UpsertResult:
     """
     Create or update lead in tracking sheet/database.
@@ -35,6 +64,7 @@ def upsert_lead_row(
         lead_key: Unique identifier for the lead (email_YYYYWW)
         lead: The original lead input data
         score_result: The scoring result from score_lead
+        rules: Config snapshot the lead was scored under (default: current)
 
     Returns:
         UpsertResult indicating success and whether record was created/updated
@@ -45,30 +75,17 @@ def upsert_lead_row(
     # 2. PostgreSQL database
     # 3. Both (sheets for visibility, DB for querying)
 
-    # Build the lead row
-    lead_row = LeadRow(
-        lead_key=lead_key,
-        email=lead.email,
-        company=lead.company,
-        score=score_result.score,
-        tier=score_result.tier,
-        segment=score_result.segment,
-        need=lead.need,
-        timeline=lead.timeline,
-        budget=lead.budget,
-        title=lead.title,
-        company_size=lead.company_size,
-        industry=lead.industry,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
-        status="new",
-        notes=score_result.reasoning
+    # Build the lead row (a record - no per-row validation or model copy)
+    lead_row = LeadRowRecord.build(
+        lead_key, lead, score_result, datetime.utcnow(), (rules or current_scoring_config()).version
     )
 
     # Placeholder implementation
     # TODO: Replace with actual database/sheets operation
     print(f"[PLACEHOLDER] Would upsert lead: {lead_key}")
     print(f"  Score: {score_result.score}, Tier: {score_result.tier}")
+    invalidate_lead_cache([lead_key])
+    publish_event("lead.upserted", lead_key, lead_event_data(lead_row))
 
     return UpsertResult(
         success=True,
@@ -78,9 +95,9 @@ def upsert_lead_row(
     )
 
 
-def get_lead_by_key(lead_key: str) -> Optional[LeadRow]:
+async def get_lead_by_key(lead_key: str) -> Optional[LeadRow]:
     """
-    Retrieve a lead by its key.
+    Retrieve a lead by its key (read-through cached).
 
     Args:
         lead_key: The unique lead identifier
@@ -88,9 +105,64 @@ def get_lead_by_key(lead_key: str) -> Optional[LeadRow]:
     Returns:
         LeadRow if found, None otherwise
     """
-    # TODO: Implement in Week 4
-    print(f"[PLACEHOLDER] Would lookup lead: {lead_key}")
-    return None
+    snapshot = await get_lead_snapshot(lead_key)
+    if snapshot.body is None:
+        return None
+    return LeadRow.model_validate_json(snapshot.body)
+
+
+async def get_lead_snapshot(lead_key: str) -> LeadSnapshot:
+    """
+    Serialized lead and its ETag, from Redis or else Postgres.
+
+    The body is stored pre-serialized, so a cache hit is one Redis GET
+    and no JSON encoding.
+
+    Args:
+        lead_key: The unique lead identifier
+
+    Returns:
+        LeadSnapshot (body None if the lead doesn't exist)
+    """
+    key = lead_cache_key(lead_key)
+    cached = cache_get(key)
+    if cached is not None:
+        metrics.increment("lead_cache.hits")
+        return LeadSnapshot(**cached)
+
+    metrics.increment("lead_cache.misses")
+    row = await fetch_lead_row(lead_key)
+    if row is None:
+        snapshot = LeadSnapshot(etag=_etag(b"null"))
+        cache_set(key, asdict(snapshot), settings.LEAD_CACHE_MISS_TTL_SECONDS)
+        return snapshot
+
+    body = dumps(LeadRow.model_validate(row))
+    snapshot = LeadSnapshot(etag=_etag(body), body=body.decode())
+    cache_set(key, asdict(snapshot), settings.LEAD_CACHE_TTL_SECONDS)
+    return snapshot
+
+
+def invalidate_lead_cache(lead_keys: list[str]) -> None:
+    """Drop cached leads after a write (one round trip per 1000 keys)."""
+    for i in range(0, len(lead_keys), 1000):
+        pipeline_execute([("UNLINK", *(lead_cache_key(k) for k in lead_keys[i:i + 1000]))])
+
+
+def lead_event_data(row: LeadRowRecord) -> dict:
+    """Payload of a lead.upserted event."""
+    return {
+        "score": row.score,
+        "tier": row.tier,
+        "segment": row.segment,
+        "status": row.status,
+        "config_version": row.config_version,
+    }
+
+
+def _etag(body: bytes) -> str:
+    # Strong validator: same bytes, same tag, on every replica
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
 
 
 def update_lead_status(lead_key: str, status: str, notes: Optional[str] = None) -> bool:
@@ -107,4 +179,6 @@ def update_lead_status(lead_key: str, status: str, notes: Optional[str] = None)
     """
     # TODO: Implement in Week 4
     print(f"[PLACEHOLDER] Would update lead {lead_key} to status: {status}")
+    invalidate_lead_cache([lead_key])
+    publish_event("lead.status_changed", lead_key, {"status": status, "notes": notes})
     return True
@@ -2,9 +2,10 @@
 -- Run this on first startup to initialize tables
 
 -- Traces table - stores agent execution logs
+-- trace_id / action_id are time-ordered IDs (see agent-api/ids.py), so
+-- they are used directly as primary keys and inserts append to the index.
 CREATE TABLE IF NOT EXISTS traces (
-    id SERIAL PRIMARY KEY,
-    trace_id VARCHAR(64) UNIQUE NOT NULL,
+    trace_id VARCHAR(64) PRIMARY KEY,
     lead_key VARCHAR(128) NOT NULL,
     started_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     completed_at TIMESTAMP WITH TIME ZONE,
@@ -22,6 +23,12 @@ CREATE TABLE IF NOT EXISTS traces (
     -- Cost tracking (Week 10)
     token_usage JSONB,
 
+    -- Scoring config version (config_snapshots) the lead was processed under
+    config_version VARCHAR(16),
+
+    -- Agent pool routing (dispatcher.py): pool, reason, wait_ms, run_ms
+    route JSONB,
+
     -- Indexes
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -29,7 +36,6 @@ CREATE TABLE IF NOT EXISTS traces (
 -- Index for fast lookups
 CREATE INDEX IF NOT EXISTS idx_traces_lead_key ON traces(lead_key);
 CREATE INDEX IF NOT EXISTS idx_traces_created_at ON traces(created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_traces_trace_id ON traces(trace_id);
 
 -- Leads table - persistent lead storage
 CREATE TABLE IF NOT EXISTS leads (
@@ -55,6 +61,17 @@ CREATE TABLE IF NOT EXISTS leads (
     confidence VARCHAR(20),
     reasoning TEXT,
 
+    -- Per-criterion scores (0-100) and the scoring config version
+    -- (config_snapshots) they were combined under; lets a weight or
+    -- threshold change re-tier leads in SQL without re-scoring
+    crit_industry_fit SMALLINT,
+    crit_budget SMALLINT,
+    crit_authority SMALLINT,
+    crit_need SMALLINT,
+    crit_timeline SMALLINT,
+    crit_company_size SMALLINT,
+    config_version VARCHAR(16),
+
     -- Status
     status VARCHAR(20) DEFAULT 'new',
     notes TEXT,
@@ -69,17 +86,32 @@ CREATE INDEX IF NOT EXISTS idx_leads_email ON leads(email);
 CREATE INDEX IF NOT EXISTS idx_leads_company ON leads(company);
 CREATE INDEX IF NOT EXISTS idx_leads_tier ON leads(tier);
 CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status);
+-- Re-qualification: leads near tier boundaries, per config version
+CREATE INDEX IF NOT EXISTS idx_leads_score ON leads(score);
+CREATE INDEX IF NOT EXISTS idx_leads_config_version ON leads(config_version);
+
+-- Scoring config snapshots - rules of each version recorded on leads
+-- and traces (see agent-api/scoring_config.py). The most recently
+-- activated row is the live config for workers without a config file.
+CREATE TABLE IF NOT EXISTS config_snapshots (
+    version VARCHAR(16) PRIMARY KEY,
+    rules JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    activated_at TIMESTAMP WITH TIME ZONE
+);
 
 -- Approvals table - pending approval requests
 CREATE TABLE IF NOT EXISTS approvals (
-    id SERIAL PRIMARY KEY,
-    action_id VARCHAR(64) UNIQUE NOT NULL,
+    action_id VARCHAR(64) PRIMARY KEY,
     action_type VARCHAR(50) NOT NULL,
     lead_key VARCHAR(128) NOT NULL,
 
     -- Request details
     reason TEXT NOT NULL,
     context JSONB,
+    -- Act-phase work prepared while pending (lead row, task, draft),
+    -- committed as-is on approval, then cleared (see tools/speculative.py)
+    prepared JSONB,
 
     -- Decision
     status VARCHAR(20) DEFAULT 'pending',
@@ -95,6 +127,55 @@ CREATE TABLE IF NOT EXISTS approvals (
 CREATE INDEX IF NOT EXISTS idx_approvals_status ON approvals(status);
 CREATE INDEX IF NOT EXISTS idx_approvals_lead_key ON approvals(lead_key);
 
+-- Tasks table - follow-up tasks created by the agent
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id VARCHAR(64) PRIMARY KEY,
+    lead_key VARCHAR(128) NOT NULL,
+
+    -- Task details
+    task_type VARCHAR(50) NOT NULL,
+    title TEXT NOT NULL,
+    priority VARCHAR(20) NOT NULL,
+    assigned_to VARCHAR(254),
+
+    -- Scheduling
+    status VARCHAR(20) DEFAULT 'pending',
+    due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    escalated_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    notes TEXT,
+
+    -- Timestamps
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Range scans for pending tasks by due date
+CREATE INDEX IF NOT EXISTS idx_tasks_status_due_date ON tasks(status, due_date);
+CREATE INDEX IF NOT EXISTS idx_tasks_lead_key ON tasks(lead_key);
+-- Escalation sweeper refill - only open, not-yet-escalated tasks
+CREATE INDEX IF NOT EXISTS idx_tasks_escalation_due
+    ON tasks(due_date)
+    WHERE status = 'pending' AND escalated_at IS NULL;
+
+-- Email drafts awaiting review - drafts only, nothing is sent from here
+CREATE TABLE IF NOT EXISTS email_drafts (
+    draft_id VARCHAR(64) PRIMARY KEY,
+    lead_key VARCHAR(128) NOT NULL,
+
+    -- Draft content
+    to_email VARCHAR(254) NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    template_type VARCHAR(50) NOT NULL,
+    template_version INTEGER,
+    personalized BOOLEAN DEFAULT FALSE,
+
+    -- Timestamps
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_drafts_lead_key ON email_drafts(lead_key);
+
 -- Company history table - for memory lookups
 -- Note: Primary storage is Redis, this is for persistence/backup
 CREATE TABLE IF NOT EXISTS company_history (
@@ -136,3 +217,200 @@ CREATE TRIGGER update_company_history_updated_at
     BEFORE UPDATE ON company_history
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
+
+-- Pipeline analytics rollups - hourly pre-aggregates behind GET /stats,
+-- so dashboards never GROUP BY over leads/traces. Kept current by the
+-- statement-level triggers below: each write statement folds its rows
+-- into one delta per group (a 500-row import batch touches a handful of
+-- rollup rows, not 500), and an UPDATE that leaves the grouping columns
+-- and score unchanged nets to zero and touches nothing. Groups are
+-- upserted in key order so concurrent writers lock rollup rows in the
+-- same order.
+
+CREATE TABLE IF NOT EXISTS lead_rollup_hourly (
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,  -- hour of leads.created_at
+    tier VARCHAR(20) NOT NULL,
+    segment VARCHAR(20) NOT NULL,
+    industry VARCHAR(100) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    leads BIGINT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, tier, segment, industry, status)
+);
+
+CREATE TABLE IF NOT EXISTS trace_rollup_hourly (
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,  -- hour of traces.started_at
+    tier VARCHAR(20) NOT NULL,
+    segment VARCHAR(20) NOT NULL,
+    approval VARCHAR(20) NOT NULL,             -- required / auto
+    traces BIGINT NOT NULL DEFAULT 0,
+    errors BIGINT NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    input_tokens BIGINT NOT NULL DEFAULT 0,
+    output_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(14, 6) NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, tier, segment, approval)
+);
+
+CREATE TABLE IF NOT EXISTS approval_rollup_hourly (
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,  -- hour of approvals.requested_at
+    action_type VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    approvals BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket, action_type, status)
+);
+
+-- Transition tables exist only for the firing event, so each side is
+-- read in its own branch; old rows count negative
+CREATE OR REPLACE FUNCTION rollup_leads()
+RETURNS TRIGGER AS $$
+DECLARE
+    changes lead_rollup_hourly[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        changes := changes || ARRAY(
+            SELECT ROW(date_trunc('hour', created_at), COALESCE(tier, 'unscored'),
+                       COALESCE(segment, 'unknown'), COALESCE(lower(industry), 'unknown'),
+                       COALESCE(status, 'new'), 1, COALESCE(score, 0))::lead_rollup_hourly
+            FROM new_leads
+        );
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        changes := changes || ARRAY(
+            SELECT ROW(date_trunc('hour', created_at), COALESCE(tier, 'unscored'),
+                       COALESCE(segment, 'unknown'), COALESCE(lower(industry), 'unknown'),
+                       COALESCE(status, 'new'), -1, -COALESCE(score, 0))::lead_rollup_hourly
+            FROM old_leads
+        );
+    END IF;
+
+    INSERT INTO lead_rollup_hourly AS r (bucket, tier, segment, industry, status, leads, score_sum)
+    SELECT bucket, tier, segment, industry, status, SUM(leads), SUM(score_sum)
+    FROM unnest(changes)
+    GROUP BY 1, 2, 3, 4, 5
+    HAVING SUM(leads) <> 0 OR SUM(score_sum) <> 0
+    ORDER BY 1, 2, 3, 4, 5
+    ON CONFLICT (bucket, tier, segment, industry, status) DO UPDATE SET
+        leads = r.leads + EXCLUDED.leads,
+        score_sum = r.score_sum + EXCLUDED.score_sum;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION rollup_traces()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO trace_rollup_hourly AS r
+        (bucket, tier, segment, approval, traces, errors, score_sum, input_tokens, output_tokens, cost_usd)
+    SELECT date_trunc('hour', started_at),
+           COALESCE(score_result->>'tier', 'unscored'),
+           COALESCE(score_result->>'segment', 'unknown'),
+           CASE WHEN approval_required THEN 'required' ELSE 'auto' END,
+           COUNT(*),
+           COUNT(error),
+           COALESCE(SUM((score_result->>'score')::INTEGER), 0),
+           COALESCE(SUM((token_usage->>'input_tokens')::BIGINT), 0),
+           COALESCE(SUM((token_usage->>'output_tokens')::BIGINT), 0),
+           COALESCE(SUM((token_usage->>'cost_usd')::NUMERIC), 0)
+    FROM new_traces
+    GROUP BY 1, 2, 3, 4
+    ORDER BY 1, 2, 3, 4
+    ON CONFLICT (bucket, tier, segment, approval) DO UPDATE SET
+        traces = r.traces + EXCLUDED.traces,
+        errors = r.errors + EXCLUDED.errors,
+        score_sum = r.score_sum + EXCLUDED.score_sum,
+        input_tokens = r.input_tokens + EXCLUDED.input_tokens,
+        output_tokens = r.output_tokens + EXCLUDED.output_tokens,
+        cost_usd = r.cost_usd + EXCLUDED.cost_usd;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION rollup_approvals()
+RETURNS TRIGGER AS $$
+DECLARE
+    changes approval_rollup_hourly[] := '{}';
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        changes := changes || ARRAY(
+            SELECT ROW(date_trunc('hour', requested_at), action_type,
+                       COALESCE(status, 'pending'), 1)::approval_rollup_hourly
+            FROM new_approvals
+        );
+    END IF;
+    IF TG_OP = 'UPDATE' THEN
+        changes := changes || ARRAY(
+            SELECT ROW(date_trunc('hour', requested_at), action_type,
+                       COALESCE(status, 'pending'), -1)::approval_rollup_hourly
+            FROM old_approvals
+        );
+    END IF;
+
+    INSERT INTO approval_rollup_hourly AS r (bucket, action_type, status, approvals)
+    SELECT bucket, action_type, status, SUM(approvals)
+    FROM unnest(changes)
+    GROUP BY 1, 2, 3
+    HAVING SUM(approvals) <> 0
+    ORDER BY 1, 2, 3
+    ON CONFLICT (bucket, action_type, status) DO UPDATE SET
+        approvals = r.approvals + EXCLUDED.approvals;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Backfill on the first run against existing data (rollups still empty)
+INSERT INTO lead_rollup_hourly (bucket, tier, segment, industry, status, leads, score_sum)
+SELECT date_trunc('hour', created_at), COALESCE(tier, 'unscored'), COALESCE(segment, 'unknown'),
+       COALESCE(lower(industry), 'unknown'), COALESCE(status, 'new'), COUNT(*), COALESCE(SUM(score), 0)
+FROM leads
+WHERE NOT EXISTS (SELECT 1 FROM lead_rollup_hourly)
+GROUP BY 1, 2, 3, 4, 5;
+
+INSERT INTO trace_rollup_hourly
+    (bucket, tier, segment, approval, traces, errors, score_sum, input_tokens, output_tokens, cost_usd)
+SELECT date_trunc('hour', started_at), COALESCE(score_result->>'tier', 'unscored'),
+       COALESCE(score_result->>'segment', 'unknown'),
+       CASE WHEN approval_required THEN 'required' ELSE 'auto' END,
+       COUNT(*), COUNT(error), COALESCE(SUM((score_result->>'score')::INTEGER), 0),
+       COALESCE(SUM((token_usage->>'input_tokens')::BIGINT), 0),
+       COALESCE(SUM((token_usage->>'output_tokens')::BIGINT), 0),
+       COALESCE(SUM((token_usage->>'cost_usd')::NUMERIC), 0)
+FROM traces
+WHERE NOT EXISTS (SELECT 1 FROM trace_rollup_hourly)
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO approval_rollup_hourly (bucket, action_type, status, approvals)
+SELECT date_trunc('hour', requested_at), action_type, COALESCE(status, 'pending'), COUNT(*)
+FROM approvals
+WHERE NOT EXISTS (SELECT 1 FROM approval_rollup_hourly)
+GROUP BY 1, 2, 3;
+
+-- One trigger per event: transition tables can't be shared across events.
+-- INSERT ... ON CONFLICT DO UPDATE fires the INSERT trigger for new rows
+-- and the UPDATE trigger for the rows it updated.
+DROP TRIGGER IF EXISTS rollup_leads_insert ON leads;
+CREATE TRIGGER rollup_leads_insert
+    AFTER INSERT ON leads REFERENCING NEW TABLE AS new_leads
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_leads();
+DROP TRIGGER IF EXISTS rollup_leads_update ON leads;
+CREATE TRIGGER rollup_leads_update
+    AFTER UPDATE ON leads REFERENCING OLD TABLE AS old_leads NEW TABLE AS new_leads
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_leads();
+DROP TRIGGER IF EXISTS rollup_leads_delete ON leads;
+CREATE TRIGGER rollup_leads_delete
+    AFTER DELETE ON leads REFERENCING OLD TABLE AS old_leads
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_leads();
+
+DROP TRIGGER IF EXISTS rollup_traces_insert ON traces;
+CREATE TRIGGER rollup_traces_insert
+    AFTER INSERT ON traces REFERENCING NEW TABLE AS new_traces
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_traces();
+
+DROP TRIGGER IF EXISTS rollup_approvals_insert ON approvals;
+CREATE TRIGGER rollup_approvals_insert
+    AFTER INSERT ON approvals REFERENCING NEW TABLE AS new_approvals
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_approvals();
+DROP TRIGGER IF EXISTS rollup_approvals_update ON approvals;
+CREATE TRIGGER rollup_approvals_update
+    AFTER UPDATE ON approvals REFERENCING OLD TABLE AS old_approvals NEW TABLE AS new_approvals
+    FOR EACH STATEMENT EXECUTE FUNCTION rollup_approvals();
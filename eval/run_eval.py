@@ -9,8 +9,12 @@ Usage:
     python eval/run_eval.py
     python eval/run_eval.py --verbose
     python eval/run_eval.py --case 5  # Run specific case
+    python eval/run_eval.py --prompt-variant compact
+    python eval/run_eval.py --ab            # Compare full vs compact scoring prompts
+    python eval/run_eval.py --prompt-report # Token size of each prompt variant
 """
 
+import asyncio
 import json
 import argparse
 import sys
@@ -18,6 +22,9 @@ from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 
+# The agent modules import each other top-level from agent-api/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "agent-api"))
+
 
 @dataclass
 class EvalResult:
@@ -44,33 +51,42 @@ def load_expected_outputs(path: str = "eval/expected-outputs.json") -> list[dict
         return json.load(f)
 
 
-def run_agent(lead_input: dict) -> dict:
+def run_agent(lead_input: dict, prompt_variant: Optional[str] = None) -> dict:
     """
-    Run the agent on a single lead input.
+    Run the agent's scoring and guardrail steps on a single lead input.
+
+    Scoring goes through score_lead_with_llm with the given system
+    prompt variant, so variants can be compared on the same cases.
+    Without an LLM API key every variant falls back to rule-based
+    scoring and the comparison is meaningless.
 
-    TODO: Implement in Week 6
-    - Import the agent module
-    - Call the agent with the lead input
-    - Return the result
+    TODO: Switch to LeadAgent.run once the agent scores with the LLM
     """
-    # Placeholder implementation
-    # from agent import LeadAgent
-    # from models import LeadInput
-    # agent = LeadAgent()
-    # lead = LeadInput(**lead_input)
-    # result = agent.run(lead)
-    # return result.model_dump()
-
-    # For now, return a mock result
+    from agent import LeadAgent
+    from llm.router import close_llm_router
+    from models import LeadInput
+    from tools.score_lead import score_lead_with_llm
+
+    async def score_case():
+        # Each case runs in its own event loop; don't leak the router's
+        # connection pool into the next one
+        try:
+            return await score_lead_with_llm(lead, prompt_variant=prompt_variant)
+        finally:
+            await close_llm_router()
+
+    lead = LeadInput(**lead_input)
+    score = asyncio.run(score_case())
+    approval = LeadAgent()._check_guardrails(score)
     return {
-        "tier": "needs_info",
-        "score": 0,
-        "approval_required": False,
-        "segment": "smb"
+        "tier": score.tier,
+        "score": score.score,
+        "approval_required": approval.required,
+        "segment": score.segment
     }
 
 
-def evaluate_case(test_case: dict, expected: dict) -> EvalResult:
+def evaluate_case(test_case: dict, expected: dict, prompt_variant: Optional[str] = None) -> EvalResult:
     """
     Evaluate a single test case.
 
@@ -83,7 +99,7 @@ def evaluate_case(test_case: dict, expected: dict) -> EvalResult:
 
     try:
         # Run the agent
-        result = run_agent(test_case["input"])
+        result = run_agent(test_case["input"], prompt_variant)
 
         # Check tier
         expected_tier = expected["tier"]
@@ -130,13 +146,18 @@ def evaluate_case(test_case: dict, expected: dict) -> EvalResult:
         )
 
 
-def run_eval(verbose: bool = False, case_id: Optional[int] = None) -> tuple[int, int, list[EvalResult]]:
+def run_eval(
+    verbose: bool = False,
+    case_id: Optional[int] = None,
+    prompt_variant: Optional[str] = None
+) -> tuple[int, int, list[EvalResult]]:
     """
     Run the full evaluation suite.
 
     Args:
         verbose: Print detailed output for each case
         case_id: Run only a specific case (optional)
+        prompt_variant: Scoring prompt variant (optional, default from settings)
 
     Returns:
         Tuple of (passed_count, total_count, results)
@@ -157,7 +178,7 @@ def run_eval(verbose: bool = False, case_id: Optional[int] = None) -> tuple[int,
             continue
 
         expected = expected_by_id.get(cid, {})
-        result = evaluate_case(test_case, expected)
+        result = evaluate_case(test_case, expected, prompt_variant)
         results.append(result)
 
         if verbose:
@@ -190,17 +211,83 @@ def print_summary(passed: int, total: int, results: list[EvalResult]):
                     print(f"    Error: {r.error}")
 
 
+def print_prompt_report():
+    """Print the token size of each scoring prompt variant."""
+    from tools.score_lead import prompt_size_report
+    from models import LeadInput
+
+    sample = load_test_cases()[-1]["input"]
+    report = prompt_size_report(LeadInput(**sample))
+    # Regex estimates are marked "~" so they are never read as real counts
+    approx = "~" if report["estimated"] else ""
+    if report["estimated"]:
+        print("Scoring prompt sizes (ESTIMATED - tiktoken unavailable, counts are a regex approximation)")
+    else:
+        print(f"Scoring prompt sizes (tokenizer: {report['tokenizer']})")
+    for variant, size in report["variants"].items():
+        cacheable = ", ".join(p for p, ok in size["cacheable"].items() if ok) or "none"
+        tokens = f"{approx}{size['system_tokens']}"
+        print(f"  {variant:<8} {tokens:>6} tokens  {size['chars']:>5} chars  cacheable on: {cacheable}")
+    print(f"  per-lead user prompt (last sample case): {approx}{report['lead_prompt_tokens']} tokens")
+    print()
+
+
+def run_ab(verbose: bool = False, case_id: Optional[int] = None) -> bool:
+    """
+    A/B every scoring prompt variant on the same cases.
+
+    Returns:
+        True if every variant passed every case
+    """
+    from config import settings
+    from tools.score_lead import SCORING_PROMPTS
+
+    if not (settings.GEMINI_API_KEY or settings.ANTHROPIC_API_KEY):
+        print("WARNING: no LLM API key configured - all variants use rule-based fallback scoring\n")
+
+    runs = {}
+    for variant in SCORING_PROMPTS:
+        print(f"--- variant: {variant} ---")
+        runs[variant] = run_eval(verbose=verbose, case_id=case_id, prompt_variant=variant)
+
+    print(f"\n{'='*50}")
+    print("Prompt variant A/B")
+    print(f"{'='*50}")
+    for variant, (passed, total, _) in runs.items():
+        print(f"  {variant:<8} {passed}/{total} passed ({100*passed/total:.1f}%)")
+
+    baseline, *others = runs
+    tiers = {v: {r.case_id: r.actual_tier for r in runs[v][2]} for v in runs}
+    for variant in others:
+        changed = [cid for cid, tier in tiers[baseline].items() if tiers[variant].get(cid) != tier]
+        print(f"  {variant} vs {baseline}: tier differs on {len(changed)} case(s) {changed or ''}")
+    print()
+
+    return all(passed == total for passed, total, _ in runs.values())
+
+
 def main():
     parser = argparse.ArgumentParser(description="Run agent evaluation suite")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--case", "-c", type=int, help="Run specific case ID")
+    parser.add_argument("--prompt-variant", "-p", help="Scoring prompt variant (full or compact)")
+    parser.add_argument("--ab", action="store_true", help="Compare all scoring prompt variants")
+    parser.add_argument("--prompt-report", action="store_true", help="Print prompt token sizes and exit")
     args = parser.parse_args()
 
+    if args.prompt_report or args.ab:
+        print_prompt_report()
+    if args.prompt_report:
+        return
+
     print("Running evaluation suite...")
     print(f"Loading test cases from eval/sample-leads.json")
     print()
 
-    passed, total, results = run_eval(verbose=args.verbose, case_id=args.case)
+    if args.ab:
+        sys.exit(0 if run_ab(verbose=args.verbose, case_id=args.case) else 1)
+
+    passed, total, results = run_eval(verbose=args.verbose, case_id=args.case, prompt_variant=args.prompt_variant)
     print_summary(passed, total, results)
 
     # Exit with error code if not all passed